@@ -0,0 +1,112 @@
+import threading
+from collections import deque
+
+
+class AlertFeed:
+    """
+    Bounded per-crawl-cycle log of alert additions and removals.
+
+    Every crawler cycle gets its own entry holding the alerts added and the
+    alert ids removed during it. `delta(last_crawl_number)` merges the entries
+    after `last_crawl_number` (including the cycle still in progress), so a
+    polling client downloads only what changed since its previous poll. Only
+    the last `max_cycles` cycles are kept; clients further behind get a full
+    snapshot instead.
+
+    The log is fed by the store's change notifications (alert inserts and
+    deletes, crawl count updates), so it also holds the writes other workers
+    make to a shared store. It never calls the store while holding its lock,
+    as the store notifies it while holding its own.
+    """
+
+    def __init__(self, store, max_cycles=100):
+        self._store = store
+        self._lock = threading.Lock()
+        self._closed = deque(maxlen=max_cycles)
+        self._open = self._new_entry(store.crawler_cycle["count"] + 1)
+
+    def attach(self):
+        self._store.subscribe(self._on_store_change)
+
+    @property
+    def current_crawl_number(self):
+        """The last closed crawl cycle the log has seen."""
+        with self._lock:
+            return self._open["cycle"] - 1
+
+    def add(self, alert):
+        return self._store.insert("alerts", alert)
+
+    def remove(self, alert_id):
+        return self._store.delete("alerts", alert_id)
+
+    def close_cycle(self):
+        """Ends the running crawler cycle and bumps the crawl counter."""
+        with self._store.transaction():
+            count = self._store.crawler_cycle["count"] + 1
+            self._store.set_crawl_count(count)
+        return count
+
+    def reset(self):
+        """Forgets the logged cycles (the alerts were replaced wholesale); clients get a full snapshot next."""
+        count = self._store.crawler_cycle["count"]
+        with self._lock:
+            self._closed.clear()
+            self._open = self._new_entry(count + 1)
+
+    def _on_store_change(self, table, action, record, changes, previous):
+        if table == "alerts":
+            with self._lock:
+                if action == "insert":
+                    self._open["added"][record["id"]] = record
+                elif action == "delete":
+                    self._open["added"].pop(record["id"], None)
+                    self._open["removed"].append(record["id"])
+        elif table == "crawler_cycle":
+            count = record["count"]
+            with self._lock:
+                if count < self._open["cycle"] - 1:
+                    # The counter went back: nothing logged still applies
+                    self._closed.clear()
+                else:
+                    self._open["cycle"] = count
+                    self._closed.append(self._open)
+                self._open = self._new_entry(count + 1)
+
+    def snapshot(self):
+        # Cycle number first: alerts read after it can only be newer, and a later delta repeats them harmlessly
+        current = self.current_crawl_number
+        return {
+            "alerts": self._store.all("alerts"),
+            "removed_alert_ids": [],
+            "current_crawl_number": current,
+            "full_snapshot": True,
+        }
+
+    def delta(self, last_crawl_number=None):
+        with self._lock:
+            current = self._open["cycle"] - 1
+            oldest = self._closed[0]["cycle"] if self._closed else self._open["cycle"]
+            if last_crawl_number is None or last_crawl_number > current or last_crawl_number + 1 < oldest:
+                entries = None
+            else:
+                entries = [e for e in self._closed if e["cycle"] > last_crawl_number]
+                entries.append(self._open)
+                added, removed = {}, []
+                for entry in entries:
+                    added.update(entry["added"])
+                    for alert_id in entry["removed"]:
+                        added.pop(alert_id, None)
+                    removed.extend(entry["removed"])
+        if entries is None:
+            return self.snapshot()
+        return {
+            "alerts": list(added.values()),
+            "removed_alert_ids": removed,
+            "current_crawl_number": current,
+            "full_snapshot": False,
+        }
+
+    @staticmethod
+    def _new_entry(cycle):
+        return {"cycle": cycle, "added": {}, "removed": []}
@@ -0,0 +1,248 @@
+import bisect
+import threading
+from collections import defaultdict
+from itertools import islice
+
+from link_query import decode_cursor, encode_cursor
+
+ALERT_TYPES = ("error", "warning", "info")
+SEVERITIES = range(1, 11)
+SORT_FIELDS = ("timestamp", "severity_score", "id")
+
+# Exact-match filters backed by a posting set of alert ids
+_POSTED_FIELDS = ("source", "coredevice_id")
+
+# Alert fields the indexes are built from
+_LOAD_FIELDS = ("id", "type", "severity_score", "source", "coredevice_id", "timestamp")
+
+# Past every alert id, so `(until, _LAST)` sorts after every key at `until`
+_LAST = float("inf")
+
+
+def _key(alert):
+    return (alert.get("type"), alert.get("severity_score"), alert.get("source"),
+            alert.get("coredevice_id"), alert.get("timestamp") or "")
+
+
+class AlertIndex:
+    """
+    Query indexes over the alerts, kept current from store write listeners.
+
+    Every sort field has a sorted `(value, id)` list, the exact-match
+    filters have posting sets, and each (type, severity) pair has its own
+    timestamp-sorted list, so a histogram over a time window is a few
+    bisects rather than a pass over the alerts. A query walks the smallest
+    posting set that applies, or else the requested order starting at the
+    window edge, and stops once the page is full; pages resume after the
+    last key of the previous one.
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        self._alerts = {}
+        self._order = {field: [] for field in SORT_FIELDS}
+        self._postings = {field: defaultdict(set) for field in _POSTED_FIELDS}
+        self._buckets = defaultdict(list)
+        for alert in self._store.all("alerts", fields=_LOAD_FIELDS):
+            self._put(alert, insort=False)
+        # Built in one sort rather than by repeated insort
+        for keys in list(self._order.values()) + list(self._buckets.values()):
+            keys.sort()
+
+    def attach(self):
+        self._store.subscribe(self._on_store_change)
+
+    def reload(self):
+        """Rebuilds everything, for stores that swap their whole dataset at once."""
+        with self._lock:
+            self._load()
+
+    def _on_store_change(self, table, action, record, changes, previous):
+        if table != "alerts":
+            return
+        with self._lock:
+            if action == "delete":
+                self._drop(record["id"])
+            elif action == "insert" or self._alerts.get(record["id"]) != _key(record):
+                self._drop(record["id"])
+                self._put(record)
+
+    # --- Maintenance ---
+
+    def _put(self, alert, insort=True):
+        add = bisect.insort if insort else list.append
+        alert_id = alert["id"]
+        key = _key(alert)
+        kind, severity, source, coredevice_id, timestamp = key
+        self._alerts[alert_id] = key
+        add(self._order["timestamp"], (timestamp, alert_id))
+        add(self._order["severity_score"], (severity or 0, alert_id))
+        add(self._order["id"], (alert_id, alert_id))
+        add(self._buckets[(kind, severity)], (timestamp, alert_id))
+        self._postings["source"][source].add(alert_id)
+        self._postings["coredevice_id"][coredevice_id].add(alert_id)
+
+    def _drop(self, alert_id):
+        key = self._alerts.pop(alert_id, None)
+        if key is None:
+            return
+        kind, severity, source, coredevice_id, timestamp = key
+        for keys, entry in ((self._order["timestamp"], (timestamp, alert_id)),
+                            (self._order["severity_score"], (severity or 0, alert_id)),
+                            (self._order["id"], (alert_id, alert_id)),
+                            (self._buckets[(kind, severity)], (timestamp, alert_id))):
+            pos = bisect.bisect_left(keys, entry)
+            if pos < len(keys) and keys[pos] == entry:
+                del keys[pos]
+        for field, value in (("source", source), ("coredevice_id", coredevice_id)):
+            ids = self._postings[field][value]
+            ids.discard(alert_id)
+            if not ids:
+                del self._postings[field][value]
+
+    # --- Queries ---
+
+    def query(self, types=None, min_severity=None, max_severity=None, coredevice_id=None, source=None,
+              since=None, until=None, text=None, sort="timestamp", descending=True, cursor=None, limit=50):
+        """
+        One page of the alerts matching every given filter, ordered by
+        `sort` (ties by id), and the cursor of the next page (or None).
+        `since`/`until` bound the ISO timestamp (inclusive, in the form
+        link_query.normalize_date returns); `text` is a case-insensitive
+        substring of the message or network line.
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_FIELDS)}")
+        cursor_field = f"{sort}:{'desc' if descending else 'asc'}"
+        after = decode_cursor(cursor, cursor_field) if cursor else None
+        types = set(types) if types else None
+        text = text.lower() if text else None
+
+        def matches(key):
+            kind, severity, alert_source, alert_device, timestamp = key
+            if types is not None and kind not in types:
+                return False
+            if min_severity is not None and (severity or 0) < min_severity:
+                return False
+            if max_severity is not None and (severity or 0) > max_severity:
+                return False
+            if coredevice_id is not None and alert_device != coredevice_id:
+                return False
+            if source is not None and alert_source != source:
+                return False
+            if since is not None and timestamp < since:
+                return False
+            if until is not None and timestamp > until:
+                return False
+            return True
+
+        with self._lock:
+            keys = self._candidates(coredevice_id, source, sort, since, until, descending, after)
+            matched = []
+            for key in keys:
+                alert_id = key[1]
+                if not matches(self._alerts[alert_id]):
+                    continue
+                if text is not None:
+                    alert = self._store.get("alerts", alert_id) or {}
+                    if (text not in str(alert.get("message", "")).lower()
+                            and text not in str(alert.get("network_line", "")).lower()):
+                        continue
+                matched.append(key)
+                if len(matched) > limit:
+                    break
+
+        next_cursor = None
+        if len(matched) > limit:
+            matched = matched[:limit]
+            next_cursor = encode_cursor(cursor_field, matched[-1])
+        alerts = [self._store.get("alerts", alert_id) for _, alert_id in matched]
+        return [a for a in alerts if a is not None], next_cursor
+
+    def _candidates(self, coredevice_id, source, sort, since, until, descending, after):
+        """`(sort value, id)` keys in page order, past `after`, from the cheapest index that applies."""
+        postings = [self._postings[field].get(value, set())
+                    for field, value in (("coredevice_id", coredevice_id), ("source", source)) if value is not None]
+        if postings:
+            ids = min(postings, key=len)
+            keys = sorted((self._sort_value(alert_id, sort), alert_id) for alert_id in ids)
+            if descending:
+                keys.reverse()
+            if after is not None:
+                keys = [k for k in keys if (k < after if descending else k > after)]
+            return keys
+
+        order = self._order[sort]
+        low, high = 0, len(order)
+        if sort == "timestamp":
+            if since is not None:
+                low = bisect.bisect_left(order, (since,))
+            if until is not None:
+                high = bisect.bisect_right(order, (until, _LAST))
+        if after is not None:
+            if descending:
+                high = min(high, bisect.bisect_left(order, after))
+            else:
+                low = max(low, bisect.bisect_right(order, after))
+        if descending:
+            return (order[i] for i in range(high - 1, low - 1, -1))
+        return islice(order, low, high)
+
+    def _sort_value(self, alert_id, sort):
+        kind, severity, _, _, timestamp = self._alerts[alert_id]
+        if sort == "timestamp":
+            return timestamp
+        if sort == "severity_score":
+            return severity or 0
+        return alert_id
+
+    def histogram(self, since=None, until=None, coredevice_id=None, source=None):
+        """Alert counts by type, by severity and by both, over a time window (bounds as in query) and optional filters."""
+        counts = defaultdict(int)
+        with self._lock:
+            if coredevice_id is None and source is None:
+                for (kind, severity), keys in self._buckets.items():
+                    low = bisect.bisect_left(keys, (since,)) if since is not None else 0
+                    high = bisect.bisect_right(keys, (until, _LAST)) if until is not None else len(keys)
+                    if high > low:
+                        counts[(kind, severity)] += high - low
+            else:
+                postings = [self._postings[field].get(value, set())
+                            for field, value in (("coredevice_id", coredevice_id), ("source", source))
+                            if value is not None]
+                for alert_id in min(postings, key=len):
+                    kind, severity, alert_source, alert_device, timestamp = self._alerts[alert_id]
+                    if coredevice_id is not None and alert_device != coredevice_id:
+                        continue
+                    if source is not None and alert_source != source:
+                        continue
+                    if since is not None and timestamp < since:
+                        continue
+                    if until is not None and timestamp > until:
+                        continue
+                    counts[(kind, severity)] += 1
+
+        by_type = {kind: 0 for kind in ALERT_TYPES}
+        by_severity = {str(severity): 0 for severity in SEVERITIES}
+        by_type_severity = {kind: dict(by_severity) for kind in ALERT_TYPES}
+        for (kind, severity), count in counts.items():
+            by_type[kind] = by_type.get(kind, 0) + count
+            by_severity[str(severity)] = by_severity.get(str(severity), 0) + count
+            by_type_severity.setdefault(kind, {})
+            by_type_severity[kind][str(severity)] = by_type_severity[kind].get(str(severity), 0) + count
+        return {
+            "total": sum(counts.values()),
+            "by_type": by_type,
+            "by_severity": by_severity,
+            "by_type_severity": by_type_severity,
+        }
+
+    def severities(self):
+        """Severity score of every alert, in id order (1 when missing)."""
+        with self._lock:
+            severities = [self._alerts[alert_id][1] for _, alert_id in self._order["id"]]
+        return [1 if severity is None else severity for severity in severities]
@@ -0,0 +1,100 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException, Request
+from jose import JWTError, jwk, jwt
+
+# In a real deployment set SPIDERWEB_SECRET_KEY to a strong secret
+SECRET_KEY = os.environ.get("SPIDERWEB_SECRET_KEY", "a-dummy-secret-key-for-testing")
+ALGORITHM = "HS256"
+TOKEN_TTL = timedelta(hours=1)
+
+
+class ClaimsCache:
+    """Bounded LRU of decoded token claims; an entry lives until its token expires or `max_age` passes."""
+
+    def __init__(self, max_size=10000, max_age=300):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._max_size = max_size
+        self._max_age = max_age
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None:
+                claims, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(token)
+                    self.hits += 1
+                    return claims
+                del self._entries[token]
+            self.misses += 1
+            return None
+
+    def put(self, token, claims):
+        expires_at = min(float(claims.get("exp", 0)), time.time() + self._max_age)
+        with self._lock:
+            self._entries[token] = (claims, expires_at)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class Authenticator:
+    """
+    Issues and verifies HS256 bearer tokens.
+
+    The signing key is constructed once, verified claims are cached, and the
+    principal is a primary-key lookup in the store, so the cost per request
+    does not grow with the number of users or tokens.
+    """
+
+    def __init__(self, store, secret=SECRET_KEY, algorithm=ALGORITHM, ttl=TOKEN_TTL, cache=None):
+        self._store = store
+        self._key = jwk.construct(secret, algorithm)
+        self._algorithm = algorithm
+        self._ttl = ttl
+        self.cache = cache or ClaimsCache()
+
+    def issue_token(self, user):
+        claims = {"sub": str(user["id"]), "exp": datetime.utcnow() + self._ttl}
+        return jwt.encode(claims, self._key, algorithm=self._algorithm)
+
+    def verify(self, token):
+        """Returns the token's claims; raises 401 when it is invalid or expired."""
+        claims = self.cache.get(token)
+        if claims is None:
+            try:
+                claims = jwt.decode(token, self._key, algorithms=[self._algorithm])
+            except JWTError:
+                raise HTTPException(status_code=401, detail="Invalid or expired token",
+                                    headers={"WWW-Authenticate": "Bearer"})
+            self.cache.put(token, claims)
+        return claims
+
+    def current_user(self, request: Request):
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+        claims = self.verify(token)
+        try:
+            user = self._store.get("users", int(claims["sub"]))
+        except (KeyError, ValueError):
+            user = None
+        if user is None:
+            raise HTTPException(status_code=401, detail="User not found")
+        return user
+
+    def find_user(self, username):
+        users = self._store.find("users", "username", username)
+        return users[0] if users else None
@@ -0,0 +1,279 @@
+"""
+Load test / latency benchmark for every backend router.
+
+Drives the routes of the alerts, coredevice, coresite, network, link, site
+and user routers either in-process (ASGI transport, no network) or against a
+running server, at one or more concurrency levels, and reports throughput
+and p50/p95/p99 latency per route.
+
+    python bench_routes.py --dataset small --concurrency 1 16 --out run.json
+    python bench_routes.py --dataset small --baseline run.json   # flag regressions
+    python bench_routes.py --url http://127.0.0.1:8000 --routes links
+
+Results are saved as JSON; comparing against a baseline exits with status 1
+when a route's p95 or throughput regressed beyond --tolerance.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+import httpx
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def build_cases(ids):
+    """
+    Returns [(router, name, op)] where `op(client, n)` performs one operation
+    (n is a unique counter for generated names). `ids` holds existing ids to
+    request, so lookups hit real records.
+    """
+    link_id, site_id, device_id, coresite_id = ids["link"], ids["site"], ids["device"], ids["coresite"]
+
+    def get(path, expect=200):
+        async def op(client, n):
+            response = await client.get(path)
+            if response.status_code != expect:
+                raise RuntimeError(f"GET {path} -> {response.status_code}")
+        return op
+
+    def request(method, path, body=None):
+        async def op(client, n):
+            response = await client.request(method, path, json=body)
+            response.raise_for_status()
+        return op
+
+    def create_delete(create_path, delete_path, body):
+        async def op(client, n):
+            response = await client.post(create_path, json=body(n))
+            response.raise_for_status()
+            response = await client.delete(delete_path.format(id=response.json()["id"]))
+            response.raise_for_status()
+        return op
+
+    async def toggle_status(client, n):
+        response = await client.post(f"/admin/link/{link_id}/inject-status",
+                                     json={"physical_status": "Down" if n % 2 else "Up"})
+        response.raise_for_status()
+
+    return [
+        ("alerts", "GET /alerts", get("/alerts")),
+        ("alerts", "GET /alerts?last_crawl_number", get(f"/alerts?last_crawl_number={ids['crawl']}")),
+        ("alerts", "GET /get_all_alerts_severity", get("/get_all_alerts_severity")),
+        ("coredevice", "GET /get_core_devices", get("/get_core_devices")),
+        ("coredevice", "GET /coresite/{id}/coredevices", get(f"/coresite/{coresite_id}/coredevices")),
+        ("coredevice", "GET /coredevices/health", get("/coredevices/health")),
+        ("coredevice", "POST+DELETE coredevice", create_delete(
+            "/add_core_device", "/delete_device/{id}",
+            lambda n: {"name": f"bench-rtr-{n}", "ip": "192.0.2.1", "coresite_id": coresite_id})),
+        ("coresite", "GET /core_sites", get("/core_sites")),
+        ("coresite", "GET /core_sites/health", get("/core_sites/health")),
+        ("coresite", "POST+DELETE coresite", create_delete(
+            "/add_core_pikudim", "/delete_core_pikudim/{id}", lambda n: {"name": f"bench-cs-{n}"})),
+        ("network", "GET /networks/", get("/networks/")),
+        ("network", "GET /network/{id}/coresites", get("/network/1/coresites")),
+        ("network", "GET /networks/health", get("/networks/health")),
+        ("network", "POST+DELETE network", create_delete(
+            "/add_net_type", "/delete_net_type/{id}", lambda n: {"name": f"bench-net-{n}"})),
+        ("link", "GET /link/{id}", get(f"/link/{link_id}")),
+        ("link", "GET /links", get("/links?limit=50")),
+        ("link", "GET /links?coredevice_id", get(f"/links?coredevice_id={device_id}&limit=50")),
+        ("link", "GET /coredevice/{id}/links-to-end-sites", get(f"/coredevice/{device_id}/links-to-end-sites")),
+        ("link", "GET /favorite-links", get("/favorite-links")),
+        ("link", "GET /links/topology", get("/links/topology")),
+        ("link", "GET /links/metrics/top", get("/links/metrics/top?metric=crc&n=20")),
+        ("link", "POST /admin/link/{id}/inject-status", toggle_status),
+        ("site", "GET /site/{id}", get(f"/site/{site_id}")),
+        ("site", "GET /coredevice/{id}/sites", get(f"/coredevice/{device_id}/sites")),
+        ("site", "GET /sites", get("/sites")),
+        ("site", "GET /site/{id}/get-topology", get(f"/site/{site_id}/get-topology")),
+        ("site", "PUT /site/{id}/set-description", request(
+            "PUT", f"/site/{site_id}/set-description", {"description": "bench"})),
+        ("user", "POST /login", request("POST", "/login", {"username": "userg", "password": "x"})),
+        ("user", "GET /users/", get("/users/")),
+        # Same trivial handler with and without the auth dependency: the difference is auth cost
+        ("user", "GET / (no auth)", get("/")),
+        ("user", "GET /users/me", get("/users/me")),
+    ]
+
+
+async def run_case(client, op, concurrency, requests):
+    counter = itertools.count()
+    latencies, errors = [], 0
+
+    async def worker():
+        nonlocal errors
+        while True:
+            n = next(counter)
+            if n >= requests:
+                return
+            start = time.perf_counter()
+            try:
+                await op(client, n)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+    }
+
+
+def open_client(url):
+    if url:
+        return httpx.AsyncClient(base_url=url, timeout=60)
+    import main
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://bench", timeout=60)
+
+
+async def authenticate(client, username):
+    response = await client.post("/login", json={"username": username, "password": "x"})
+    response.raise_for_status()
+    client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+
+def measure_auth(number=2000):
+    """In-process cost of one token verification, uncached and cached, in microseconds."""
+    import main
+    from auth import ClaimsCache
+    token = main.authenticator.issue_token(main.store.all("users")[0])
+    cache, main.authenticator.cache = main.authenticator.cache, ClaimsCache(max_size=0)
+    try:
+        start = time.perf_counter()
+        for _ in range(number):
+            main.authenticator.verify(token)
+        uncached = (time.perf_counter() - start) / number * 1e6
+    finally:
+        main.authenticator.cache = cache
+    main.authenticator.verify(token)
+    start = time.perf_counter()
+    for _ in range(number):
+        main.authenticator.verify(token)
+    cached = (time.perf_counter() - start) / number * 1e6
+    return {"verify_uncached_us": uncached, "verify_cached_us": cached}
+
+
+async def discover_ids(client):
+    links = (await client.get("/links?limit=1")).json()
+    sites = (await client.get("/sites")).json()
+    devices = (await client.get("/get_core_devices")).json()
+    alerts = (await client.get("/alerts")).json()
+    if not (links and sites and devices):
+        raise SystemExit("Dataset needs at least one link, site and core device")
+    device = devices[len(devices) // 2]
+    return {
+        "link": links[0]["id"],
+        "site": sites[len(sites) // 2]["id"],
+        "device": device["id"],
+        "coresite": device["coresite_id"],
+        "crawl": alerts["current_crawl_number"],
+    }
+
+
+async def run(args):
+    results = []
+    async with open_client(args.url) as client:
+        await authenticate(client, args.user)
+        cases = build_cases(await discover_ids(client))
+        if args.routes:
+            cases = [c for c in cases if c[0] in args.routes]
+        for concurrency in args.concurrency:
+            for router, name, op in cases:
+                await run_case(client, op, concurrency, args.warmup)
+                stats = await run_case(client, op, concurrency, args.requests)
+                stats.update({"router": router, "route": name, "concurrency": concurrency})
+                results.append(stats)
+                print(f"{router:11} {name:42} c={concurrency:<4} {stats['throughput_rps']:9.1f} rps  "
+                      f"p50 {stats['p50_ms']:8.2f}  p95 {stats['p95_ms']:8.2f}  p99 {stats['p99_ms']:8.2f} ms"
+                      + (f"  errors {stats['errors']}" if stats["errors"] else ""))
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Returns the regressions of `results` against `baseline` as printable lines."""
+    previous = {(r["route"], r["concurrency"]): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        base = previous.get((r["route"], r["concurrency"]))
+        if base is None:
+            continue
+        if base["p95_ms"] and r["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{r['route']} c={r['concurrency']}: p95 {base['p95_ms']:.2f} -> {r['p95_ms']:.2f} ms")
+        if r["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{r['route']} c={r['concurrency']}: throughput "
+                               f"{base['throughput_rps']:.1f} -> {r['throughput_rps']:.1f} rps")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--dataset", help="in-process dataset (SPIDERWEB_DATASET): demo, a preset size or an NDJSON path")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per route and concurrency")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--routes", nargs="+", help="only these routers (alerts, coredevice, coresite, network, link, site, user)")
+    parser.add_argument("--user", default="admin", help="user to log in as (admin routes need an admin)")
+    parser.add_argument("--out", help="save results as JSON")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    args = parser.parse_args()
+
+    if args.dataset:
+        os.environ["SPIDERWEB_DATASET"] = args.dataset
+
+    results = asyncio.run(run(args))
+    auth = None
+    if not args.url:
+        auth = measure_auth()
+        print(f"auth: verify {auth['verify_uncached_us']:.1f} us uncached, {auth['verify_cached_us']:.1f} us cached")
+    report = {
+        "created_at": datetime.utcnow().isoformat(),
+        "target": args.url or "in-process",
+        "dataset": os.environ.get("SPIDERWEB_DATASET", "demo") if not args.url else None,
+        "python": platform.python_version(),
+        "auth": auth,
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved results to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print("\nNo regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
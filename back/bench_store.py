@@ -0,0 +1,109 @@
+"""
+Micro-benchmark: linear list scans (the old route code) vs Store lookups.
+
+Builds a synthetic inventory of the requested size so the numbers do not
+depend on the random dummy data, then times the lookups each route does.
+
+    python bench_store.py --links 50000 --devices 2000 --sites 5000
+"""
+import argparse
+import random
+import timeit
+
+from store import Store
+
+
+def build_inventory(num_links, num_devices, num_sites, num_coresites=50, seed=1):
+    rng = random.Random(seed)
+    core_sites = [{"id": i, "name": f"cs-{i}", "network_ids": [1 + i % 2]} for i in range(1, num_coresites + 1)]
+    core_devices = [
+        {"id": i, "name": f"rtr-{i}", "coresite_id": rng.randint(1, num_coresites), "network_ids": [1]}
+        for i in range(1, num_devices + 1)
+    ]
+    sites = [
+        {"id": i, "name": f"site-{i}", "coredevice_ids": [rng.randint(1, num_devices) for _ in range(rng.randint(1, 2))]}
+        for i in range(1, num_sites + 1)
+    ]
+    links = [
+        {
+            "id": i,
+            "coredevice_id": rng.randint(1, num_devices),
+            "neighbor_coredevice_id": rng.randint(1, num_devices),
+            "neighbor_is_core": rng.random() < 0.5,
+        }
+        for i in range(1, num_links + 1)
+    ]
+    return {
+        "networks": [{"id": 1, "name": "L"}, {"id": 2, "name": "P"}],
+        "core_sites": core_sites,
+        "core_devices": core_devices,
+        "sites": sites,
+        "links": links,
+        "users": [],
+        "alerts": [],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--links", type=int, default=50000)
+    parser.add_argument("--devices", type=int, default=2000)
+    parser.add_argument("--sites", type=int, default=5000)
+    parser.add_argument("--number", type=int, default=200, help="lookups per measurement")
+    args = parser.parse_args()
+
+    db = build_inventory(args.links, args.devices, args.sites)
+    store = Store(db)
+    rng = random.Random(2)
+    link_id = rng.randint(1, args.links)
+    site_id = rng.randint(1, args.sites)
+    device_id = rng.randint(1, args.devices)
+    coresite_id = db["core_devices"][device_id - 1]["coresite_id"]
+
+    cases = [
+        (
+            "get_link",
+            lambda: next((l for l in db["links"] if l["id"] == link_id), None),
+            lambda: store.get("links", link_id),
+        ),
+        (
+            "get_site",
+            lambda: next((s for s in db["sites"] if s["id"] == site_id), None),
+            lambda: store.get("sites", site_id),
+        ),
+        (
+            "get_core_devices_by_coresite",
+            lambda: [d for d in db["core_devices"] if d["coresite_id"] == coresite_id],
+            lambda: store.find("core_devices", "coresite_id", coresite_id),
+        ),
+        (
+            "get_sites_of_coredevice",
+            lambda: [s for s in db["sites"] if device_id in s["coredevice_ids"]],
+            lambda: store.find("sites", "coredevice_ids", device_id),
+        ),
+        (
+            "get_links_to_end_sites",
+            lambda: [l for l in db["links"] if l["coredevice_id"] == device_id and not l["neighbor_is_core"]],
+            lambda: [l for l in store.find("links", "coredevice_id", device_id) if not l["neighbor_is_core"]],
+        ),
+    ]
+
+    print(f"links={args.links} devices={args.devices} sites={args.sites} number={args.number}")
+    print(f"{'lookup':32} {'scan us':>12} {'store us':>12} {'speedup':>10}")
+    for name, old, new in cases:
+        assert _ids(old()) == _ids(new()), name
+        old_us = timeit.timeit(old, number=args.number) / args.number * 1e6
+        new_us = timeit.timeit(new, number=args.number) / args.number * 1e6
+        print(f"{name:32} {old_us:12.2f} {new_us:12.2f} {old_us / new_us:9.0f}x")
+
+
+def _ids(result):
+    if result is None:
+        return None
+    if isinstance(result, dict):
+        return result["id"]
+    return sorted(r["id"] for r in result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+import csv
+import io
+import json
+
+from references import delete_blocker
+
+# Tables the bulk admin endpoints write
+BULK_TABLES = ("networks", "core_sites", "core_devices")
+
+
+class BatchError(ValueError):
+    """The batch body could not be parsed at all."""
+
+
+def new_network(record_id, name):
+    return {"id": record_id, "name": name}
+
+
+def new_coresite(record_id, name, network_ids=()):
+    return {"id": record_id, "name": name, "core_site_name": name, "network_ids": list(network_ids)}
+
+
+def new_coredevice(record_id, name, ip, coresite_id, network_ids=()):
+    return {
+        "id": record_id,
+        "name": name,
+        "hostname": name,
+        "ip": ip,
+        "ip_address": ip,
+        "coresite_id": coresite_id,
+        "core_pikudim_site_id": coresite_id,
+        "network_ids": list(network_ids),
+        "network_type_id": 1,
+    }
+
+
+# ==============================================================================
+# PARSING
+# ==============================================================================
+
+def parse_batch(body, content_type=""):
+    """
+    Rows of a batch, from NDJSON (one object per line) or, when the content
+    type says CSV, a CSV file with a header row. Each row is a create unless
+    its "op" is "delete".
+    """
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise BatchError("Batch must be UTF-8")
+    if "csv" in content_type:
+        return [_csv_row(row) for row in csv.DictReader(io.StringIO(text))]
+    rows = []
+    for number, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            raise BatchError(f"Line {number} is not valid JSON")
+        if not isinstance(row, dict):
+            raise BatchError(f"Line {number} is not a JSON object")
+        rows.append(row)
+    return rows
+
+
+def _csv_row(row):
+    row = {k.strip(): v.strip() for k, v in row.items() if k and v is not None and v.strip() != ""}
+    for field in ("id", "coresite_id"):
+        if field in row:
+            row[field] = _csv_int(row[field])
+    if "network_ids" in row:
+        value = row["network_ids"]
+        if value.startswith("["):
+            try:
+                row["network_ids"] = json.loads(value)
+            except ValueError:
+                # Left as text for validation to report on the row
+                pass
+        else:
+            row["network_ids"] = [_csv_int(v) for v in value.replace(";", " ").split()]
+    return row
+
+
+def _csv_int(value):
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+# ==============================================================================
+# VALIDATION / APPLY
+# ==============================================================================
+
+def _is_id(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class _Batch:
+    """Validation state of one batch: names and ids it creates or deletes before any write."""
+
+    def __init__(self, store, table):
+        self.store = store
+        self.table = table
+        self.new_names = set()
+        self.freed_names = set()
+        self.deleted_ids = set()
+
+    def name_taken(self, name):
+        if name in self.new_names:
+            return True
+        return name not in self.freed_names and bool(self.store.find(self.table, "name", name))
+
+    def check_network_ids(self, network_ids):
+        if not isinstance(network_ids, list) or not all(_is_id(n) for n in network_ids):
+            return "network_ids must be a list of ids"
+        missing = [n for n in network_ids if self.store.get("networks", n) is None]
+        return f"Unknown network ids {missing}" if missing else None
+
+    def check_create(self, row):
+        name = row.get("name")
+        if not isinstance(name, str) or not name.strip():
+            return "name is required"
+        if self.name_taken(name):
+            return f"{name!r} already exists"
+        if self.table in ("core_sites", "core_devices") and "network_ids" in row:
+            error = self.check_network_ids(row["network_ids"])
+            if error:
+                return error
+        if self.table == "core_devices":
+            if not isinstance(row.get("ip"), str) or not row["ip"]:
+                return "ip is required"
+            if not _is_id(row.get("coresite_id")):
+                return "coresite_id is required"
+            if self.store.get("core_sites", row["coresite_id"]) is None:
+                return f"Unknown coresite {row['coresite_id']}"
+        self.new_names.add(name)
+        return None
+
+    def check_delete(self, row):
+        """Returns (record, error)."""
+        if "id" in row:
+            if not _is_id(row["id"]):
+                return None, "id must be an integer"
+            record = self.store.get(self.table, row["id"])
+        elif isinstance(row.get("name"), str):
+            found = self.store.find(self.table, "name", row["name"])
+            record = found[0] if found else None
+        else:
+            return None, "delete needs an id or a name"
+        if record is None or record["id"] in self.deleted_ids:
+            return None, "not found"
+        blocker = delete_blocker(self.store, self.table, record["id"])
+        if blocker:
+            return None, blocker
+        self.deleted_ids.add(record["id"])
+        self.freed_names.add(record["name"])
+        return record, None
+
+
+def _build(store, table, row):
+    record_id = store.next_id(table)
+    if table == "networks":
+        return new_network(record_id, row["name"])
+    if table == "core_sites":
+        return new_coresite(record_id, row["name"], row.get("network_ids", ()))
+    return new_coredevice(record_id, row["name"], row["ip"], row["coresite_id"], row.get("network_ids", ()))
+
+
+def apply_batch(store, table, rows, dry_run=False):
+    """
+    Validates every row of the batch, then applies all of them in order in
+    one store transaction, or none if any row is invalid (or on a dry run).
+
+    Names are checked through the name index and against the rest of the
+    batch, references through the id and foreign-key indexes, and new ids
+    come from the store's counter, so a batch costs O(rows) whatever the
+    inventory size. Returns per-row results and totals.
+    """
+    if table not in BULK_TABLES:
+        raise ValueError(f"Bulk writes are not supported for {table}")
+    results = []
+    with store.transaction():
+        batch = _Batch(store, table)
+        planned = []
+        for number, row in enumerate(rows, 1):
+            op = row.get("op", "create")
+            result = {"row": number, "op": op, "status": "ok"}
+            if op == "create":
+                error = batch.check_create(row)
+                target = row
+            elif op == "delete":
+                target, error = batch.check_delete(row)
+                if target is not None:
+                    result.update(id=target["id"], name=target["name"])
+            else:
+                error = f"Unknown op {op!r}"
+            if error:
+                result.update(status="error", error=error)
+            else:
+                planned.append((op, target, result))
+            results.append(result)
+
+        errors = len(rows) - len(planned)
+        applied = not errors and not dry_run
+        if applied:
+            for op, target, result in planned:
+                if op == "create":
+                    record = store.insert(table, _build(store, table, target))
+                    result.update(id=record["id"], name=record["name"])
+                else:
+                    store.delete(table, target["id"])
+
+    return {
+        "applied": applied,
+        "dry_run": dry_run,
+        "created": sum(1 for op, _, _ in planned if op == "create") if applied else 0,
+        "deleted": sum(1 for op, _, _ in planned if op == "delete") if applied else 0,
+        "errors": errors,
+        "results": results,
+    }
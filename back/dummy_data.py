@@ -1,14 +1,22 @@
+import argparse
+import gzip
+import json
+import os
 import random
+import sys
+import time
 from faker import Faker
 from datetime import datetime, timedelta
 
-fake = Faker()
-
-def generate_dummy_data():
+def generate_dummy_data(seed=0):
     """
     Generates a complete, interconnected set of dummy data for the application.
+    The same seed always gives the same names and addresses.
     """
     print("Generating dummy data...")
+    rng = random.Random(seed)
+    gen_fake = Faker()
+    gen_fake.seed_instance(seed)
 
     # --- Net Types ---
     net_types = [
@@ -19,20 +27,20 @@ def generate_dummy_data():
     # --- Core Sites (Pikudim) ---
     core_sites = []
     for i in range(1, 7):
-        core_sites.append({"id": i, "name": f"Pikud {fake.city()}", "network_ids": [1]})
+        core_sites.append({"id": i, "name": f"Pikud {gen_fake.city()}", "network_ids": [1]})
     for i in range(7, 12):
-        core_sites.append({"id": i, "name": f"Pikud {fake.city()}", "network_ids": [2]})
+        core_sites.append({"id": i, "name": f"Pikud {gen_fake.city()}", "network_ids": [2]})
 
     # --- Core Devices ---
     core_devices = []
     device_id_counter = 1
     allowed_endings = [4, 5, 1, 2, 7, 8]
     for cs in core_sites:
-        num_devices = random.randint(2, 6)
+        num_devices = rng.randint(2, 6)
         for i in range(num_devices):
-            ending = allowed_endings[i] if i < len(allowed_endings) else random.choice(allowed_endings)
-            dev_name = f"rtr-{fake.word()}-{ending}"
-            dev_ip = fake.ipv4()
+            ending = allowed_endings[i] if i < len(allowed_endings) else rng.choice(allowed_endings)
+            dev_name = f"rtr-{gen_fake.word()}-{ending}"
+            dev_ip = gen_fake.ipv4()
             device = {
                 "id": device_id_counter,
                 "name": dev_name,
@@ -51,14 +59,14 @@ def generate_dummy_data():
     sites = []
     site_id_counter = 1
     for _ in range(150):
-        site_name = fake.company()
-        site_desc = fake.bs()
+        site_name = gen_fake.company()
+        site_desc = gen_fake.bs()
         site = {
             "id": site_id_counter,
             "name": site_name,
             "topology": "{}",
             "description": site_desc,
-            "coredevice_ids": [random.choice(core_devices)["id"] for _ in range(random.randint(1,2))]
+            "coredevice_ids": [rng.choice(core_devices)["id"] for _ in range(rng.randint(1,2))]
         }
         sites.append(site)
         site_id_counter += 1
@@ -94,12 +102,12 @@ def generate_dummy_data():
                 "neighbor_ip": dev2["ip"],
                 "neighbor_is_core": True,
                 "description": f"Internal Core Link between {dev1['name']} and {dev2['name']}",
-                "cdp": f"neighbor-switch-{fake.word()}",
+                "cdp": f"neighbor-switch-{gen_fake.word()}",
                 "physical_status": "Up",
                 "protocol_status": "Up",
                 "mpls_ldp": "Enabled",
                 "isis": "Enabled",
-                "espf_interface_address": fake.ipv4(),
+                "espf_interface_address": gen_fake.ipv4(),
                 "bw": "10G",
                 "bandwidth": "10G",
                 "media_type": "Fiber",
@@ -134,8 +142,8 @@ def generate_dummy_data():
                 break
             attempts = 0
             while attempts < 100:
-                d1 = random.choice(dev_list)
-                d2 = random.choice(dev_list)
+                d1 = rng.choice(dev_list)
+                d2 = rng.choice(dev_list)
                 if d1["coresite_id"] == d2["coresite_id"]:
                     attempts += 1
                     continue
@@ -154,25 +162,25 @@ def generate_dummy_data():
                     "neighbor_ip": d2["ip"],
                     "neighbor_is_core": True,
                     "description": f"Inter-Site Link between {d1['name']} and {d2['name']}",
-                    "cdp": f"neighbor-switch-{fake.word()}",
-                    "physical_status": random.choice(["Up", "Up", "Down"]),
-                    "protocol_status": random.choice(["Up", "Up", "Down"]),
+                    "cdp": f"neighbor-switch-{gen_fake.word()}",
+                    "physical_status": rng.choice(["Up", "Up", "Down"]),
+                    "protocol_status": rng.choice(["Up", "Up", "Down"]),
                     "mpls_ldp": "Enabled",
                     "isis": "Enabled",
-                    "espf_interface_address": fake.ipv4(),
+                    "espf_interface_address": gen_fake.ipv4(),
                     "bw": "10G",
                     "bandwidth": "10G",
                     "media_type": "Fiber",
-                    "input_rate": f"{random.randint(1,9)} Gbps",
-                    "output_rate": f"{random.randint(1,9)} Gbps",
-                    "rx": f"-{random.uniform(1, 5):.1f} dBm",
-                    "tx": f"-{random.uniform(1, 5):.1f} dBm",
-                    "input_errors": str(random.randint(0, 10)),
-                    "output_errors": str(random.randint(0, 5)),
-                    "crc": str(random.randint(0, 2)),
-                    "created_at": (datetime.utcnow() - timedelta(days=random.uniform(1, 30))).isoformat(),
-                    "updated_at": (datetime.utcnow() - timedelta(hours=random.choice([random.uniform(0.1, 23), random.uniform(25, 160), random.uniform(170, 700)]))).isoformat(),
-                    "status_changed_at": (datetime.utcnow() - timedelta(hours=random.choice([random.uniform(0.1, 23), random.uniform(25, 160), random.uniform(170, 700)]))).isoformat(),
+                    "input_rate": f"{rng.randint(1,9)} Gbps",
+                    "output_rate": f"{rng.randint(1,9)} Gbps",
+                    "rx": f"-{rng.uniform(1, 5):.1f} dBm",
+                    "tx": f"-{rng.uniform(1, 5):.1f} dBm",
+                    "input_errors": str(rng.randint(0, 10)),
+                    "output_errors": str(rng.randint(0, 5)),
+                    "crc": str(rng.randint(0, 2)),
+                    "created_at": (datetime.utcnow() - timedelta(days=rng.uniform(1, 30))).isoformat(),
+                    "updated_at": (datetime.utcnow() - timedelta(hours=rng.choice([rng.uniform(0.1, 23), rng.uniform(25, 160), rng.uniform(170, 700)]))).isoformat(),
+                    "status_changed_at": (datetime.utcnow() - timedelta(hours=rng.choice([rng.uniform(0.1, 23), rng.uniform(25, 160), rng.uniform(170, 700)]))).isoformat(),
                     "crawler_cycle_id": 1,
                 })
                 link_id_counter += 1
@@ -182,25 +190,37 @@ def generate_dummy_data():
     generate_inter_site_links(p_top_devices, 30)
 
     # 3. Generate additional random links for all devices (background data / detail views)
+    devices_by_coresite = {}
+    for d in core_devices:
+        devices_by_coresite.setdefault(d["coresite_id"], []).append(d)
+
     for device in core_devices:
-        same_zone = [d for d in core_devices if d["coresite_id"] == device["coresite_id"] and d["id"] != device["id"]]
-        other_zone = [d for d in core_devices if d["coresite_id"] != device["coresite_id"]]
+        same_zone = devices_by_coresite[device["coresite_id"]]
         
-        for _ in range(random.randint(2, 4)):
-            if same_zone and random.random() < 0.5:
-                neighbor = random.choice(same_zone)
+        for _ in range(rng.randint(2, 4)):
+            # Neighbors are rejection-sampled rather than drawn from per-device
+            # lists; the device itself is never a candidate
+            if len(same_zone) > 1 and rng.random() < 0.5:
+                neighbor = device
+                while neighbor["id"] == device["id"]:
+                    neighbor = rng.choice(same_zone)
+            elif len(same_zone) < len(core_devices):
+                neighbor = rng.choice(core_devices)
+                while neighbor["coresite_id"] == device["coresite_id"]:
+                    neighbor = rng.choice(core_devices)
+            elif len(core_devices) > 1:
+                neighbor = device
+                while neighbor["id"] == device["id"]:
+                    neighbor = rng.choice(core_devices)
             else:
-                neighbor = random.choice(other_zone) if other_zone else random.choice(core_devices)
-            
-            if neighbor["id"] == device["id"]:
                 continue
-                
+
             pair = tuple(sorted([device["id"], neighbor["id"]]))
             if pair in created_pairs:
                 continue
             created_pairs.add(pair)
             
-            is_core = random.choice([True, False])
+            is_core = rng.choice([True, False])
             links.append({
                 "id": link_id_counter,
                 "coredevice_id": device["id"],
@@ -210,23 +230,23 @@ def generate_dummy_data():
                 "neighbor_ip": neighbor["ip"],
                 "neighbor_is_core": is_core,
                 "description": f"Link between {device['name']} and {neighbor['name']}",
-                "cdp": f"neighbor-switch-{fake.word()}",
-                "physical_status": random.choice(["Up", "Down"]),
-                "protocol_status": random.choice(["Up", "Down"]),
-                "mpls_ldp": random.choice(["Enabled", "Disabled"]),
-                "isis": random.choice(["Enabled", "Disabled"]),
-                "espf_interface_address": fake.ipv4(),
-                "bw": random.choice(["10G", "40G", "100G"]),
-                "bandwidth": random.choice(["10G", "40G", "100G"]),
+                "cdp": f"neighbor-switch-{gen_fake.word()}",
+                "physical_status": rng.choice(["Up", "Down"]),
+                "protocol_status": rng.choice(["Up", "Down"]),
+                "mpls_ldp": rng.choice(["Enabled", "Disabled"]),
+                "isis": rng.choice(["Enabled", "Disabled"]),
+                "espf_interface_address": gen_fake.ipv4(),
+                "bw": rng.choice(["10G", "40G", "100G"]),
+                "bandwidth": rng.choice(["10G", "40G", "100G"]),
                 "media_type": "Fiber",
-                "input_rate": f"{random.randint(1,9)} Gbps",
-                "output_rate": f"{random.randint(1,9)} Gbps",
-                "rx": f"-{random.uniform(1, 5):.1f} dBm",
-                "tx": f"-{random.uniform(1, 5):.1f} dBm",
-                "input_errors": str(random.randint(0, 10)),
-                "output_errors": str(random.randint(0, 5)),
-                "crc": str(random.randint(0, 2)),
-                "created_at": (datetime.utcnow() - timedelta(days=random.randint(0, 30))).isoformat(),
+                "input_rate": f"{rng.randint(1,9)} Gbps",
+                "output_rate": f"{rng.randint(1,9)} Gbps",
+                "rx": f"-{rng.uniform(1, 5):.1f} dBm",
+                "tx": f"-{rng.uniform(1, 5):.1f} dBm",
+                "input_errors": str(rng.randint(0, 10)),
+                "output_errors": str(rng.randint(0, 5)),
+                "crc": str(rng.randint(0, 2)),
+                "created_at": (datetime.utcnow() - timedelta(days=rng.randint(0, 30))).isoformat(),
                 "updated_at": datetime.utcnow().isoformat(),
                 "crawler_cycle_id": 1,
             })
@@ -242,16 +262,16 @@ def generate_dummy_data():
     alerts = []
     alert_id_counter = 1
     for _ in range(50):
-        device = random.choice(core_devices)
+        device = rng.choice(core_devices)
         alert = {
             "id": alert_id_counter,
-            "type": random.choice(["error", "warning", "info"]),
-            "message": fake.sentence(nb_words=6),
-            "timestamp": (datetime.utcnow() - timedelta(minutes=random.randint(1, 1440))).isoformat(),
-            "network_line": f"Line-{random.randint(1,10)}",
-            "source": f"System-{random.choice(['A', 'B', 'C'])}",
-            "severity_score": random.randint(1, 10),
-            "details": {"info": fake.sentence(), "remediation": "Check device logs."},
+            "type": rng.choice(["error", "warning", "info"]),
+            "message": gen_fake.sentence(nb_words=6),
+            "timestamp": (datetime.utcnow() - timedelta(minutes=rng.randint(1, 1440))).isoformat(),
+            "network_line": f"Line-{rng.randint(1,10)}",
+            "source": f"System-{rng.choice(['A', 'B', 'C'])}",
+            "severity_score": rng.randint(1, 10),
+            "details": {"info": gen_fake.sentence(), "remediation": "Check device logs."},
             "draw_number": 1,
             "coredevice_name": device["name"],
             "coredevice_id": device["id"]
@@ -279,5 +299,263 @@ def generate_dummy_data():
         "crawler_cycle": {"id": 1, "count": 125}
     }
 
-# Generate and store data in a variable
-DUMMY_DB = generate_dummy_data()
\ No newline at end of file
+
+# ==============================================================================
+# SCALABLE INVENTORY GENERATOR
+# ==============================================================================
+# Seeded and streaming: records are yielded one at a time as (table, record),
+# only the core devices are held in memory, and every step is linear in its
+# output. Use it for load tests; generate_dummy_data() stays the demo dataset.
+
+DATASET_SIZES = {
+    "small": {"coresites": 20, "devices": 200, "sites": 1000, "links_per_device": 4, "alerts": 500},
+    "medium": {"coresites": 100, "devices": 5000, "sites": 20000, "links_per_device": 5, "alerts": 5000},
+    "large": {"coresites": 500, "devices": 100000, "sites": 200000, "links_per_device": 10, "alerts": 50000},
+}
+
+TABLE_ORDER = ("networks", "net_types", "core_sites", "core_devices", "sites", "links", "users", "alerts")
+
+_WORD_POOL_SIZE = 1000
+
+
+def _ip(n):
+    return f"{(n >> 24) & 255}.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}"
+
+
+def generate_inventory(coresites=11, devices=40, sites=150, links_per_device=3, alerts=50, seed=0, base_time=None):
+    """
+    Yields (table, record) pairs for a synthetic inventory of the given size,
+    in TABLE_ORDER. The same arguments and seed always give the same data
+    (relative to `base_time`, which defaults to now).
+
+    Devices are laid out in contiguous blocks per coresite and every device
+    originates `links_per_device` links towards distinct positive offsets
+    below devices/2, so no device pair is linked twice and no pair set has
+    to be kept. Small offsets mostly stay inside the coresite.
+    """
+    rng = random.Random(seed)
+    gen_fake = Faker()
+    gen_fake.seed_instance(seed)
+    words = [gen_fake.word() for _ in range(_WORD_POOL_SIZE)]
+    cities = [gen_fake.city() for _ in range(_WORD_POOL_SIZE)]
+    companies = [gen_fake.company() for _ in range(_WORD_POOL_SIZE)]
+    phrases = [gen_fake.bs() for _ in range(_WORD_POOL_SIZE)]
+    sentences = [gen_fake.sentence(nb_words=6) for _ in range(_WORD_POOL_SIZE)]
+    base_time = base_time or datetime.utcnow()
+    allowed_endings = [4, 5, 1, 2, 7, 8]
+
+    for table in ("networks", "net_types"):
+        yield table, {"id": 1, "name": "L-Chart Network"}
+        yield table, {"id": 2, "name": "P-Chart Network"}
+
+    # Same L/P split as the demo data: the first 6/11 of the coresites are L-Chart
+    l_chart_count = max(1, coresites * 6 // 11)
+    for i in range(1, coresites + 1):
+        yield "core_sites", {
+            "id": i,
+            "name": f"Pikud {cities[i % len(cities)]} {i}",
+            "network_ids": [1 if i <= l_chart_count else 2],
+        }
+
+    core_devices = []
+    position, previous_coresite = 0, None
+    for i in range(devices):
+        coresite_id = i * coresites // devices + 1
+        network_id = 1 if coresite_id <= l_chart_count else 2
+        position = position + 1 if coresite_id == previous_coresite else 0
+        previous_coresite = coresite_id
+        ending = allowed_endings[position % len(allowed_endings)]
+        name = f"rtr-{words[rng.randrange(len(words))]}{i + 1}-{ending}"
+        ip = _ip((10 << 24) + i + 1)
+        device = {
+            "id": i + 1,
+            "name": name,
+            "hostname": name,
+            "ip": ip,
+            "ip_address": ip,
+            "coresite_id": coresite_id,
+            "core_pikudim_site_id": coresite_id,
+            "network_ids": [network_id],
+            "network_type_id": network_id,
+        }
+        core_devices.append(device)
+        yield "core_devices", device
+
+    for i in range(1, sites + 1):
+        yield "sites", {
+            "id": i,
+            "name": f"{companies[rng.randrange(len(companies))]} {i}",
+            "topology": "{}",
+            "description": phrases[rng.randrange(len(phrases))],
+            "coredevice_ids": rng.sample(range(1, devices + 1), min(devices, rng.randint(1, 2))),
+        }
+
+    link_id = 0
+    max_offset = (devices - 1) // 2
+    block = max(2, devices // coresites)
+    for device in core_devices:
+        count = min(links_per_device, max_offset)
+        offsets = set()
+        while len(offsets) < count:
+            if rng.random() < 0.5:
+                offsets.add(rng.randint(1, min(block, max_offset)))
+            else:
+                offsets.add(rng.randint(1, max_offset))
+        for offset in sorted(offsets):
+            neighbor = core_devices[(device["id"] - 1 + offset) % devices]
+            link_id += 1
+            yield "links", _generated_link(link_id, device, neighbor, rng, base_time, words)
+
+    yield "users", {"id": 1, "username": "admin", "role": "admin", "favorite_links": [1, 3, 5]}
+    yield "users", {"id": 2, "username": "userg", "role": "user", "favorite_links": [2, 4]}
+
+    # Every alert is raised by a device
+    if not core_devices:
+        return
+    for i in range(1, alerts + 1):
+        device = core_devices[rng.randrange(devices)]
+        yield "alerts", {
+            "id": i,
+            "type": rng.choice(["error", "warning", "info"]),
+            "message": sentences[rng.randrange(len(sentences))],
+            "timestamp": (base_time - timedelta(minutes=rng.randint(1, 1440))).isoformat(),
+            "network_line": f"Line-{rng.randint(1, 10)}",
+            "source": f"System-{rng.choice(['A', 'B', 'C'])}",
+            "severity_score": rng.randint(1, 10),
+            "details": {"info": sentences[rng.randrange(len(sentences))], "remediation": "Check device logs."},
+            "draw_number": 1,
+            "coredevice_name": device["name"],
+            "coredevice_id": device["id"],
+        }
+
+
+_BANDWIDTHS = ("10G", "40G", "100G")
+_ENABLED = ("Enabled", "Disabled")
+
+
+def _generated_link(link_id, device, neighbor, rng, base_time, words):
+    # rng.random() arithmetic instead of randint/choice: this runs once per link
+    rnd = rng.random
+    bandwidth = _BANDWIDTHS[int(rnd() * 3)]
+    return {
+        "id": link_id,
+        "coredevice_id": device["id"],
+        "neighbor_coredevice_id": neighbor["id"],
+        "network_type_id": device["network_type_id"],
+        "network_ids": device["network_ids"],
+        "neighbor_ip": neighbor["ip"],
+        "neighbor_is_core": neighbor["coresite_id"] != device["coresite_id"] or rnd() < 0.5,
+        "description": f"Link between {device['name']} and {neighbor['name']}",
+        "cdp": f"neighbor-switch-{words[int(rnd() * len(words))]}",
+        "physical_status": "Up" if rnd() < 0.8 else "Down",
+        "protocol_status": "Up" if rnd() < 0.8 else "Down",
+        "mpls_ldp": _ENABLED[int(rnd() * 2)],
+        "isis": _ENABLED[int(rnd() * 2)],
+        "espf_interface_address": _ip((100 << 24) + (64 << 16) + link_id),
+        "bw": bandwidth,
+        "bandwidth": bandwidth,
+        "media_type": "Fiber",
+        "input_rate": f"{int(rnd() * 9) + 1} Gbps",
+        "output_rate": f"{int(rnd() * 9) + 1} Gbps",
+        "rx": f"-{1 + 4 * rnd():.1f} dBm",
+        "tx": f"-{1 + 4 * rnd():.1f} dBm",
+        "input_errors": str(int(rnd() * 11)),
+        "output_errors": str(int(rnd() * 6)),
+        "crc": str(int(rnd() * 3)),
+        "created_at": (base_time - timedelta(days=1 + 29 * rnd())).isoformat(),
+        "updated_at": (base_time - timedelta(hours=0.1 + 700 * rnd())).isoformat(),
+        "status_changed_at": (base_time - timedelta(hours=0.1 + 700 * rnd())).isoformat(),
+        "crawler_cycle_id": 1,
+    }
+
+
+def _open_text(path, mode):
+    if path == "-":
+        return sys.stdout if "w" in mode else sys.stdin
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def write_ndjson(records, path):
+    """Streams (table, record) pairs to `path` (gzip if it ends in .gz), one JSON object per line."""
+    count = 0
+    encode = json.JSONEncoder(separators=(",", ":")).encode
+    out = _open_text(path, "w")
+    try:
+        for table, record in records:
+            out.write(encode({"table": table, "record": record}) + "\n")
+            count += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return count
+
+
+def read_ndjson(path):
+    """Yields the (table, record) pairs written by write_ndjson."""
+    with _open_text(path, "r") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                yield row["table"], row["record"]
+
+
+def collect(records):
+    """Builds the DUMMY_DB-shaped dict from (table, record) pairs."""
+    data = {table: [] for table in TABLE_ORDER}
+    for table, record in records:
+        data.setdefault(table, []).append(record)
+    data["crawler_cycle"] = {"id": 1, "count": 125}
+    return data
+
+
+def load_dataset(dataset=None, seed=None):
+    """
+    Returns the backend's startup data. `dataset` (default: the
+    SPIDERWEB_DATASET environment variable) is "demo" for the classic dummy
+    data, a size from DATASET_SIZES, or the path of an NDJSON dump. Generated
+    datasets use `seed` (default: SPIDERWEB_SEED, else 0).
+    """
+    dataset = dataset or os.environ.get("SPIDERWEB_DATASET", "demo")
+    seed = int(seed if seed is not None else os.environ.get("SPIDERWEB_SEED", 0))
+    if dataset == "demo":
+        return generate_dummy_data(seed=seed)
+    if dataset in DATASET_SIZES:
+        print(f"Generating '{dataset}' dataset (seed {seed})...")
+        return collect(generate_inventory(seed=seed, **DATASET_SIZES[dataset]))
+    print(f"Loading dataset from {dataset}...")
+    return collect(read_ndjson(dataset))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a seeded synthetic Spiderweb inventory as NDJSON.")
+    parser.add_argument("--size", choices=sorted(DATASET_SIZES), help="preset sizes (overridden by explicit counts)")
+    parser.add_argument("--coresites", type=int)
+    parser.add_argument("--devices", type=int)
+    parser.add_argument("--sites", type=int)
+    parser.add_argument("--links-per-device", type=int)
+    parser.add_argument("--alerts", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--base-time", type=datetime.fromisoformat,
+                        help="ISO time the generated timestamps count back from (default: now)")
+    parser.add_argument("-o", "--output", default="-", help="output path, .gz to compress, - for stdout")
+    args = parser.parse_args()
+
+    sizes = dict(DATASET_SIZES[args.size]) if args.size else {}
+    for name in ("coresites", "devices", "sites", "links_per_device", "alerts"):
+        if getattr(args, name) is not None:
+            sizes[name] = getattr(args, name)
+    for name, count in sizes.items():
+        if count < 1:
+            parser.error(f"--{name.replace('_', '-')} must be at least 1")
+
+    start = time.perf_counter()
+    records = generate_inventory(seed=args.seed, base_time=args.base_time, **sizes)
+    count = write_ndjson(records, args.output)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {count} records in {elapsed:.1f}s ({count / elapsed:,.0f} records/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+import threading
+from collections import OrderedDict, deque
+
+# Link fields that decide whether (and where) a link is an edge of the graph
+EDGE_FIELDS = {"coredevice_id", "neighbor_coredevice_id", "physical_status", "protocol_status", "network_ids"}
+
+# Fields per table that query results read besides which records exist:
+# inserts, deletes and updates touching these drop the cached results
+RESULT_FIELDS = {
+    "links": EDGE_FIELDS,
+    "core_devices": {"network_ids"},
+    "sites": {"coredevice_ids"},
+}
+
+
+def link_is_up(link):
+    return (str(link.get("physical_status", "")).lower() == "up"
+            and str(link.get("protocol_status", "")).lower() == "up")
+
+
+class _Analysis:
+    """
+    Connectivity facts of one graph version, from a single iterative DFS
+    (Tarjan's low-link) rooted in the backbone, the largest component:
+    which links are bridges and, for every device, the preorder range of its
+    DFS subtree. Cutting a bridge or removing a device then disconnects
+    whole subtrees, i.e. preorder ranges, so failure impact needs no new
+    traversal.
+    """
+
+    def __init__(self, adjacency):
+        self.component = {}
+        sizes = []
+        for start in adjacency:
+            if start in self.component:
+                continue
+            label = len(sizes)
+            self.component[start] = label
+            queue, size = deque([start]), 0
+            while queue:
+                node = queue.popleft()
+                size += 1
+                for neighbor in adjacency[node]:
+                    if neighbor not in self.component:
+                        self.component[neighbor] = label
+                        queue.append(neighbor)
+            sizes.append(size)
+        self.backbone = max(range(len(sizes)), key=sizes.__getitem__) if sizes else None
+        root = None
+        if self.backbone is not None:
+            root = max((n for n, c in self.component.items() if c == self.backbone),
+                       key=lambda n: (len(adjacency[n]), -n))
+        self.root = root
+        self.pre, self.end, self.low, self.parent = {}, {}, {}, {}
+        self.order = []
+        if root is not None:
+            self._dfs(adjacency, root)
+
+    def _dfs(self, adjacency, root):
+        pre, low, parent, order = self.pre, self.low, self.parent, self.order
+        pre[root] = low[root] = 0
+        order.append(root)
+        parent[root] = (None, None)
+        stack = [(root, iter(self._edges(adjacency, root)))]
+        while stack:
+            node, edges = stack[-1]
+            advanced = False
+            for neighbor, link_id in edges:
+                if link_id == parent[node][1]:
+                    continue
+                if neighbor in pre:
+                    low[node] = min(low[node], pre[neighbor])
+                    continue
+                pre[neighbor] = low[neighbor] = len(order)
+                order.append(neighbor)
+                parent[neighbor] = (node, link_id)
+                stack.append((neighbor, iter(self._edges(adjacency, neighbor))))
+                advanced = True
+                break
+            if not advanced:
+                stack.pop()
+                self.end[node] = len(order)
+                up = parent[node][0]
+                if up is not None:
+                    low[up] = min(low[up], low[node])
+
+    @staticmethod
+    def _edges(adjacency, node):
+        return [(neighbor, link_id) for neighbor, links in adjacency[node].items() for link_id in links]
+
+    def in_backbone(self, device_id):
+        return self.backbone is not None and self.component.get(device_id) == self.backbone
+
+    def subtree(self, device_id):
+        return self.order[self.pre[device_id]:self.end[device_id]]
+
+    def cut_by_link(self, a, b, link_id):
+        """Backbone devices cut off when the link a-b goes down."""
+        if not (self.in_backbone(a) and self.in_backbone(b)):
+            return []
+        for child, up in ((a, b), (b, a)):
+            if self.parent.get(child) == (up, link_id) and self.low[child] > self.pre[up]:
+                return self.subtree(child)
+        return []
+
+    def cut_by_device(self, device_id, adjacency):
+        """Backbone devices (including itself) cut off when the device goes down."""
+        if not self.in_backbone(device_id):
+            return []
+        if device_id == self.root:
+            return None  # The backbone itself is split: the caller recomputes
+        cut = [device_id]
+        for neighbor in adjacency[device_id]:
+            if self.parent.get(neighbor, (None,))[0] == device_id and self.low[neighbor] >= self.pre[device_id]:
+                cut.extend(self.subtree(neighbor))
+        return cut
+
+
+class LinkGraph:
+    """
+    Adjacency-indexed graph of the core devices, whose edges are the links
+    that are up (physically and by protocol), kept current from store write
+    listeners.
+
+    A link write touches only its own adjacency entries and bumps the graph
+    version when the edge set actually changed. Connectivity analysis
+    (components, bridges, DFS subtrees) is computed once per version, and
+    query results are cached until a write that can change them (see
+    RESULT_FIELDS; counter updates can't), so repeated questions during an
+    incident are dictionary lookups.
+
+    End sites hang off the devices in their `coredevice_ids`; a site is
+    connected while at least one of them is in the backbone, the largest
+    connected component.
+    """
+
+    def __init__(self, store, max_cached=4096):
+        self._store = store
+        self._lock = threading.RLock()
+        self._max_cached = max_cached
+        self._load()
+
+    def _load(self):
+        self._adjacency = {}
+        self._edges = {}
+        self.version = 0
+        self._analysis = None
+        self._components = None
+        self._cache = OrderedDict()
+        for link in self._store.all("links", fields=("id", *EDGE_FIELDS)):
+            self._put(link)
+
+    def attach(self):
+        self._store.subscribe(self._on_store_change)
+
+    def reload(self):
+        """Rebuilds everything, for stores that swap their whole dataset at once."""
+        with self._lock:
+            self._load()
+
+    def _on_store_change(self, table, action, record, changes, previous):
+        fields = RESULT_FIELDS.get(table)
+        if fields is None or (action == "update" and not fields.intersection(changes)):
+            return
+        with self._lock:
+            # Results also depend on sites, devices and links that aren't
+            # edges (a link inserted down), not just on the edge set
+            self._cache.clear()
+            if table != "links":
+                return
+            if action == "delete":
+                self._drop(record["id"])
+            else:
+                self._put(record)
+
+    # --- Maintenance ---
+
+    def _put(self, link):
+        a, b = link.get("coredevice_id"), link.get("neighbor_coredevice_id")
+        edge = (a, b, tuple(link.get("network_ids") or ())) if link_is_up(link) and a is not None and b is not None else None
+        if self._edges.get(link["id"]) == edge:
+            return
+        self._drop(link["id"])
+        if edge is None:
+            return
+        self._edges[link["id"]] = edge
+        for x, y in ((a, b), (b, a)):
+            self._adjacency.setdefault(x, {}).setdefault(y, set()).add(link["id"])
+        self._changed()
+
+    def _drop(self, link_id):
+        edge = self._edges.pop(link_id, None)
+        if edge is None:
+            return
+        a, b, _ = edge
+        for x, y in ((a, b), (b, a)):
+            links = self._adjacency[x][y]
+            links.discard(link_id)
+            if not links:
+                del self._adjacency[x][y]
+                if not self._adjacency[x]:
+                    del self._adjacency[x]
+        self._changed()
+
+    def _changed(self):
+        self.version += 1
+        self._analysis = None
+        self._components = None
+        self._cache.clear()
+
+    def _cached(self, key, compute):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            result = compute()
+            if result is None:
+                # Unknown id; it may be created at any time
+                return None
+            self._cache[key] = result
+            while len(self._cache) > self._max_cached:
+                self._cache.popitem(last=False)
+            return result
+
+    def _analyzed(self):
+        if self._analysis is None:
+            self._analysis = _Analysis(self._adjacency)
+        return self._analysis
+
+    # --- Queries ---
+
+    def _bfs_path(self, source, target, blocked_links):
+        if source == target:
+            return [source], []
+        came_from = {source: None}
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            for neighbor, links in self._adjacency.get(node, {}).items():
+                if neighbor in came_from:
+                    continue
+                usable = sorted(links - blocked_links)
+                if not usable:
+                    continue
+                came_from[neighbor] = (node, usable[0])
+                if neighbor == target:
+                    devices, links_used = [target], []
+                    while came_from[devices[-1]] is not None:
+                        previous, link_id = came_from[devices[-1]]
+                        links_used.append(link_id)
+                        devices.append(previous)
+                    return devices[::-1], links_used[::-1]
+                queue.append(neighbor)
+        return None
+
+    def paths(self, source, target, k=1):
+        """
+        The shortest path (by hops) from `source` to `target` over links that
+        are up, then up to k-1 alternates, each sharing no link with the
+        paths before it, so each one survives the failure of any link of
+        the others.
+        """
+        def compute():
+            found, blocked = [], set()
+            while len(found) < k:
+                path = self._bfs_path(source, target, blocked)
+                if path is None:
+                    break
+                devices, links = path
+                found.append({"hops": len(links), "device_ids": devices, "link_ids": links})
+                if not links:
+                    break
+                blocked.update(links)
+            return {"source": source, "target": target, "graph_version": self.version, "paths": found}
+        return self._cached(("paths", source, target, k), compute)
+
+    def components(self, network_id):
+        """Connected components of the devices of `network_id` over its own up links, largest first."""
+        def compute():
+            devices = sorted(d["id"] for d in self._store.find("core_devices", "network_ids", network_id))
+            adjacency = {d: set() for d in devices}
+            for a, b, networks in self._edges.values():
+                if network_id in networks and a in adjacency and b in adjacency:
+                    adjacency[a].add(b)
+                    adjacency[b].add(a)
+            seen, components = set(), []
+            for start in devices:
+                if start in seen:
+                    continue
+                seen.add(start)
+                queue, members = deque([start]), []
+                while queue:
+                    node = queue.popleft()
+                    members.append(node)
+                    for neighbor in adjacency[node]:
+                        if neighbor not in seen:
+                            seen.add(neighbor)
+                            queue.append(neighbor)
+                components.append(sorted(members))
+            components.sort(key=lambda c: (-len(c), c[0]))
+            return {
+                "network_id": network_id,
+                "graph_version": self.version,
+                "component_count": len(components),
+                "components": [{"size": len(c), "device_ids": c} for c in components],
+            }
+        return self._cached(("components", network_id), compute)
+
+    def _sites_lost(self, cut):
+        """End sites none of whose backbone devices survive losing the devices in `cut`."""
+        analysis = self._analyzed()
+        cut = set(cut)
+        lost = set()
+        for device_id in cut:
+            for site in self._store.find("sites", "coredevice_ids", device_id):
+                if site["id"] in lost:
+                    continue
+                homes = [d for d in site.get("coredevice_ids") or () if analysis.in_backbone(d)]
+                if homes and all(d in cut for d in homes):
+                    lost.add(site["id"])
+        return sorted(lost)
+
+    def _split_without(self, device_id):
+        """Fallback for the DFS root: backbone devices outside the largest part left without it."""
+        analysis = self._analyzed()
+        backbone = [n for n, c in analysis.component.items() if c == analysis.backbone and n != device_id]
+        seen, best = set(), []
+        for start in backbone:
+            if start in seen:
+                continue
+            seen.add(start)
+            queue, members = deque([start]), [start]
+            while queue:
+                for neighbor in self._adjacency[queue.popleft()]:
+                    if neighbor != device_id and neighbor not in seen:
+                        seen.add(neighbor)
+                        queue.append(neighbor)
+                        members.append(neighbor)
+            if len(members) > len(best):
+                best = members
+        kept = set(best)
+        return [device_id] + [n for n in backbone if n not in kept]
+
+    def link_failure(self, link_id):
+        """Devices and end sites cut off from the backbone if the link goes down; None if it doesn't exist."""
+        def compute():
+            link = self._store.get("links", link_id)
+            if link is None:
+                return None
+            edge = self._edges.get(link_id)
+            cut = self._analyzed().cut_by_link(edge[0], edge[1], link_id) if edge else []
+            return self._impact({"link_id": link_id, "currently_up": edge is not None}, cut)
+        return self._cached(("link_failure", link_id), compute)
+
+    def device_failure(self, device_id):
+        """Devices and end sites cut off from the backbone if the device goes down; None if it doesn't exist."""
+        def compute():
+            if self._store.get("core_devices", device_id) is None:
+                return None
+            analysis = self._analyzed()
+            cut = analysis.cut_by_device(device_id, self._adjacency)
+            if cut is None:
+                cut = self._split_without(device_id)
+            return self._impact({"device_id": device_id}, cut)
+        return self._cached(("device_failure", device_id), compute)
+
+    def _impact(self, failed, cut):
+        return {
+            "failed": failed,
+            "graph_version": self.version,
+            "isolated_device_ids": sorted(cut),
+            "lost_site_ids": self._sites_lost(cut),
+        }
@@ -0,0 +1,176 @@
+import asyncio
+import json
+import time
+from datetime import datetime
+
+from starlette.concurrency import run_in_threadpool
+
+from link_events import STATUS_FIELDS, apply_status_change
+from link_metrics import parse_count
+
+# Link fields a crawler record may carry besides the status fields
+COUNTER_FIELDS = (
+    "input_rate", "output_rate", "rx", "tx", "input_errors", "output_errors", "crc",
+    "bw", "bandwidth", "mpls_ldp", "isis", "media_type", "description", "cdp", "neighbor_ip",
+)
+
+
+class CycleInProgress(RuntimeError):
+    pass
+
+
+def _is_up(value):
+    return str(value or "").lower() == "up"
+
+
+class CrawlIngester:
+    """
+    Applies crawler interface records to the links, diffing each against
+    the link's values from the previous cycle.
+
+    Status transitions go through apply_status_change (which stamps
+    status_changed_at and feeds the websocket stream), other changed fields
+    are written in place, unchanged records write nothing, and transitions
+    that matter to an operator become alerts in the running cycle. A full
+    cycle is read as NDJSON in batches of `batch_size` records, each applied
+    in one store transaction on the threadpool, so memory stays bounded and
+    reads keep being served in between. The crawl counter is bumped once,
+    after the last batch.
+    """
+
+    def __init__(self, store, alert_feed, close_cycle, batch_size=1000):
+        self._store = store
+        self._alert_feed = alert_feed
+        self._close_cycle = close_cycle
+        self._batch_size = batch_size
+        self._running = asyncio.Lock()
+
+    @property
+    def running(self):
+        return self._running.locked()
+
+    async def ingest(self, chunks):
+        """Ingests one crawl cycle from an async iterable of NDJSON byte chunks; returns a summary."""
+        if self._running.locked():
+            raise CycleInProgress("A crawl cycle is already being ingested")
+        async with self._running:
+            started = time.perf_counter()
+            totals = _new_totals()
+            batch, pending = [], b""
+            async for chunk in chunks:
+                lines = (pending + chunk).split(b"\n")
+                pending = lines.pop()
+                for line in lines:
+                    self._parse(line, batch, totals)
+                    if len(batch) >= self._batch_size:
+                        _add(totals, await run_in_threadpool(self.apply, batch))
+                        batch = []
+            self._parse(pending, batch, totals)
+            if batch:
+                _add(totals, await run_in_threadpool(self.apply, batch))
+            totals["current_crawl_number"] = await run_in_threadpool(self._close_cycle)
+            totals["seconds"] = round(time.perf_counter() - started, 3)
+            return totals
+
+    @staticmethod
+    def _parse(line, batch, totals):
+        if not line.strip():
+            return
+        try:
+            record = json.loads(line)
+        except ValueError:
+            totals["invalid"] += 1
+            return
+        if not isinstance(record, dict) or not isinstance(record.get("id"), int):
+            totals["invalid"] += 1
+            return
+        batch.append(record)
+
+    def apply(self, records, coredevice_id=None):
+        """
+        Applies crawler records (link dicts keyed by "id") within the running
+        cycle. With `coredevice_id`, records of other devices' links are
+        rejected. Returns counts of what happened.
+        """
+        totals = _new_totals()
+        totals["records"] = len(records)
+        cycle = self._alert_feed.current_crawl_number + 1
+        now = datetime.utcnow().isoformat()
+        with self._store.transaction():
+            for record in records:
+                link = self._store.get("links", record["id"])
+                if link is None or (coredevice_id is not None and link.get("coredevice_id") != coredevice_id):
+                    totals["unknown"] += 1
+                    continue
+                old = {f: link.get(f) for f in STATUS_FIELDS + ("crc",)}
+                status = apply_status_change(self._store, record["id"], record)
+                if status:
+                    totals["status_changes"] += 1
+                counters = {f: record[f] for f in COUNTER_FIELDS if f in record and record[f] != link.get(f)}
+                if status or counters:
+                    # Stamp the link so date-filtered /links queries pick it up
+                    counters.update(updated_at=now, crawler_cycle_id=cycle)
+                    self._store.update("links", record["id"], counters)
+                    totals["updated"] += 1
+                    # Store hands out its live record, SqliteStore a copy: rebuild the new values either way
+                    current = {**link, **(status or {}), **counters}
+                    for alert in self._derive_alerts(current, old, cycle, now):
+                        self._alert_feed.add(alert)
+                        totals["alerts"] += 1
+        return totals
+
+    def _derive_alerts(self, link, old, cycle, now):
+        """Alerts for one link whose current values (in `link`) differ from `old`."""
+        found = []
+        if _is_up(old["physical_status"]) and not _is_up(link.get("physical_status")):
+            found.append(("error", 8, "went down", "Check the optics and the far-end device."))
+        elif not _is_up(old["physical_status"]) and _is_up(link.get("physical_status")):
+            found.append(("info", 2, "is back up", "No action needed."))
+        elif _is_up(old["protocol_status"]) and not _is_up(link.get("protocol_status")):
+            found.append(("warning", 6, "lost its line protocol", "Check the interface configuration."))
+        crc_increase = parse_count(link.get("crc")) - parse_count(old["crc"])
+        if crc_increase > 0:
+            found.append(("warning", 4, f"has {crc_increase} new CRC errors", "Check the cabling and optics."))
+        if not found:
+            return []
+        device = self._store.get("core_devices", link.get("coredevice_id")) or {}
+        return [
+            {
+                "id": self._store.next_id("alerts"),
+                "type": kind,
+                "message": f"Link {link['id']} {what}",
+                "timestamp": now,
+                "network_line": f"Line-{link.get('network_type_id')}",
+                "source": "Crawler",
+                "severity_score": severity,
+                "details": {"info": link.get("description", ""), "remediation": remediation},
+                "draw_number": cycle,
+                "coredevice_name": device.get("name"),
+                "coredevice_id": link.get("coredevice_id"),
+                "link_id": link["id"],
+            }
+            for kind, severity, what, remediation in found
+        ]
+
+
+def parse_records(body):
+    """Crawler records from a JSON object, a JSON array or NDJSON; raises ValueError when malformed."""
+    if not body.strip():
+        return []
+    try:
+        parsed = json.loads(body)
+    except ValueError:
+        parsed = [json.loads(line) for line in body.splitlines() if line.strip()]
+    records = [parsed] if isinstance(parsed, dict) else parsed
+    if not isinstance(records, list) or not all(isinstance(r, dict) and isinstance(r.get("id"), int) for r in records):
+        raise ValueError("Expected interface records with an integer link id")
+    return records
+
+
+def _new_totals():
+    return {"records": 0, "updated": 0, "status_changes": 0, "alerts": 0, "unknown": 0, "invalid": 0}
+
+
+def _add(totals, more):
+    for key, value in more.items():
+        totals[key] += value
@@ -0,0 +1,390 @@
+import bisect
+import functools
+import inspect
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from fastapi.routing import APIRoute
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Timed parts of a request: the auth dependency, the route function, and
+# turning its return value into the response body
+PHASES = ("auth", "handler", "serialize")
+
+# Label of requests that matched no route, so unknown paths don't each get their own series
+UNMATCHED = "<unmatched>"
+
+_current = ContextVar("spiderweb_request", default=None)
+
+
+class Histogram:
+    """Prometheus-style histogram with fixed bucket bounds; observing is one bisect."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            yield f"{name}_bucket{_labels({**labels, 'le': _number(bound)})} {cumulative}"
+        yield f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {self.count}"
+        yield f"{name}_sum{_labels(labels)} {_number(self.sum)}"
+        yield f"{name}_count{_labels(labels)} {self.count}"
+
+
+class _Request:
+    """Timing state of the request being served, shared through a context variable."""
+
+    __slots__ = ("metrics", "method", "route", "phases", "handler_end", "thread", "samples")
+
+    def __init__(self, metrics, method):
+        self.metrics = metrics
+        self.method = method
+        self.route = None
+        self.phases = {}
+        self.handler_end = None
+        self.thread = None
+        self.samples = None
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def enter(self, route):
+        if self.route is None:
+            self.route = route
+            self.metrics.routed(self.method, route)
+        self.thread = threading.get_ident()
+
+    def leave(self, started):
+        self.handler_end = time.perf_counter()
+        self.thread = None
+        self.add("handler", self.handler_end - started)
+
+
+@contextmanager
+def request_phase(name):
+    """Adds the time spent in the block to phase `name` of the current request (if any)."""
+    request = _current.get()
+    if request is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        request.add(name, time.perf_counter() - started)
+
+
+def _timed(endpoint, path):
+    # Same signature (through __wrapped__) and the same sync/async kind, so
+    # FastAPI resolves parameters and picks the threadpool as before
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def timed(*args, **kwargs):
+            request = _current.get()
+            if request is None:
+                return await endpoint(*args, **kwargs)
+            request.enter(path)
+            started = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                request.leave(started)
+    else:
+        @functools.wraps(endpoint)
+        def timed(*args, **kwargs):
+            request = _current.get()
+            if request is None:
+                return endpoint(*args, **kwargs)
+            request.enter(path)
+            started = time.perf_counter()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                request.leave(started)
+    return timed
+
+
+class TimedRoute(APIRoute):
+    """APIRoute whose endpoint reports the handler phase to the request metrics (use as a router's route_class)."""
+
+    def __init__(self, path, endpoint, **kwargs):
+        super().__init__(path, _timed(endpoint, path), **kwargs)
+
+
+class _RouteStats:
+    __slots__ = ("statuses", "latency", "size", "phases", "in_flight")
+
+    def __init__(self):
+        self.statuses = Counter()
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.phases = {phase: Histogram(LATENCY_BUCKETS) for phase in PHASES}
+        self.in_flight = 0
+
+
+class RequestMetrics:
+    """
+    Per-route request counters and histograms, rendered in the Prometheus
+    text format together with whatever the registered collectors report.
+
+    Routes are labelled by their path template ("/coredevice/{coredevice_id}"),
+    so the number of series is bounded by the number of routes. Recording a
+    request is a few dict lookups and bisects under one short lock, cheap
+    enough to leave on under full load.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._collectors = []
+        self.in_flight = 0
+
+    def register(self, collect):
+        """`collect()` yields `(name, type, help, [(labels, value), ...])` families at every scrape."""
+        self._collectors.append(collect)
+
+    def _stats(self, method, route):
+        stats = self._routes.get((method, route))
+        if stats is None:
+            stats = self._routes[(method, route)] = _RouteStats()
+        return stats
+
+    # --- Recording ---
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def routed(self, method, route):
+        with self._lock:
+            self._stats(method, route).in_flight += 1
+
+    def finished(self, request, route, status, seconds, size):
+        with self._lock:
+            self.in_flight -= 1
+            stats = self._stats(request.method, route)
+            if request.route is not None:
+                stats.in_flight -= 1
+            stats.statuses[status] += 1
+            stats.latency.observe(seconds)
+            stats.size.observe(size)
+            for phase, value in request.phases.items():
+                stats.phases[phase].observe(value)
+
+    # --- Exposition ---
+
+    def render(self):
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines = []
+            _family(lines, "spiderweb_http_requests_total", "counter",
+                    "Requests served, by method, route template and status code.")
+            for (method, route), stats in routes:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(f"spiderweb_http_requests_total"
+                                 f"{_labels({'method': method, 'route': route, 'status': status})} {count}")
+            _family(lines, "spiderweb_http_request_duration_seconds", "histogram",
+                    "Time from receiving a request to sending the last byte of its response.")
+            for (method, route), stats in routes:
+                lines.extend(stats.latency.lines("spiderweb_http_request_duration_seconds",
+                                                 {"method": method, "route": route}))
+            _family(lines, "spiderweb_http_response_size_bytes", "histogram",
+                    "Response body size as sent (after compression).")
+            for (method, route), stats in routes:
+                lines.extend(stats.size.lines("spiderweb_http_response_size_bytes",
+                                              {"method": method, "route": route}))
+            _family(lines, "spiderweb_http_request_phase_seconds", "histogram",
+                    "Time spent per request phase: auth dependency, handler body, response serialization.")
+            for (method, route), stats in routes:
+                for phase in PHASES:
+                    if stats.phases[phase].count:
+                        lines.extend(stats.phases[phase].lines("spiderweb_http_request_phase_seconds",
+                                                               {"method": method, "route": route, "phase": phase}))
+            _family(lines, "spiderweb_http_requests_in_flight", "gauge",
+                    "Requests being served; per route from the start of the handler.")
+            lines.append(f"spiderweb_http_requests_in_flight {self.in_flight}")
+            for (method, route), stats in routes:
+                lines.append(f"spiderweb_http_requests_in_flight"
+                             f"{_labels({'method': method, 'route': route})} {stats.in_flight}")
+
+        for collect in self._collectors:
+            for name, kind, help_text, samples in collect():
+                _family(lines, name, kind, help_text)
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware feeding RequestMetrics (and the slow request profiler,
+    when given) from every HTTP request. Serialization is timed from the
+    end of the handler to the start of the response.
+    """
+
+    def __init__(self, app, metrics, profiler=None):
+        self.app = app
+        self.metrics = metrics
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        request = _Request(metrics, scope["method"])
+        token = _current.set(request)
+        profiled = self.profiler is not None and self.profiler.watch(request)
+        status = 500
+        size = 0
+        started = time.perf_counter()
+        metrics.started()
+
+        async def send_timed(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if request.handler_end is not None:
+                    request.add("serialize", time.perf_counter() - request.handler_end)
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            seconds = time.perf_counter() - started
+            _current.reset(token)
+            route = request.route or _route_path(scope) or UNMATCHED
+            metrics.finished(request, route, status, seconds, size)
+            if profiled:
+                self.profiler.finish(request, route, status, seconds)
+
+
+def _route_path(scope):
+    route = scope.get("route")
+    return getattr(route, "path", None)
+
+
+class SlowRequestProfiler:
+    """
+    Opt-in sampling profiler for slow requests.
+
+    A `sample_rate` share of the requests is watched: while their handler
+    runs, a background thread records the stack of the thread running it
+    every `interval` seconds. Requests that take at least `threshold`
+    seconds keep their stack counts (the last `keep` of them, and each is
+    passed to `on_slow` if given); the rest are dropped. For async
+    handlers the sampled thread is the event loop's, so its stacks also
+    show whatever else the loop ran meanwhile.
+    """
+
+    def __init__(self, threshold, sample_rate=1.0, interval=0.005, keep=50, max_depth=64, on_slow=None):
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.max_depth = max_depth
+        self.on_slow = on_slow
+        self._reports = deque(maxlen=keep)
+        self._lock = threading.Lock()
+        self._watched = set()
+        self._wake = threading.Condition(self._lock)
+        self._sampler = None
+
+    def watch(self, request):
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return False
+        request.samples = Counter()
+        with self._lock:
+            self._watched.add(request)
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+                self._sampler.start()
+            self._wake.notify()
+        return True
+
+    def finish(self, request, route, status, seconds):
+        with self._lock:
+            self._watched.discard(request)
+            samples = request.samples
+        if seconds < self.threshold:
+            return
+        report = {
+            "method": request.method,
+            "route": route,
+            "status": status,
+            "duration_ms": round(seconds * 1000, 3),
+            "phases_ms": {phase: round(value * 1000, 3) for phase, value in request.phases.items()},
+            "samples": sum(samples.values()),
+            "stacks": [{"stack": stack, "samples": count} for stack, count in samples.most_common(20)],
+        }
+        with self._lock:
+            self._reports.append(report)
+        if self.on_slow is not None:
+            self.on_slow(report)
+
+    def reports(self):
+        """The kept slow request reports, newest first."""
+        with self._lock:
+            return list(reversed(self._reports))
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._watched:
+                    self._wake.wait()
+                frames = sys._current_frames()
+                for request in self._watched:
+                    frame = frames.get(request.thread) if request.thread is not None else None
+                    if frame is not None:
+                        request.samples[self._collapse(frame)] += 1
+                del frames
+            time.sleep(self.interval)
+
+    def _collapse(self, frame):
+        # Root first, "function (file:line)" per frame, like collapsed flame graph input
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+
+def _family(lines, name, kind, help_text):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _number(value):
+    return repr(value) if isinstance(value, float) else str(value)
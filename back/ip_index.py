@@ -0,0 +1,243 @@
+import ipaddress
+import threading
+
+# Address fields per table, and the result type name of the table
+ADDRESS_FIELDS = {
+    "core_devices": ("ip", "ip_address"),
+    "links": ("neighbor_ip", "espf_interface_address"),
+}
+_KINDS = {"core_devices": "coredevice", "links": "link"}
+
+
+def parse_network(value):
+    """An address ("10.0.0.1") or prefix ("10.0.0.0/24", host bits ignored) as an ip_network; ValueError if neither."""
+    return ipaddress.ip_network(str(value).strip(), strict=False)
+
+
+class _Node:
+    __slots__ = ("key", "length", "children", "refs")
+
+    def __init__(self, key, length, refs=None):
+        self.key = key
+        self.length = length
+        self.children = [None, None]
+        self.refs = refs
+
+
+class _Trie:
+    """
+    Path-compressed binary trie (Patricia tree) of `width`-bit prefixes:
+    every node is a prefix that either holds references or branches, so
+    a walk visits at most `width` nodes whatever the number of prefixes.
+    """
+
+    def __init__(self, width):
+        self.width = width
+        self.root = _Node(0, 0)
+
+    def _bit(self, key, position):
+        return (key >> (self.width - 1 - position)) & 1
+
+    def _mask(self, length):
+        return ((1 << length) - 1) << (self.width - length) if length else 0
+
+    def _common(self, a, b, limit):
+        differ = a ^ b
+        common = self.width - differ.bit_length() if differ else self.width
+        return min(common, limit)
+
+    def _covers(self, node, key):
+        return key & self._mask(node.length) == node.key
+
+    def add(self, key, length, ref):
+        node = self.root
+        while True:
+            if node.length == length:
+                if node.refs is None:
+                    node.refs = set()
+                node.refs.add(ref)
+                return
+            bit = self._bit(key, node.length)
+            child = node.children[bit]
+            if child is None:
+                node.children[bit] = _Node(key, length, {ref})
+                return
+            common = self._common(key, child.key, min(length, child.length))
+            if common == child.length:
+                node = child
+                continue
+            # Diverges inside the child's compressed edge: split it
+            middle = _Node(key & self._mask(common), common)
+            middle.children[self._bit(child.key, common)] = child
+            node.children[bit] = middle
+            if common == length:
+                middle.refs = {ref}
+            else:
+                middle.children[self._bit(key, common)] = _Node(key, length, {ref})
+            return
+
+    def discard(self, key, length, ref):
+        path = []
+        node = self.root
+        while node is not None and node.length < length and self._covers(node, key):
+            path.append(node)
+            node = node.children[self._bit(key, node.length)]
+        if node is None or node.length != length or node.key != key or not node.refs:
+            return
+        node.refs.discard(ref)
+        if node.refs:
+            return
+        node.refs = None
+        # Drop nodes left without references and with fewer than two children
+        for parent in reversed(path):
+            children = [c for c in node.children if c is not None]
+            if node.refs or len(children) == 2:
+                return
+            parent.children[parent.children.index(node)] = children[0] if children else None
+            if parent is self.root:
+                return
+            node = parent
+
+    def find(self, key, length):
+        node = self.root
+        while node is not None and node.length <= length and self._covers(node, key):
+            if node.length == length:
+                return node
+            node = node.children[self._bit(key, node.length)]
+        return None
+
+    def longest(self, key):
+        """The deepest node holding references whose prefix covers `key`."""
+        best = None
+        node = self.root
+        while node is not None and self._covers(node, key):
+            if node.refs:
+                best = node
+            if node.length == self.width:
+                break
+            node = node.children[self._bit(key, node.length)]
+        return best
+
+    def within(self, key, length):
+        """Nodes holding references inside the prefix, in address order."""
+        node = self.root
+        while node is not None and node.length < length:
+            if not self._covers(node, key):
+                return
+            node = node.children[self._bit(key, node.length)]
+        if node is None or node.key & self._mask(length) != key:
+            return
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.refs:
+                yield node
+            for child in reversed(node.children):
+                if child is not None:
+                    stack.append(child)
+
+
+class AddressIndex:
+    """
+    Radix-tree index of the core device addresses (ip / ip_address) and the
+    link interface addresses (neighbor_ip / espf_interface_address), kept
+    current from store write listeners.
+
+    Addresses and prefixes live in one Patricia tree per IP version, so an
+    exact lookup or a longest-prefix match costs O(prefix length) and
+    listing a subnet costs O(prefix length + results), independent of how
+    many addresses are indexed. Values that don't parse are skipped.
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        self._tries = {4: _Trie(32), 6: _Trie(128)}
+        for table in ADDRESS_FIELDS:
+            for record in self._store.all(table, fields=("id", *ADDRESS_FIELDS[table])):
+                self._index(table, record, self._add)
+
+    def attach(self):
+        self._store.subscribe(self._on_store_change)
+
+    def reload(self):
+        """Rebuilds everything, for stores that swap their whole dataset at once."""
+        with self._lock:
+            self._load()
+
+    def _on_store_change(self, table, action, record, changes, previous):
+        if table not in ADDRESS_FIELDS:
+            return
+        with self._lock:
+            if action == "insert":
+                self._index(table, record, self._add)
+            elif action == "delete":
+                self._index(table, record, self._discard)
+            elif any(field in changes for field in ADDRESS_FIELDS[table]):
+                self._index(table, {**record, **previous}, self._discard)
+                self._index(table, record, self._add)
+
+    # --- Maintenance ---
+
+    def _index(self, table, record, apply):
+        for field in ADDRESS_FIELDS[table]:
+            value = record.get(field)
+            if not value:
+                continue
+            try:
+                network = parse_network(value)
+            except ValueError:
+                continue
+            apply(network, (_KINDS[table], record["id"], field))
+
+    def _add(self, network, ref):
+        self._tries[network.version].add(int(network.network_address), network.prefixlen, ref)
+
+    def _discard(self, network, ref):
+        self._tries[network.version].discard(int(network.network_address), network.prefixlen, ref)
+
+    # --- Queries ---
+
+    def _entry(self, trie, node, version):
+        address = ipaddress.ip_address(node.key) if version == 4 else ipaddress.IPv6Address(node.key)
+        prefix = str(address) if node.length == trie.width else f"{address}/{node.length}"
+        grouped = {}
+        for kind, record_id, field in sorted(node.refs):
+            grouped.setdefault((kind, record_id), []).append(field)
+        return {
+            "address": prefix,
+            "matches": [{"type": kind, "id": record_id, "fields": fields}
+                        for (kind, record_id), fields in grouped.items()],
+        }
+
+    def lookup(self, address):
+        """Records with exactly this address (or prefix); None when there are none."""
+        network = parse_network(address)
+        trie = self._tries[network.version]
+        with self._lock:
+            node = trie.find(int(network.network_address), network.prefixlen)
+            return self._entry(trie, node, network.version) if node is not None and node.refs else None
+
+    def longest_match(self, address):
+        """Records under the most specific indexed address or prefix covering `address`; None when none does."""
+        network = parse_network(address)
+        trie = self._tries[network.version]
+        with self._lock:
+            node = trie.longest(int(network.network_address))
+            return self._entry(trie, node, network.version) if node is not None else None
+
+    def within(self, cidr, limit=1000):
+        """Indexed addresses inside `cidr`, in address order, at most `limit` of them."""
+        network = parse_network(cidr)
+        trie = self._tries[network.version]
+        entries, truncated = [], False
+        with self._lock:
+            for node in trie.within(int(network.network_address), network.prefixlen):
+                if len(entries) == limit:
+                    truncated = True
+                    break
+                entries.append(self._entry(trie, node, network.version))
+        return {"cidr": str(network), "addresses": entries, "truncated": truncated}
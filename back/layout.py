@@ -0,0 +1,202 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Rows of the pairwise repulsion computed per step, bounding memory to O(chunk * n)
+_REPULSION_CHUNK = 512
+
+# Above this many nodes each node is repelled by a random sample of the others
+# (scaled up to the whole graph) instead of all of them: O(n * sample) per step
+_EXACT_REPULSION_LIMIT = 600
+_REPULSION_SAMPLE = 256
+
+
+def force_layout(n, edges, iterations=150, gravity=0.05):
+    """
+    Fruchterman-Reingold layout of `n` nodes joined by `edges` ([(i, j)]),
+    vectorized with NumPy. Nodes start evenly spaced on a circle in index
+    order and sampling uses a fixed seed, so the result is deterministic.
+    Returns an (n, 2) array of positions scaled into the unit square.
+    """
+    if n == 0:
+        return np.zeros((0, 2))
+    if n == 1:
+        return np.full((1, 2), 0.5)
+    angles = np.linspace(0, 2 * np.pi, n, endpoint=False)
+    pos = np.column_stack((np.cos(angles), np.sin(angles))) * 0.5
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    src, dst = edges[:, 0], edges[:, 1]
+    k = np.sqrt(1.0 / n)
+    temperature = 0.1
+    cooling = temperature / (iterations + 1)
+    rng = np.random.default_rng(0)
+    sampled = n > _EXACT_REPULSION_LIMIT
+
+    for _ in range(iterations):
+        disp = np.zeros_like(pos)
+        x, y = pos[:, 0], pos[:, 1]
+        if sampled:
+            others = rng.choice(n, _REPULSION_SAMPLE, replace=False)
+            ox, oy, weight = x[others], y[others], k * k * n / _REPULSION_SAMPLE
+        else:
+            ox, oy, weight = x, y, k * k
+        for start in range(0, n, _REPULSION_CHUNK):
+            rows = slice(start, start + _REPULSION_CHUNK)
+            dx = x[rows, None] - ox
+            dy = y[rows, None] - oy
+            dist2 = dx * dx
+            dist2 += dy * dy
+            np.maximum(dist2, 1e-6, out=dist2)
+            force = np.divide(weight, dist2, out=dist2)
+            disp[rows, 0] += (force * dx).sum(axis=1)
+            disp[rows, 1] += (force * dy).sum(axis=1)
+        delta = pos[src] - pos[dst]
+        dist = np.maximum(np.linalg.norm(delta, axis=1), 1e-3)
+        pull = delta * (dist / k)[:, None]
+        np.add.at(disp, src, -pull)
+        np.add.at(disp, dst, pull)
+        disp -= gravity * n * pos
+        length = np.maximum(np.linalg.norm(disp, axis=1), 1e-9)
+        pos += disp * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= cooling
+
+    low, high = pos.min(axis=0), pos.max(axis=0)
+    flat = high - low < 1e-9
+    # An axis without spread (e.g. two nodes) is centered rather than pushed to the edge
+    scaled = 0.05 + 0.9 * (pos - low) / np.where(flat, 1.0, high - low)
+    scaled[:, flat] = 0.5
+    return scaled
+
+
+class TopologyLayouts:
+    """
+    Server-side node positions for the coresite and end-site topology views.
+
+    Layouts are cached per view in parsed form. A read first compares the
+    store versions the view depends on; if any moved it rebuilds the view's
+    graph (O(view) through the indexes) and lays it out again only when the
+    graph's signature - its nodes and links, not their statuses - changed.
+    Positions are kept in the unit square and scaled per request.
+    """
+
+    def __init__(self, store, max_entries=1024, iterations=150):
+        self._store = store
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._max_entries = max_entries
+        self._iterations = iterations
+        self.layouts_computed = 0
+
+    def _versions(self):
+        return tuple(self._store.version(t) for t in ("links", "core_devices", "sites"))
+
+    def coresite(self, coresite_id, force=False):
+        return self._layout(("coresite", coresite_id), lambda: self._coresite_graph(coresite_id), force)
+
+    def site(self, site_id, force=False):
+        return self._layout(("site", site_id), lambda: self._site_graph(site_id), force)
+
+    def _layout(self, key, build_graph, force):
+        versions = self._versions()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if entry["versions"] == versions and not force:
+                    return entry["layout"]
+
+        graph = build_graph()
+        if graph is None:
+            return None
+        nodes, links = graph
+        signature = hashlib.blake2b(repr((nodes, links)).encode(), digest_size=8).hexdigest()
+        if entry is not None and entry["signature"] == signature and not force:
+            layout = entry["layout"]
+        else:
+            index = {node[0]: i for i, node in enumerate(nodes)}
+            positions = force_layout(len(nodes), [(index[a], index[b]) for _, a, b in links], self._iterations)
+            layout = {
+                "layout_version": signature,
+                "nodes": [
+                    {"id": name, "label": label, "kind": kind, "record_id": record_id, "x": float(x), "y": float(y)}
+                    for (name, label, kind, record_id), (x, y) in zip(nodes, positions)
+                ],
+                "links": [{"id": link_id, "source": a, "target": b} for link_id, a, b in links],
+            }
+            self.layouts_computed += 1
+        with self._lock:
+            self._entries[key] = {"versions": versions, "signature": signature, "layout": layout}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return layout
+
+    # --- Graphs: (nodes [(name, label, kind, record_id)], links [(link_id, source name, target name)]) ---
+    # Node names are "coredevice-<id>" / "site-<id>": hostnames are labels only, they needn't be unique
+
+    def _device_links(self, device_ids):
+        links = {}
+        for device_id in device_ids:
+            for link in self._store.find("links", "coredevice_id", device_id):
+                links[link["id"]] = link
+            for link in self._store.find("links", "neighbor_coredevice_id", device_id):
+                links[link["id"]] = link
+        return [links[i] for i in sorted(links)]
+
+    def _coresite_graph(self, coresite_id):
+        """The coresite's devices, their links and the devices of other coresites at the far ends."""
+        if self._store.get("core_sites", coresite_id) is None:
+            return None
+        devices = sorted(self._store.find("core_devices", "coresite_id", coresite_id), key=lambda d: d["id"])
+        names = {d["id"]: _device_node(d["id"]) for d in devices}
+        nodes = [(names[d["id"]], d["hostname"], "coredevice", d["id"]) for d in devices]
+        links = []
+        for link in self._device_links(names):
+            ends = []
+            for device_id in (link.get("coredevice_id"), link.get("neighbor_coredevice_id")):
+                if device_id not in names:
+                    device = self._store.get("core_devices", device_id)
+                    if device is None:
+                        break
+                    names[device_id] = _device_node(device_id)
+                    nodes.append((names[device_id], device["hostname"], "external", device_id))
+                ends.append(names[device_id])
+            if len(ends) == 2:
+                links.append((link["id"], ends[0], ends[1]))
+        return nodes, links
+
+    def _site_graph(self, site_id):
+        """The end site, the core devices serving it and the links between those devices."""
+        site = self._store.get("sites", site_id)
+        if site is None:
+            return None
+        site_node = f"site-{site_id}"
+        nodes = [(site_node, site.get("name"), "site", site_id)]
+        links = []
+        names = {}
+        for device_id in dict.fromkeys(site.get("coredevice_ids") or ()):
+            device = self._store.get("core_devices", device_id)
+            if device is not None:
+                names[device_id] = _device_node(device_id)
+                nodes.append((names[device_id], device["hostname"], "coredevice", device_id))
+                links.append((None, names[device_id], site_node))
+        for link in self._device_links(names):
+            a, b = link.get("coredevice_id"), link.get("neighbor_coredevice_id")
+            if a in names and b in names:
+                links.append((link["id"], names[a], names[b]))
+        return nodes, links
+
+
+def _device_node(device_id):
+    return f"coredevice-{device_id}"
+
+
+def scaled(layout, width, height):
+    """The layout with its unit-square positions scaled to `width` x `height`."""
+    return {
+        **layout,
+        "nodes": [{**node, "x": node["x"] * width, "y": node["y"] * height} for node in layout["nodes"]],
+    }
@@ -0,0 +1,159 @@
+import asyncio
+import threading
+from collections import deque
+from datetime import datetime
+
+# Link fields whose changes are pushed to subscribers.
+STATUS_FIELDS = ("physical_status", "protocol_status")
+
+# Queue sentinel telling a reader it fell too far behind and was dropped.
+_DROPPED = object()
+
+
+def apply_status_change(store, link_id, changes):
+    """
+    Applies the status fields of `changes` that differ from the stored link,
+    stamping `status_changed_at`. Returns the changed fields, or None if the
+    link does not exist.
+    """
+    link = store.get("links", link_id)
+    if link is None:
+        return None
+    diff = {f: changes[f] for f in STATUS_FIELDS if f in changes and changes[f] != link.get(f)}
+    if diff:
+        diff["status_changed_at"] = datetime.utcnow().isoformat()
+        store.update("links", link_id, diff)
+    return diff
+
+
+class Subscription:
+    """One subscriber's bounded queue; iterate it from the event loop it was created on."""
+
+    def __init__(self, broadcaster, loop, maxsize):
+        self._broadcaster = broadcaster
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.last_seq = None
+        self.dropped = False
+
+    def offer(self, event):
+        # Runs on self.loop
+        if self.dropped:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped = True
+            self._broadcaster.unsubscribe(self)
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(_DROPPED)
+
+    async def next(self, timeout=None):
+        """Returns the next event, None on timeout, or raises StopAsyncIteration once dropped."""
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if event is _DROPPED:
+            raise StopAsyncIteration
+        self.last_seq = event["seq"]
+        return event
+
+    def close(self):
+        self._broadcaster.unsubscribe(self)
+
+
+class LinkStatusBroadcaster:
+    """
+    Shared fan-out of link status change events.
+
+    Each published event gets a sequence number and goes into a bounded
+    history plus every subscriber's bounded queue. A subscriber whose queue
+    is full is dropped (its reader sees the drop and should reconnect with
+    the last sequence number it processed). Subscribing with `since` replays
+    the history after that number; if it is no longer retained, the
+    subscription starts with a "resync" event telling the client to refetch
+    the topology.
+    """
+
+    def __init__(self, history_size=5000, queue_size=1000):
+        self._lock = threading.Lock()
+        self._history = deque(maxlen=history_size)
+        self._subscribers = set()
+        self._queue_size = queue_size
+        self.seq = 0
+
+    def attach(self, store):
+        """Publishes an event for every status change made through `store`."""
+        store.subscribe(self._on_store_change)
+
+    def _on_store_change(self, table, action, record, changes, previous):
+        if table != "links" or action != "update":
+            return
+        fields = {f: changes[f] for f in STATUS_FIELDS if f in changes}
+        if fields:
+            self.publish(record["id"], fields, changes.get("status_changed_at", record.get("status_changed_at")))
+
+    def publish(self, link_id, changes, status_changed_at):
+        with self._lock:
+            self.seq += 1
+            event = {
+                "type": "link_update",
+                "seq": self.seq,
+                "payload": {"id": link_id, **changes, "status_changed_at": status_changed_at},
+            }
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        self._deliver(subscribers, event)
+        return event
+
+    def resync(self):
+        """Tells every subscriber to refetch the topology, e.g. after the whole dataset was replaced."""
+        with self._lock:
+            self.seq += 1
+            event = {"type": "resync", "seq": self.seq}
+            # Replaying events from before the swap would be wrong too
+            self._history.clear()
+            subscribers = list(self._subscribers)
+        self._deliver(subscribers, event)
+        return event
+
+    def _deliver(self, subscribers, event):
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        for sub in subscribers:
+            if sub.loop is running:
+                sub.offer(event)
+            else:
+                try:
+                    sub.loop.call_soon_threadsafe(sub.offer, event)
+                except RuntimeError:
+                    # The subscriber's event loop is gone
+                    self.unsubscribe(sub)
+
+    def subscribe(self, since=None):
+        """Must be called from the event loop that will read the subscription."""
+        sub = Subscription(self, asyncio.get_running_loop(), self._queue_size)
+        with self._lock:
+            if since is not None and since != self.seq:
+                oldest = self._history[0]["seq"] if self._history else self.seq + 1
+                missed = self.seq - since
+                # A `since` ahead of us comes from before a server restart: nothing to replay
+                if 0 < missed <= self._queue_size and since + 1 >= oldest:
+                    for event in list(self._history)[-missed:]:
+                        sub.queue.put_nowait(event)
+                else:
+                    sub.queue.put_nowait({"type": "resync", "seq": self.seq})
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
@@ -0,0 +1,227 @@
+import re
+import threading
+
+import numpy as np
+
+# Metric columns and their dtypes. Rates and bandwidth are in bps, rx/tx in dBm.
+METRICS = {
+    "input_rate": np.float64,
+    "output_rate": np.float64,
+    "rx": np.float64,
+    "tx": np.float64,
+    "input_errors": np.int64,
+    "output_errors": np.int64,
+    "crc": np.int64,
+    "bandwidth": np.float64,
+}
+
+# Columns besides the metrics: flags and the grouping keys used by aggregates
+_EXTRA_COLUMNS = {
+    "id": np.int64,
+    "network_type_id": np.int32,
+    "coredevice_id": np.int64,
+    "physical_up": np.bool_,
+    "protocol_up": np.bool_,
+    "neighbor_is_core": np.bool_,
+    "valid": np.bool_,
+}
+
+# Link fields that feed a column; updates touching none of them are ignored
+SOURCE_FIELDS = {
+    "input_rate", "output_rate", "rx", "tx", "input_errors", "output_errors", "crc",
+    "bw", "bandwidth", "network_type_id", "coredevice_id",
+    "physical_status", "protocol_status", "neighbor_is_core",
+}
+
+# Link fields a row is parsed from, for loading with store.all(..., fields=LOAD_FIELDS)
+LOAD_FIELDS = ("id", *SOURCE_FIELDS)
+
+_UNIT_SCALE = {"": 1.0, "k": 1e3, "m": 1e6, "g": 1e9, "t": 1e12}
+_RATE_RE = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*([kmgt]?)(?:bps|b/s|b)?\s*$", re.IGNORECASE)
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def parse_rate(value):
+    """'1.5 Gbps' -> 1.5e9, '10G' -> 1e10. NaN when unparseable."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _RATE_RE.match(value or "")
+    if not match:
+        return float("nan")
+    return float(match.group(1)) * _UNIT_SCALE[match.group(2).lower()]
+
+
+def parse_dbm(value):
+    """'-3.2 dBm' -> -3.2. NaN when unparseable."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER_RE.search(value or "")
+    return float(match.group()) if match else float("nan")
+
+
+def parse_count(value):
+    """'12' -> 12. 0 when unparseable."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def parse_link(link):
+    """Returns the typed column values of one link dict."""
+    return {
+        "id": link["id"],
+        "input_rate": parse_rate(link.get("input_rate")),
+        "output_rate": parse_rate(link.get("output_rate")),
+        "rx": parse_dbm(link.get("rx")),
+        "tx": parse_dbm(link.get("tx")),
+        "input_errors": parse_count(link.get("input_errors")),
+        "output_errors": parse_count(link.get("output_errors")),
+        "crc": parse_count(link.get("crc")),
+        "bandwidth": parse_rate(link.get("bandwidth") or link.get("bw")),
+        "network_type_id": link.get("network_type_id") or 0,
+        "coredevice_id": link.get("coredevice_id") or 0,
+        "physical_up": str(link.get("physical_status", "")).lower() == "up",
+        "protocol_up": str(link.get("protocol_status", "")).lower() == "up",
+        "neighbor_is_core": bool(link.get("neighbor_is_core")),
+        "valid": True,
+    }
+
+
+class LinkMetricsStore:
+    """
+    Typed, array-backed columns of the link metrics.
+
+    Every link gets a row whose metrics are parsed from their display strings
+    once, when the link is inserted or its metric fields change, so queries
+    are vectorized NumPy scans instead of re-parsing dicts. Deleted rows are
+    marked invalid and their slots reused; capacity grows by doubling.
+    """
+
+    def __init__(self, links=(), capacity=1024):
+        self._lock = threading.Lock()
+        self._capacity = capacity
+        self._load(links)
+
+    def _load(self, links):
+        self._row_of = {}
+        self._free = []
+        self._size = 0
+        links = list(links)
+        capacity = max(self._capacity, len(links))
+        self._columns = {name: np.zeros(capacity, dtype) for name, dtype in METRICS.items()}
+        self._columns.update({name: np.zeros(capacity, dtype) for name, dtype in _EXTRA_COLUMNS.items()})
+        for link in links:
+            self._put(link)
+
+    def attach(self, store):
+        store.subscribe(self._on_store_change)
+
+    def _on_store_change(self, table, action, record, changes, previous):
+        if table != "links":
+            return
+        if action == "delete":
+            self.remove(record["id"])
+        elif action == "insert" or SOURCE_FIELDS.intersection(changes):
+            self.upsert(record)
+
+    # --- Writes ---
+
+    def upsert(self, link):
+        with self._lock:
+            self._put(link)
+
+    def remove(self, link_id):
+        with self._lock:
+            row = self._row_of.pop(link_id, None)
+            if row is not None:
+                self._columns["valid"][row] = False
+                self._free.append(row)
+
+    def reload(self, links):
+        """Replaces every row, for stores that swap their whole dataset at once."""
+        with self._lock:
+            self._load(links)
+
+    def _put(self, link):
+        row = self._row_of.get(link["id"])
+        if row is None:
+            row = self._free.pop() if self._free else self._next_row()
+            self._row_of[link["id"]] = row
+        for name, value in parse_link(link).items():
+            self._columns[name][row] = value
+
+    def _next_row(self):
+        if self._size == len(self._columns["id"]):
+            for name, column in self._columns.items():
+                grown = np.zeros(max(2 * len(column), 16), column.dtype)
+                grown[:len(column)] = column
+                self._columns[name] = grown
+        self._size += 1
+        return self._size - 1
+
+    # --- Queries ---
+
+    def _view(self, *names):
+        """Valid rows of the named columns (copies, so callers may read them unlocked)."""
+        with self._lock:
+            valid = self._columns["valid"][:self._size]
+            return {name: self._columns[name][:self._size][valid] for name in names}
+
+    def columns(self, *names):
+        """Copies of the named columns over the valid rows, aligned with each other."""
+        return self._view(*names)
+
+    def top(self, metric, n=10, ascending=False):
+        """The `n` links with the highest (or lowest) `metric`, as [{"link_id", "value"}]."""
+        cols = self._view(metric, "id")
+        values = cols[metric]
+        ids = cols["id"]
+        if values.dtype.kind == "f":
+            keep = ~np.isnan(values)
+            values, ids = values[keep], ids[keep]
+        n = min(n, len(values))
+        if n <= 0:
+            return []
+        keyed = values if ascending else -values
+        picked = np.argpartition(keyed, n - 1)[:n]
+        picked = picked[np.lexsort((ids[picked], keyed[picked]))]
+        return [{"link_id": int(ids[i]), "value": values[i].item()} for i in picked]
+
+    def where(self, metric, below=None, above=None):
+        """Ids of the links whose `metric` is < `below` and/or > `above`."""
+        cols = self._view(metric, "id")
+        values = cols[metric]
+        mask = np.ones(len(values), dtype=bool)
+        if below is not None:
+            mask &= values < below
+        if above is not None:
+            mask &= values > above
+        return np.sort(cols["id"][mask]).tolist()
+
+    def utilization_by_network(self):
+        """
+        Per network_type_id: link count, total traffic and capacity in bps and
+        the traffic/capacity ratio, where a link's traffic is the larger of
+        its input and output rates.
+        """
+        cols = self._view("network_type_id", "input_rate", "output_rate", "bandwidth")
+        groups, inverse = np.unique(cols["network_type_id"], return_inverse=True)
+        traffic = np.nan_to_num(np.maximum(cols["input_rate"], cols["output_rate"]))
+        capacity = np.nan_to_num(cols["bandwidth"])
+        traffic_sum = np.bincount(inverse, weights=traffic, minlength=len(groups))
+        capacity_sum = np.bincount(inverse, weights=capacity, minlength=len(groups))
+        counts = np.bincount(inverse, minlength=len(groups))
+        result = []
+        for i, network_type_id in enumerate(groups.tolist()):
+            result.append({
+                "network_type_id": network_type_id,
+                "links": int(counts[i]),
+                "traffic_bps": float(traffic_sum[i]),
+                "capacity_bps": float(capacity_sum[i]),
+                "utilization": float(traffic_sum[i] / capacity_sum[i]) if capacity_sum[i] else 0.0,
+            })
+        return result
+
+    def __len__(self):
+        return len(self._row_of)
@@ -0,0 +1,125 @@
+import base64
+import json
+from datetime import date, datetime, timedelta, timezone
+from itertools import islice
+
+DATE_FIELDS = ("updated_at", "created_at")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(field, key):
+    raw = json.dumps({"f": field, "k": list(key)}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, field):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        key = tuple(data["k"])
+    except (ValueError, KeyError, TypeError) as exc:
+        raise InvalidCursor("Malformed cursor") from exc
+    if data.get("f") != field or len(key) != 2:
+        raise InvalidCursor("Cursor does not belong to this query")
+    return key
+
+
+def normalize_date(value, end=False):
+    """
+    An ISO date/datetime bound in the stored form (naive UTC, "T"
+    separator), so bounds compare correctly as strings. Offsets ("Z",
+    "+02:00") are converted to UTC; a date-only `end` covers that whole
+    day. Raises ValueError when `value` isn't ISO 8601.
+    """
+    text = value.strip()
+    if len(text) == 10:
+        day = date.fromisoformat(text)
+        if end:
+            return (datetime.combine(day, datetime.min.time()) + timedelta(days=1, microseconds=-1)).isoformat()
+        return datetime.combine(day, datetime.min.time()).isoformat()
+    moment = datetime.fromisoformat(text)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.isoformat()
+
+
+def query_links(store, coredevice_id=None, neighbor_coredevice_id=None, neighbor_site_id=None,
+                start_date=None, end_date=None, date_field="updated_at", cursor=None, skip=0, limit=20):
+    """
+    Filters links through the store indexes and returns `(page, next_cursor)`.
+
+    Links come back in `(id, id)` order, or in `(date_field, id)` order when a
+    date range is given. Paging with the returned cursor resumes right after
+    the last link of the previous page: unfiltered and date-range queries
+    bisect into a sorted index and read O(limit) entries, device/site filters
+    read only their O(k) index buckets. `skip` is kept for offset callers.
+    `neighbor_site_id` is the coresite of the neighbor device. Dates must
+    already be in the form `normalize_date` returns.
+    """
+    order_field = date_field if (start_date or end_date) else "id"
+    after = decode_cursor(cursor, order_field) if cursor else None
+
+    buckets = []
+    if coredevice_id is not None:
+        buckets.append(store.find("links", "coredevice_id", coredevice_id))
+    if neighbor_coredevice_id is not None:
+        buckets.append(store.find("links", "neighbor_coredevice_id", neighbor_coredevice_id))
+    if neighbor_site_id is not None:
+        site_links = []
+        for device in store.find("core_devices", "coresite_id", neighbor_site_id):
+            site_links.extend(store.find("links", "neighbor_coredevice_id", device["id"]))
+        buckets.append(site_links)
+
+    def matches(link):
+        if coredevice_id is not None and link["coredevice_id"] != coredevice_id:
+            return False
+        if neighbor_coredevice_id is not None and link["neighbor_coredevice_id"] != neighbor_coredevice_id:
+            return False
+        if neighbor_site_id is not None:
+            neighbor = store.get("core_devices", link["neighbor_coredevice_id"])
+            if neighbor is None or neighbor["coresite_id"] != neighbor_site_id:
+                return False
+        return True
+
+    if buckets:
+        # Smallest bucket drives the query, the other filters are checked per link
+        candidates = min(buckets, key=len)
+        rows = sorted(
+            ((link.get(order_field), link["id"]), link)
+            for link in candidates
+            if link.get(order_field) is not None and _in_range(link.get(order_field), start_date, end_date)
+        )
+        matched = (
+            (key, link) for key, link in rows
+            if (after is None or key > after) and matches(link)
+        )
+    else:
+        matched = (
+            ((value, link["id"]), link)
+            for value, link in _ranged(store.scan("links", order_field, start=start_date, after=after), end_date)
+        )
+
+    page = list(islice(matched, skip, skip + limit + 1))
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(order_field, page[-1][0])
+    return [link for _, link in page], next_cursor
+
+
+def _in_range(value, start, end):
+    if start is not None and value < start:
+        return False
+    if end is not None and value > end:
+        return False
+    return True
+
+
+def _ranged(scan, end):
+    for value, link in scan:
+        if end is not None and value > end:
+            return
+        yield value, link
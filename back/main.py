@@ -1,15 +1,36 @@
 import time
 import os
-import json
+import threading
 from datetime import datetime, timedelta
 from typing import List, Optional
 
-from fastapi import FastAPI, Depends, HTTPException, APIRouter, Request
+from fastapi import FastAPI, Depends, HTTPException, APIRouter, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 
-from dummy_data import DUMMY_DB
+from dummy_data import load_dataset
+from store import Store
+from sqlite_store import SqliteStore
+from snapshot import LazyView, ReadOnlyStoreError, SnapshotStore
+from alert_feed import AlertFeed
+from alert_index import SORT_FIELDS as ALERT_SORT_FIELDS, AlertIndex
+from link_events import LinkStatusBroadcaster, apply_status_change
+from response_cache import CoalescingCache, EncodedResponseCache
+from link_query import DATE_FIELDS, InvalidCursor, normalize_date, query_links
+from link_metrics import LOAD_FIELDS as LINK_METRIC_FIELDS, METRICS, LinkMetricsStore
+from rollups import HealthRollups
+from auth import Authenticator
+from references import delete_blocker, references
+from layout import TopologyLayouts, scaled
+from graph import LinkGraph
+from search import RESULT_TYPES, SearchIndex
+from ip_index import AddressIndex
+from timeseries import SERIES_METRICS, LinkTimeSeries
+from ingest import CrawlIngester, CycleInProgress, parse_records
+from instrumentation import MetricsMiddleware, RequestMetrics, SlowRequestProfiler, TimedRoute, request_phase
+from bulk_admin import BatchError, apply_batch, new_coredevice, new_coresite, new_network, parse_batch
 
 # --- Pydantic Schemas for Request Bodies (matching frontend schemas) ---
 
@@ -34,6 +55,10 @@ class SiteDescription(BaseModel):
 class FavoriteLinksUpdate(BaseModel):
     link_ids: list = []
 
+class LinkStatusChange(BaseModel):
+    physical_status: Optional[str] = None
+    protocol_status: Optional[str] = None
+
 class LinkBase(BaseModel):
     pass # Not used in dummy backend, but kept for signature matching
 
@@ -54,249 +79,546 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
-# In-memory database from our dummy data generator
-db = DUMMY_DB
-
-# --- Dummy Authentication Dependencies ---
-# These functions simulate the role checkers from the original backend.
-def user_role_checker(request: Request):
-    # For dummy backend, we'll just return a mock user
-    user = next((u for u in db["users"] if u["username"] == "userg"), None)
-    if not user:
-        raise HTTPException(status_code=401, detail="Mock user not found")
+# --- Request metrics ---
+# Per-route counts, latency/size/phase histograms and in-flight gauges, served
+# by /metrics in the Prometheus text format. SPIDERWEB_PROFILE_SLOW_MS turns on
+# stack sampling of requests slower than that many milliseconds (a
+# SPIDERWEB_PROFILE_SAMPLE share of requests is watched, all by default);
+# the reports are served by /admin/slow-requests.
+request_metrics = RequestMetrics()
+slow_request_profiler = None
+if os.environ.get("SPIDERWEB_PROFILE_SLOW_MS"):
+    slow_request_profiler = SlowRequestProfiler(
+        float(os.environ["SPIDERWEB_PROFILE_SLOW_MS"]) / 1000,
+        sample_rate=float(os.environ.get("SPIDERWEB_PROFILE_SAMPLE", "1")))
+app.add_middleware(MetricsMiddleware, metrics=request_metrics, profiler=slow_request_profiler)
+
+# Indexed in-memory store around the data from our dummy data generator
+# (SPIDERWEB_DATASET picks the dataset: demo, a preset size or an NDJSON dump).
+# SPIDERWEB_STORAGE=sqlite keeps it in a durable SQLite file shared by all
+# workers instead; the dataset is only generated when that file is empty.
+# SPIDERWEB_STORAGE=snapshot serves a read-only snapshot (built by snapshot.py)
+# that all workers map from the page cache and swap when a new one is published.
+storage = os.environ.get("SPIDERWEB_STORAGE")
+if storage == "sqlite":
+    store = SqliteStore(os.environ.get("SPIDERWEB_SQLITE_PATH", "spiderweb.db"), seed=load_dataset)
+elif storage == "snapshot":
+    store = SnapshotStore(os.environ.get("SPIDERWEB_SNAPSHOT_PATH", "inventory.snap"))
+else:
+    store = Store(load_dataset())
+
+if storage == "sqlite":
+    # The derived views below load from one read snapshot; the changes
+    # committed after it (by any worker) are replayed to them from there
+    store.pause_replay()
+
+def _derived_view(build):
+    """
+    `build()` for a view derived from the store's data. Snapshot workers
+    defer it to first use or the warm-up thread started below, so they
+    serve as soon as the snapshot is mapped.
+    """
+    return LazyView(build) if storage == "snapshot" else build()
+
+# Per-crawl-cycle log of alert changes, served as deltas by /alerts
+alert_feed = AlertFeed(store)
+alert_feed.attach()
+
+# Sorted/posting indexes over the alerts for filtered, paged queries and histograms
+alert_index = _derived_view(lambda: AlertIndex(store))
+alert_index.attach()
+
+# Fan-out of link status changes to the /ws/updates subscribers
+link_broadcaster = LinkStatusBroadcaster()
+link_broadcaster.attach(store)
+WS_HEARTBEAT_SECONDS = 15
+
+# Encoded /links/topology body, rebuilt only when a link changes
+topology_cache = EncodedResponseCache(lambda: store.all("links"), lambda: store.version("links"))
+
+# Results of the heavy read routes per query and data version; identical concurrent requests share one computation
+read_cache = CoalescingCache()
+
+def _versions(*tables):
+    return tuple(store.version(t) for t in tables)
+
+# Typed columns of the link metrics for vectorized aggregate queries
+link_metrics = _derived_view(lambda: LinkMetricsStore(store.all("links", fields=LINK_METRIC_FIELDS)))
+link_metrics.attach(store)
+
+# Link health counters per coresite/coredevice/network, updated on every link write
+health_rollups = _derived_view(lambda: HealthRollups(store))
+health_rollups.attach()
+
+# Force-directed node positions per coresite/end-site view, laid out again only when its graph changes
+topology_layouts = TopologyLayouts(store)
+
+# Up-link adjacency of the core devices for path / component / failure-impact queries
+link_graph = _derived_view(lambda: LinkGraph(store))
+link_graph.attach()
+
+# Prefix/token inverted index over device, end-site and link text for /search
+search_index = _derived_view(lambda: SearchIndex(store))
+search_index.attach()
+
+# Radix tree of the device and interface addresses for /ip lookups
+address_index = _derived_view(lambda: AddressIndex(store))
+address_index.attach()
+
+# Ring-buffered per-crawl-cycle history of the link counters
+link_series = LinkTimeSeries()
+link_series.attach(store)
+
+if storage == "sqlite":
+    store.resume_replay()
+elif storage == "snapshot":
+    # Builds the deferred views off the request path; a request needing one sooner waits for its build
+    def _warm_views(views):
+        for view in views:
+            view.warm()
+
+    threading.Thread(target=_warm_views, name="snapshot-views", daemon=True,
+                     args=((alert_index, link_metrics, health_rollups, link_graph, search_index, address_index),)).start()
+
+def close_crawl_cycle():
+    """Ends the running crawl cycle and records its link counters in the time series."""
+    cycle = alert_feed.close_cycle()
+    columns = link_metrics.columns("id", *SERIES_METRICS)
+    link_series.record(cycle, columns["id"], columns)
+    return cycle
+
+# Applies crawler runs (NDJSON interface records) to the links, deriving alerts
+crawl_ingester = CrawlIngester(store, alert_feed, close_crawl_cycle)
+
+if storage == "snapshot":
+    # A published snapshot replaces everything at once. The store calls this
+    # on its swap thread, whose reads already see the new snapshot: fresh
+    # views are built there and swapped in, while requests keep using the
+    # old snapshot and views until the store moves them over
+    def _on_snapshot_swap():
+        global alert_index, link_metrics, health_rollups, link_graph, search_index, address_index
+        views = (
+            AlertIndex(store),
+            LinkMetricsStore(store.all("links", fields=LINK_METRIC_FIELDS)),
+            HealthRollups(store),
+            LinkGraph(store),
+            SearchIndex(store),
+            AddressIndex(store),
+        )
+        alert_index, link_metrics, health_rollups, link_graph, search_index, address_index = views
+        alert_feed.reset()
+        link_broadcaster.resync()
+
+    store.on_swap(_on_snapshot_swap)
+elif storage == "sqlite":
+    # A worker that missed changes pruned from the log can't replay them:
+    # rebuild the derived views (on the store's poller thread)
+    def _on_missed_changes():
+        alert_feed.reset()
+        alert_index.reload()
+        link_metrics.reload(store.all("links", fields=LINK_METRIC_FIELDS))
+        health_rollups.reload()
+        link_graph.reload()
+        search_index.reload()
+        address_index.reload()
+        link_broadcaster.resync()
+
+    store.on_swap(_on_missed_changes)
+
+@app.exception_handler(ReadOnlyStoreError)
+async def read_only_store_handler(request: Request, exc: ReadOnlyStoreError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
+# --- Authentication Dependencies ---
+# Bearer tokens from /login. Key material is built once and verified claims are
+# cached, so both checkers cost the same however many users and tokens exist.
+# They are async so FastAPI does not hop to its threadpool for them.
+authenticator = Authenticator(store)
+
+async def user_role_checker(request: Request):
+    with request_phase("auth"):
+        return authenticator.current_user(request)
+
+async def admin_role_checker(request: Request):
+    with request_phase("auth"):
+        user = authenticator.current_user(request)
+    if user["role"] != "admin":
+        raise HTTPException(status_code=403, detail="Admin privileges required")
     return user
 
-def admin_role_checker(request: Request):
-    # For dummy backend, we'll just return a mock admin
-    admin_user = next((u for u in db["users"] if u["role"] == "admin"), None)
-    if not admin_user:
-        raise HTTPException(status_code=401, detail="Mock admin not found")
-    return admin_user
-
+# --- Bulk admin batches ---
+# NDJSON (or CSV with Content-Type text/csv) rows of creates and deletes,
+# validated as a whole and applied in one transaction. 422 lists the bad rows.
+async def bulk_admin(request: Request, table: str, dry_run: bool):
+    try:
+        rows = parse_batch(await request.body(), request.headers.get("content-type", ""))
+    except BatchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result = await run_in_threadpool(apply_batch, store, table, rows, dry_run)
+    if result["errors"]:
+        return JSONResponse(status_code=422, content=result)
+    return result
 
-# ==============================================================================
-# ALERTS ROUTES (from alerts.py)
-# ==============================================================================
-router_alerts = APIRouter()
 
 # ==============================================================================
 # ALERTS ROUTES (from alerts.py)
 # ==============================================================================
-router_alerts = APIRouter()
+router_alerts = APIRouter(route_class=TimedRoute)
 
 @router_alerts.get("/alerts")
 @router_alerts.get("/get_all_alerts")
 def get_alerts(last_crawl_number: Optional[int] = None):
-    # Non-blocking immediate return for alerts
+    # Only the alerts added/removed since `last_crawl_number`; a full snapshot
+    # when it is missing or older than the retained cycle log.
     return JSONResponse(
-        content={"alerts": db["alerts"], "current_crawl_number": db["crawler_cycle"]["count"]},
+        content=alert_feed.delta(last_crawl_number),
         media_type="application/json"
     )
 
+@router_alerts.delete("/delete_alert/{alert_id}")
+async def delete_alert(alert_id: int, current_user: dict = Depends(user_role_checker)):
+    if alert_feed.remove(alert_id) is None:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    return {"message": "Alert deleted successfully"}
+
 @router_alerts.get("/get_all_alerts_status")
 def get_all_alerts_status():
-    return {"status": "ok", "count": len(db["alerts"])}
+    return {"status": "ok", "count": store.count("alerts")}
 
 @router_alerts.get("/get_all_alerts_severity")
 def get_all_alerts_severity():
-    return {"severities": [a.get("severityScore", 1) for a in db["alerts"]]}
+    return {"severities": alert_index.severities()}
+
+def _check_window(since: Optional[str], until: Optional[str]):
+    """The window bounds in the stored timestamp form (a date-only `until` covers that whole day)."""
+    bounds = []
+    for value, end in ((since, False), (until, True)):
+        try:
+            bounds.append(normalize_date(value, end=end) if value is not None else None)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid date: {value}")
+    return bounds
+
+@router_alerts.get("/alerts/query")
+def query_alerts(
+        type: Optional[List[str]] = Query(None), min_severity: Optional[int] = None,
+        max_severity: Optional[int] = None, coredevice_id: Optional[int] = None,
+        source: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+        q: Optional[str] = None, sort: str = "timestamp", order: str = "desc",
+        cursor: Optional[str] = None, limit: int = 50,
+        current_user: dict = Depends(user_role_checker)):
+    # Keyset pagination: pass `next_cursor` of a page as `cursor` (with the same filters) to get the next one
+    if sort not in ALERT_SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(ALERT_SORT_FIELDS)}")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be asc or desc")
+    if not 1 <= limit <= 500:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 500")
+    since, until = _check_window(since, until)
+    params = dict(types=type, min_severity=min_severity, max_severity=max_severity,
+                  coredevice_id=coredevice_id, source=source, since=since, until=until, text=q,
+                  sort=sort, descending=order == "desc", cursor=cursor, limit=limit)
+    try:
+        alerts, next_cursor = read_cache.get(
+            "alerts/query", params, _versions("alerts"), lambda: alert_index.query(**params))
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"alerts": alerts, "next_cursor": next_cursor}
+
+@router_alerts.get("/alerts/histogram")
+def get_alerts_histogram(
+        since: Optional[str] = None, until: Optional[str] = None,
+        coredevice_id: Optional[int] = None, source: Optional[str] = None,
+        current_user: dict = Depends(user_role_checker)):
+    since, until = _check_window(since, until)
+    params = dict(since=since, until=until, coredevice_id=coredevice_id, source=source)
+    return read_cache.get("alerts/histogram", params, _versions("alerts"), lambda: alert_index.histogram(**params))
 
 # ==============================================================================
 # CORE DEVICE ROUTES (from coredevice.py)
 # ==============================================================================
-router_coredevice = APIRouter()
+router_coredevice = APIRouter(route_class=TimedRoute)
 
 @router_coredevice.get("/get_core_devices")
 @router_coredevice.get("/coredevices")
 async def get_all_core_devices(current_user: dict = Depends(user_role_checker)):
-    return db["core_devices"]
+    return store.all("core_devices")
+
+@router_coredevice.get("/coredevices/health")
+async def get_coredevices_health(current_user: dict = Depends(user_role_checker)):
+    return health_rollups.rollup("coredevice")
 
 @router_coredevice.get("/coresite/{coresite_id}/coredevices")
 async def get_core_devices_by_coresite(coresite_id: int, current_user: dict = Depends(user_role_checker)):
-    devices = [d for d in db["core_devices"] if d["coresite_id"] == coresite_id]
-    return devices
+    return store.find("core_devices", "coresite_id", coresite_id)
 
 @router_coredevice.get("/network/{network_id}/coresite/{coresite_id}/coredevices")
 async def get_coresite_coredevices_with_network(network_id: int, coresite_id: int):
     devices = [
-        d for d in db["core_devices"] 
-        if d["coresite_id"] == coresite_id and network_id in d.get("network_ids", [])
+        d for d in store.find("core_devices", "coresite_id", coresite_id)
+        if network_id in d.get("network_ids", [])
     ]
     return devices
 
 @router_coredevice.post("/admin/coredevice/create/")
 @router_coredevice.post("/add_core_device")
 async def create_coredevice_admin(coredevice: CoreDeviceCreate, current_user: dict = Depends(admin_role_checker)):
-    if any(d["name"] == coredevice.name for d in db["core_devices"]):
+    if store.find("core_devices", "name", coredevice.name):
         raise HTTPException(status_code=400, detail="coredevice already exists.")
-    
-    new_id = max(d["id"] for d in db["core_devices"]) + 1 if db["core_devices"] else 1
-    new_device = {
-        "id": new_id,
-        "name": coredevice.name,
-        "hostname": coredevice.name,
-        "ip": coredevice.ip,
-        "ip_address": coredevice.ip,
-        "coresite_id": coredevice.coresite_id,
-        "core_pikudim_site_id": coredevice.coresite_id,
-        "network_ids": [],
-        "network_type_id": 1,
-    }
-    db["core_devices"].append(new_device)
+
+    new_device = new_coredevice(store.next_id("core_devices"), coredevice.name, coredevice.ip, coredevice.coresite_id)
+    store.insert("core_devices", new_device)
     return new_device
 
+@router_coredevice.get("/coredevice/{coredevice_id}/references")
+async def get_coredevice_references(coredevice_id: int, limit: int = 100, current_user: dict = Depends(admin_role_checker)):
+    if store.get("core_devices", coredevice_id) is None:
+        raise HTTPException(status_code=404, detail='coredevice not found.')
+    return references(store, "core_devices", coredevice_id, limit)
+
+@router_coredevice.post("/admin/coredevice/bulk")
+async def bulk_coredevices_admin(request: Request, dry_run: bool = False, current_user: dict = Depends(admin_role_checker)):
+    return await bulk_admin(request, "core_devices", dry_run)
+
 @router_coredevice.delete("/admin/coredevice/delete/{coredevice_id}")
 @router_coredevice.delete("/delete_device/{coredevice_id}")
 async def delete_coredevice_admin(coredevice_id: int, current_user: dict = Depends(admin_role_checker)):
-    device_to_delete = next((d for d in db["core_devices"] if d["id"] == coredevice_id), None)
+    device_to_delete = store.get("core_devices", coredevice_id)
     if not device_to_delete:
         raise HTTPException(status_code=404, detail='coredevice not found.')
     
-    if any(coredevice_id in s.get("coredevice_ids", []) for s in db["sites"]):
-         raise HTTPException(status_code=400, detail="Coredevice is associated with end-site, cannot delete")
+    blocker = delete_blocker(store, "core_devices", coredevice_id)
+    if blocker:
+        raise HTTPException(status_code=400, detail=blocker)
 
-    db["core_devices"] = [d for d in db["core_devices"] if d["id"] != coredevice_id]
+    store.delete("core_devices", coredevice_id)
     return {"message": "Coredevice deleted successfully"}
 
 
 # ==============================================================================
 # CORE SITE ROUTES (from coresite.py)
 # ==============================================================================
-router_coresite = APIRouter()
+router_coresite = APIRouter(route_class=TimedRoute)
 
 @router_coresite.get("/get_core_pikudim")
 @router_coresite.get("/core_sites")
 async def get_all_core_sites(current_user: dict = Depends(user_role_checker)):
-    return db["core_sites"]
+    return store.all("core_sites")
+
+@router_coresite.get("/core_sites/health")
+async def get_core_sites_health(current_user: dict = Depends(user_role_checker)):
+    return health_rollups.rollup("coresite")
 
 @router_coresite.post("/admin/coresite/create/")
 @router_coresite.post("/add_core_pikudim")
 async def create_coresite_admin(coresite: CoreSiteCreate, current_user: dict = Depends(admin_role_checker)):
-    if any(cs["name"] == coresite.name for cs in db["core_sites"]):
+    if store.find("core_sites", "name", coresite.name):
         raise HTTPException(status_code=400, detail="coresite already exists.")
-    
-    new_id = max(cs["id"] for cs in db["core_sites"]) + 1 if db["core_sites"] else 1
-    new_site = {"id": new_id, "name": coresite.name, "core_site_name": coresite.name, "network_ids": []}
-    db["core_sites"].append(new_site)
+
+    new_site = new_coresite(store.next_id("core_sites"), coresite.name)
+    store.insert("core_sites", new_site)
     return new_site
 
+@router_coresite.get("/coresite/{coresite_id}/layout")
+def get_coresite_layout(coresite_id: int, width: float = 1.0, height: float = 1.0,
+                        current_user: dict = Depends(user_role_checker)):
+    layout = topology_layouts.coresite(coresite_id)
+    if layout is None:
+        raise HTTPException(status_code=404, detail="coresite not found.")
+    return scaled(layout, width, height)
+
+@router_coresite.get("/coresite/{coresite_id}/references")
+async def get_coresite_references(coresite_id: int, limit: int = 100, current_user: dict = Depends(admin_role_checker)):
+    if store.get("core_sites", coresite_id) is None:
+        raise HTTPException(status_code=404, detail='coresite not found.')
+    return references(store, "core_sites", coresite_id, limit)
+
+@router_coresite.post("/admin/coresite/bulk")
+async def bulk_coresites_admin(request: Request, dry_run: bool = False, current_user: dict = Depends(admin_role_checker)):
+    return await bulk_admin(request, "core_sites", dry_run)
+
 @router_coresite.delete("/admin/coresite/delete/{coresite_id}")
 @router_coresite.delete("/delete_core_pikudim/{coresite_id}")
 async def delete_coresite_admin(coresite_id: int, current_user: dict = Depends(admin_role_checker)):
-    site_to_delete = next((cs for cs in db["core_sites"] if cs["id"] == coresite_id), None)
+    site_to_delete = store.get("core_sites", coresite_id)
     if not site_to_delete:
         raise HTTPException(status_code=404, detail='coresite not found.')
 
-    if any(d["coresite_id"] == coresite_id for d in db["core_devices"]):
-        raise HTTPException(status_code=400, detail="Coresite is associated with coredevice, cannot delete")
+    blocker = delete_blocker(store, "core_sites", coresite_id)
+    if blocker:
+        raise HTTPException(status_code=400, detail=blocker)
 
-    db["core_sites"] = [cs for cs in db["core_sites"] if cs["id"] != coresite_id]
+    store.delete("core_sites", coresite_id)
     return {"message": "Coresite deleted successfully"}
 
 # ==============================================================================
 # NETWORK ROUTES (from network.py)
 # ==============================================================================
-router_network = APIRouter()
+router_network = APIRouter(route_class=TimedRoute)
 
 @router_network.get("/networks/")
 @router_network.get("/get_net_types")
 async def get_networks(current_user: dict = Depends(user_role_checker)):
-    return db["networks"]
+    return store.all("networks")
+
+@router_network.get("/networks/health")
+async def get_networks_health(current_user: dict = Depends(user_role_checker)):
+    return health_rollups.rollup("network")
 
 @router_network.get("/network/{network_id}/coresites")
 async def get_network_coresites(network_id: int, current_user: dict = Depends(user_role_checker)):
-    sites = [cs for cs in db["core_sites"] if network_id in cs.get("network_ids", [])]
+    sites = store.find("core_sites", "network_ids", network_id)
     return [{"id": s["id"], "name": s["name"]} for s in sites]
 
 @router_network.post("/admin/network/create/")
 @router_network.post("/add_net_type")
 async def create_network_admin(network: NetworkCreate, current_user: dict = Depends(admin_role_checker)):
-    if any(n["name"] == network.name for n in db["networks"]):
+    if store.find("networks", "name", network.name):
         raise HTTPException(status_code=400, detail="network already exists.")
-    
-    new_id = max(n["id"] for n in db["networks"]) + 1 if db["networks"] else 1
-    new_network = {"id": new_id, "name": network.name}
-    db["networks"].append(new_network)
-    return new_network
+
+    network_record = new_network(store.next_id("networks"), network.name)
+    store.insert("networks", network_record)
+    return network_record
+
+@router_network.get("/network/{network_id}/references")
+async def get_network_references(network_id: int, limit: int = 100, current_user: dict = Depends(admin_role_checker)):
+    if store.get("networks", network_id) is None:
+        raise HTTPException(status_code=404, detail='network not found.')
+    return references(store, "networks", network_id, limit)
+
+@router_network.post("/admin/network/bulk")
+async def bulk_networks_admin(request: Request, dry_run: bool = False, current_user: dict = Depends(admin_role_checker)):
+    return await bulk_admin(request, "networks", dry_run)
 
 @router_network.delete("/admin/network/delete/{network_id}")
 @router_network.delete("/delete_net_type/{network_id}")
 async def delete_network_admin(network_id: int, current_user: dict = Depends(admin_role_checker)):
-    if not any(n["id"] == network_id for n in db["networks"]):
+    if store.get("networks", network_id) is None:
          raise HTTPException(status_code=404, detail='network not found.')
 
-    if any(network_id in cs.get("network_ids", []) for cs in db["core_sites"]) or \
-       any(network_id in d.get("network_ids", []) for d in db["core_devices"]):
-       raise HTTPException(status_code=400, detail="Network is associated with coresite or coredevice, cannot delete")
+    blocker = delete_blocker(store, "networks", network_id)
+    if blocker:
+        raise HTTPException(status_code=400, detail=blocker)
 
-    db["networks"] = [n for n in db["networks"] if n["id"] != network_id]
+    store.delete("networks", network_id)
     return {"message": "Network deleted successfully"}
 
 
 # ==============================================================================
 # LINK ROUTES (from link.py)
 # ==============================================================================
-router_link = APIRouter()
+router_link = APIRouter(route_class=TimedRoute)
 
 @router_link.get("/link/{link_id}")
 async def get_link(link_id: int, current_user: dict = Depends(user_role_checker)):
-    link = next((l for l in db["links"] if l["id"] == link_id), None)
+    link = store.get("links", link_id)
     if link is None:
         raise HTTPException(status_code=404, detail="Link not found")
     return link
 
 @router_link.get("/links")
 def get_filtered_links(
+        response: Response,
         skip: int = 0, limit: int = 20, coredevice_id: Optional[int] = None,
         neighbor_site_id: Optional[str] = None, neighbor_coredevice_id: Optional[str] = None,
         start_date: Optional[str] = None, end_date: Optional[str] = None,
+        date_field: str = "updated_at", cursor: Optional[str] = None,
         current_user: dict = Depends(user_role_checker)):
-    
-    results = db["links"]
-    if coredevice_id:
-        results = [l for l in results if l["coredevice_id"] == coredevice_id]
-
-    # Other filters can be added here if needed for dummy logic
-    
-    return results[skip : skip + limit]
+    # Keyset pagination: pass the X-Next-Cursor header of a page as `cursor` to get the next one
+    if date_field not in DATE_FIELDS:
+        raise HTTPException(status_code=400, detail=f"date_field must be one of {', '.join(DATE_FIELDS)}")
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be at least 1")
+    try:
+        start_date = normalize_date(start_date) if start_date is not None else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {start_date}")
+    try:
+        end_date = normalize_date(end_date, end=True) if end_date is not None else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {end_date}")
+    try:
+        neighbor_site = int(neighbor_site_id) if neighbor_site_id is not None else None
+        neighbor_device = int(neighbor_coredevice_id) if neighbor_coredevice_id is not None else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="neighbor ids must be integers")
+
+    params = dict(coredevice_id=coredevice_id, neighbor_coredevice_id=neighbor_device,
+                  neighbor_site_id=neighbor_site, start_date=start_date, end_date=end_date,
+                  date_field=date_field, cursor=cursor, skip=max(skip, 0), limit=limit)
+    try:
+        results, next_cursor = read_cache.get(
+            "links", params, _versions("links", "core_devices"), lambda: query_links(store, **params))
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return results
+
+def _check_metric(metric: str):
+    if metric not in METRICS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of {', '.join(METRICS)}")
+
+@router_link.get("/links/metrics/top")
+def get_top_links_by_metric(metric: str = "crc", n: int = 10, ascending: bool = False,
+                            current_user: dict = Depends(user_role_checker)):
+    _check_metric(metric)
+    return read_cache.get("links/metrics/top", {"metric": metric, "n": n, "ascending": ascending},
+                          _versions("links"), lambda: link_metrics.top(metric, n=n, ascending=ascending))
+
+@router_link.get("/links/metrics/filter")
+def get_links_by_metric_threshold(metric: str, below: Optional[float] = None, above: Optional[float] = None,
+                                  current_user: dict = Depends(user_role_checker)):
+    # e.g. ?metric=rx&below=-4 for weak optical receive levels
+    _check_metric(metric)
+    link_ids = read_cache.get("links/metrics/filter", {"metric": metric, "below": below, "above": above},
+                              _versions("links"), lambda: link_metrics.where(metric, below=below, above=above))
+    return {"count": len(link_ids), "link_ids": link_ids}
+
+@router_link.get("/links/metrics/utilization")
+def get_network_utilization(current_user: dict = Depends(user_role_checker)):
+    return read_cache.get("links/metrics/utilization", {}, _versions("links"), link_metrics.utilization_by_network)
 
 @router_link.get("/coredevice/{coredevice_id}/links-to-end-sites")
 def get_links_to_end_sites(coredevice_id: Optional[int] = None, current_user: dict = Depends(user_role_checker)):
     # This is a complex query, for the dummy backend we can return a subset of links
     # that are NOT core-to-core
-    end_site_links = [l for l in db["links"] if l["coredevice_id"] == coredevice_id and not l["neighbor_is_core"]]
-    return end_site_links
+    return read_cache.get(
+        "links-to-end-sites", {"coredevice_id": coredevice_id}, _versions("links"),
+        lambda: [l for l in store.find("links", "coredevice_id", coredevice_id) if not l["neighbor_is_core"]])
 
 @router_link.get("/favorite-links")
 async def get_favorite_links(current_user: dict = Depends(user_role_checker)):
     user_id = current_user['id']
-    user = next((u for u in db["users"] if u["id"] == user_id), None)
+    user = store.get("users", user_id)
     if user:
-        user_favs = {str(x) for x in user.get("favorite_links", []) if not isinstance(x, dict)}
-        return [l for l in db["links"] if str(l["id"]) in user_favs]
+        user_favs = {int(x) for x in user.get("favorite_links", []) if str(x).isdigit()}
+        links = (store.get("links", link_id) for link_id in sorted(user_favs))
+        return [l for l in links if l is not None]
     return []
 
 @router_link.post("/add-favorite-link/{link_id}")
 async def add_favorite_link(link_id: int, current_user: dict = Depends(user_role_checker)):
     user_id = current_user['id']
-    user = next((u for u in db["users"] if u["id"] == user_id), None)
-    link = next((l for l in db["links"] if l["id"] == link_id), None)
+    user = store.get("users", user_id)
+    link = store.get("links", link_id)
     if user and link:
         if link_id not in user["favorite_links"]:
-            user["favorite_links"].append(link_id)
+            store.update("users", user_id, {"favorite_links": user["favorite_links"] + [link_id]})
         return {"message": "Link added to favorites successfully"}
     raise HTTPException(status_code=404, detail="Link or user not found")
 
 @router_link.delete("/delete-favorite-link/{link_id}")
 async def delete_favorite_link(link_id: int, current_user: dict = Depends(user_role_checker)):
     user_id = current_user['id']
-    user = next((u for u in db["users"] if u["id"] == user_id), None)
-    link = next((l for l in db["links"] if l["id"] == link_id), None)
+    user = store.get("users", user_id)
+    link = store.get("links", link_id)
     if user and link:
         if link_id in user["favorite_links"]:
-            user["favorite_links"].remove(link_id)
+            store.update("users", user_id, {"favorite_links": [x for x in user["favorite_links"] if x != link_id]})
         return {"message": "Link removed from favorites successfully"}
     raise HTTPException(status_code=404, detail="Link or user not found")
 
@@ -304,109 +626,257 @@ async def delete_favorite_link(link_id: int, current_user: dict = Depends(user_r
 @router_link.post("/favorite-links")
 async def update_favorite_links(data: FavoriteLinksUpdate, current_user: dict = Depends(user_role_checker)):
     user_id = current_user['id']
-    user = next((u for u in db["users"] if u["id"] == user_id), None)
+    user = store.get("users", user_id)
     if user:
-        user["favorite_links"] = [int(x) if str(x).isdigit() else str(x) for x in data.link_ids if not isinstance(x, dict)]
+        favorite_links = [int(x) if str(x).isdigit() else str(x) for x in data.link_ids if not isinstance(x, dict)]
+        user = store.update("users", user_id, {"favorite_links": favorite_links})
         return {"success": True, "updated_ids": user["favorite_links"]}
     return {"success": True, "updated_ids": data.link_ids}
 
 @router_link.get("/get_ten_gig_lines")
 @router_link.get("/links/topology")
-def get_links_with_neighbors():
-    return db["links"]
+def get_links_with_neighbors(request: Request):
+    # Pre-encoded body; a matching If-None-Match gets a 304
+    return topology_cache.respond(request)
+
+@router_link.websocket("/ws/updates")
+async def link_status_updates(websocket: WebSocket, since: Optional[int] = None):
+    # Pushes {"type": "link_update", "seq", "payload": {id, changed fields, status_changed_at}}.
+    # Reconnect with ?since=<last seq> to resume without refetching the topology.
+    await websocket.accept()
+    subscription = link_broadcaster.subscribe(since)
+    try:
+        while True:
+            try:
+                event = await subscription.next(timeout=WS_HEARTBEAT_SECONDS)
+            except StopAsyncIteration:
+                # Too slow to keep up; the client should reconnect with `since`
+                await websocket.send_json({"type": "dropped", "seq": subscription.last_seq})
+                await websocket.close(code=1013)
+                break
+            if event is None:
+                event = {"type": "heartbeat", "seq": link_broadcaster.seq}
+            await websocket.send_json(event)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        subscription.close()
+
+@router_link.post("/admin/link/{link_id}/inject-status")
+def inject_link_status(link_id: int, change: LinkStatusChange, current_user: dict = Depends(admin_role_checker)):
+    # Local event injector for testing the status stream
+    changes = apply_status_change(store, link_id, change.model_dump(exclude_none=True))
+    if changes is None:
+        raise HTTPException(status_code=404, detail="Link not found")
+    return {"changed": changes, "seq": link_broadcaster.seq}
+
+@router_link.get("/links/timeseries")
+def get_links_timeseries(link_id: List[int] = Query(...), metric: Optional[List[str]] = Query(None),
+                         start: Optional[int] = None, end: Optional[int] = None, resolution: Optional[int] = None,
+                         current_user: dict = Depends(user_role_checker)):
+    # ?link_id=1&link_id=2&metric=crc; start/end are crawl cycle numbers
+    metrics = metric or list(SERIES_METRICS)
+    unknown = [m for m in metrics if m not in SERIES_METRICS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown metrics {unknown}; use {list(SERIES_METRICS)}")
+    if len(link_id) > 500:
+        raise HTTPException(status_code=400, detail="At most 500 links per query")
+    try:
+        return link_series.series(link_id, metrics, start, end, resolution)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router_link.post("/admin/crawl-cycle/close")
+def close_crawl_cycle_admin(current_user: dict = Depends(admin_role_checker)):
+    # Stands in for the crawler finishing a pass
+    return {"current_crawl_number": close_crawl_cycle()}
+
+@router_link.get("/admin/read-cache")
+def get_read_cache_stats(current_user: dict = Depends(admin_role_checker)):
+    # Hits, misses and coalesced (waited on an identical in-flight request) per route
+    return read_cache.stats()
+
+@router_link.post("/crawler/cycle")
+async def ingest_crawl_cycle(request: Request, current_user: dict = Depends(admin_role_checker)):
+    # One full crawler run as streamed NDJSON, one interface (link) record per line
+    try:
+        return await crawl_ingester.ingest(request.stream())
+    except CycleInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+async def _refresh_records(request: Request):
+    try:
+        return parse_records(await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router_link.put("/refresh_interfaces_per_device/{coredevice_id}")
+async def refresh_interfaces_per_device(coredevice_id: int, request: Request, current_user: dict = Depends(user_role_checker)):
+    # Re-polled records of one device's interfaces, applied within the running cycle
+    if store.get("core_devices", coredevice_id) is None:
+        raise HTTPException(status_code=404, detail='coredevice not found.')
+    records = await _refresh_records(request)
+    result = await run_in_threadpool(crawl_ingester.apply, records, coredevice_id)
+    return {"status": "ok", **result}
+
+@router_link.put("/refresh_interface")
+async def refresh_interface(request: Request, current_user: dict = Depends(user_role_checker)):
+    records = await _refresh_records(request)
+    result = await run_in_threadpool(crawl_ingester.apply, records)
+    return {"status": "ok", **result}
+
+@router_link.get("/graph/path")
+def get_graph_paths(source_id: int, target_id: int, k: int = 1, current_user: dict = Depends(user_role_checker)):
+    if not 1 <= k <= 10:
+        raise HTTPException(status_code=400, detail="k must be between 1 and 10")
+    for device_id in (source_id, target_id):
+        if store.get("core_devices", device_id) is None:
+            raise HTTPException(status_code=404, detail=f"coredevice {device_id} not found.")
+    return link_graph.paths(source_id, target_id, k)
+
+@router_link.get("/graph/components")
+def get_graph_components(network_id: int, current_user: dict = Depends(user_role_checker)):
+    if store.get("networks", network_id) is None:
+        raise HTTPException(status_code=404, detail='network not found.')
+    return link_graph.components(network_id)
+
+@router_link.get("/graph/impact")
+def get_failure_impact(link_id: Optional[int] = None, device_id: Optional[int] = None,
+                       current_user: dict = Depends(user_role_checker)):
+    if (link_id is None) == (device_id is None):
+        raise HTTPException(status_code=400, detail="Give exactly one of link_id or device_id")
+    impact = link_graph.link_failure(link_id) if link_id is not None else link_graph.device_failure(device_id)
+    if impact is None:
+        raise HTTPException(status_code=404, detail="Link not found" if link_id is not None else "coredevice not found.")
+    return impact
 
 # ==============================================================================
 # SITE ROUTES (from site.py)
 # ==============================================================================
-router_site = APIRouter()
+router_site = APIRouter(route_class=TimedRoute)
 
 @router_site.get("/site/{site_id}")
 async def get_site(site_id: int, current_user: dict = Depends(user_role_checker)):
-    site = next((s for s in db["sites"] if s["id"] == site_id), None)
+    site = store.get("sites", site_id)
     if site is None:
         raise HTTPException(status_code=404, detail="Site not found")
     return site
 
 @router_site.get("/coredevice/{coredevice_id}/sites", response_model=list)
 async def get_sites_of_coredevice(coredevice_id: int, current_user: dict = Depends(user_role_checker)):
-    sites = [s for s in db["sites"] if coredevice_id in s["coredevice_ids"]]
-    return sites
+    return store.find("sites", "coredevice_ids", coredevice_id)
 
 @router_site.get("/get_sites")
 @router_site.get("/sites", response_model=List[dict])
 async def get_all_sites(current_user: dict = Depends(user_role_checker)):
-    return [{"id": s["id"], "name": s["name"]} for s in db["sites"]]
+    return [{"id": s["id"], "name": s["name"]} for s in store.all("sites")]
 
+# Layouts are computed in the threadpool (sync routes): a large view takes a while
 @router_site.post("/site/{site_id}/set-topology")
-async def set_topology(site_id: int, current_user: dict = Depends(user_role_checker)):
-    site = next((s for s in db["sites"] if s["id"] == site_id), None)
-    if site is None:
+def set_topology(site_id: int, current_user: dict = Depends(user_role_checker)):
+    if topology_layouts.site(site_id, force=True) is None:
         raise HTTPException(status_code=404, detail="Site not found")
-    # Mock topology data
-    mock_topo = ([{"x": 1, "y": 2}], [{"source": 0, "target": 0}])
-    site["topology"] = json.dumps(mock_topo)
     return {"message": "Topology set successfully"}
 
 @router_site.get("/site/{site_id}/get-topology")
-async def get_topology(site_id: int, current_user: dict = Depends(user_role_checker)):
-    site = next((s for s in db["sites"] if s["id"] == site_id), None)
-    if site is None:
+def get_topology(site_id: int, width: float = 1.0, height: float = 1.0,
+                 current_user: dict = Depends(user_role_checker)):
+    layout = topology_layouts.site(site_id)
+    if layout is None:
         raise HTTPException(status_code=404, detail="Site not found")
-    if not site["topology"]:
-        return {}
-    return json.loads(site["topology"])
+    return scaled(layout, width, height)
 
 @router_site.put("/site/{site_id}/set-description")
 async def update_site_description(site_id: int, description: SiteDescription, current_user: dict = Depends(user_role_checker)):
-    site = next((s for s in db["sites"] if s["id"] == site_id), None)
+    site = store.get("sites", site_id)
     if site is None:
         raise HTTPException(status_code=404, detail="Site not found")
-    site["description"] = description.description
+    store.update("sites", site_id, {"description": description.description})
     return {"message": "Description updated successfully"}
 
 @router_site.get("/site/{site_id}/get-description")
 async def get_site_description(site_id: int, current_user: dict = Depends(user_role_checker)):
-    site = next((s for s in db["sites"] if s["id"] == site_id), None)
+    site = store.get("sites", site_id)
     if site is None:
         raise HTTPException(status_code=404, detail="Site not found")
     return site["description"]
 
+# ==============================================================================
+# SEARCH ROUTES
+# ==============================================================================
+router_search = APIRouter(route_class=TimedRoute)
+
+@router_search.get("/search")
+def search(q: str, type: Optional[List[str]] = Query(None), limit: int = 20,
+           current_user: dict = Depends(user_role_checker)):
+    # Every word of `q` must match (as a whole term or a prefix); results come best first
+    if not 1 <= limit <= 100:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 100")
+    for kind in type or ():
+        if kind not in RESULT_TYPES:
+            raise HTTPException(status_code=400, detail=f"type must be one of {', '.join(RESULT_TYPES)}")
+    return read_cache.get("search", {"q": q, "type": type, "limit": limit},
+                          _versions("core_devices", "sites", "links"),
+                          lambda: search_index.search(q, types=type, limit=limit))
+
+@router_search.get("/ip/lookup")
+def lookup_ip(address: str, current_user: dict = Depends(user_role_checker)):
+    try:
+        entry = address_index.lookup(address)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid address: {address}")
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Address not found")
+    return entry
+
+@router_search.get("/ip/longest-match")
+def longest_match_ip(address: str, current_user: dict = Depends(user_role_checker)):
+    # The most specific indexed address or prefix covering `address`
+    try:
+        entry = address_index.longest_match(address)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid address: {address}")
+    if entry is None:
+        raise HTTPException(status_code=404, detail="No indexed prefix covers this address")
+    return entry
+
+@router_search.get("/ip/within")
+def ips_within(cidr: str, limit: int = 1000, current_user: dict = Depends(user_role_checker)):
+    if not 1 <= limit <= 10000:
+        raise HTTPException(status_code=400, detail="limit must be between 1 and 10000")
+    try:
+        return address_index.within(cidr, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid CIDR: {cidr}")
+
 # ==============================================================================
 # USER ROUTES (from user.py)
 # ==============================================================================
-router_user = APIRouter()
-
-# Dummy token generation for mock backend
-def generate_token(user_id: int) -> str:
-    from jose import jwt
-    # In a real app, use a strong, environment-variable-based secret key
-    SECRET_KEY = "a-dummy-secret-key-for-testing"
-    ALGORITHM = "HS256"
-    to_encode = {"sub": str(user_id), "exp": datetime.utcnow() + timedelta(hours=1)}
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+router_user = APIRouter(route_class=TimedRoute)
 
 @router_user.post("/login")
 def login(request: LoginRequest):
     # Simplified mock authentication
-    username = request.username
     # In this mock, we don't verify password to allow easy login
-    user = next((u for u in db["users"] if u["username"] == username), None)
+    user = authenticator.find_user(request.username)
     if user:
-        token = generate_token(user_id=user["id"])
+        token = authenticator.issue_token(user)
         return {"access_token": token, "token_type": "bearer", "role": user["role"]}
     else:
         raise HTTPException(status_code=401, detail="Incorrect username or password")
 
+@router_user.get("/users/me")
+async def get_current_user(current_user: dict = Depends(user_role_checker)):
+    return {"id": current_user["id"], "username": current_user["username"], "role": current_user["role"]}
+
 @router_user.get("/users/")
 async def get_all_users(current_user: dict = Depends(admin_role_checker)):
-    return [{"id": u["id"], "username": u["username"], "role": u["role"]} for u in db["users"]]
+    return [{"id": u["id"], "username": u["username"], "role": u["role"]} for u in store.all("users")]
 
 @router_user.put("/users/{user_id}/make-admin")
 async def make_user_admin(user_id: int, current_user: dict = Depends(admin_role_checker)):
-    user = next((u for u in db["users"] if u["id"] == user_id), None)
+    user = store.update("users", user_id, {"role": "admin"})
     if user:
-        user["role"] = "admin"
         return {"message": f"User {user['username']} is now an admin"}
     else:
         raise HTTPException(status_code=404, detail="User not found")
@@ -419,9 +889,45 @@ app.include_router(router_coresite, tags=["Core Sites"])
 app.include_router(router_network, tags=["Networks"])
 app.include_router(router_link, tags=["Links"])
 app.include_router(router_site, tags=["Sites"])
+app.include_router(router_search, tags=["Search"])
 app.include_router(router_user, tags=["Users"])
 
 
+# --- Metrics ---
+STORE_GAUGE_TABLES = ("links", "sites", "alerts", "core_devices")
+
+def _store_and_cache_metrics():
+    yield ("spiderweb_store_records", "gauge", "Records per store table.",
+           [({"table": table}, store.count(table)) for table in STORE_GAUGE_TABLES])
+    cache = read_cache.stats()
+    yield ("spiderweb_read_cache_requests_total", "counter",
+           "Read cache lookups by route and result (hit, miss, or coalesced onto an identical running request).",
+           [({"route": route, "result": result}, counts[result])
+            for route, counts in sorted(cache["routes"].items()) for result in ("hits", "misses", "coalesced")])
+    claims = authenticator.cache
+    lookups = {"read": (cache["hits"] + cache["coalesced"], cache["hits"] + cache["misses"] + cache["coalesced"]),
+               "auth_claims": (claims.hits, claims.hits + claims.misses)}
+    yield ("spiderweb_cache_hit_ratio", "gauge", "Share of cache lookups answered without computing the result.",
+           [({"cache": name}, served / total if total else 0.0) for name, (served, total) in lookups.items()])
+    yield ("spiderweb_cache_entries", "gauge", "Entries held per cache.",
+           [({"cache": "read"}, cache["entries"]), ({"cache": "auth_claims"}, len(claims))])
+    yield ("spiderweb_read_cache_evictions_total", "counter", "Read cache entries evicted to stay within its size.",
+           [({}, cache["evictions"])])
+
+request_metrics.register(_store_and_cache_metrics)
+
+@app.get("/metrics")
+def get_metrics():
+    return Response(content=request_metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/admin/slow-requests")
+def get_slow_requests(current_user: dict = Depends(admin_role_checker)):
+    # Stack samples of the slowest recent requests; empty unless SPIDERWEB_PROFILE_SLOW_MS is set
+    if slow_request_profiler is None:
+        return {"enabled": False, "requests": []}
+    return {"enabled": True, "threshold_ms": slow_request_profiler.threshold * 1000,
+            "requests": slow_request_profiler.reports()}
+
 # --- Root endpoint for health check ---
 @app.get("/")
 def read_root():
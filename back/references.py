@@ -0,0 +1,53 @@
+# Who points at a record of each referenced table: (table, field) pairs whose
+# value (or list elements) are ids of it. Each pair is a secondary index in
+# the store, kept current by every insert/update/delete, so reference counts
+# are O(1) and listing referrers costs O(returned ids).
+REFERENCES = {
+    "networks": (("core_sites", "network_ids"), ("core_devices", "network_ids")),
+    "core_sites": (("core_devices", "coresite_id"),),
+    "core_devices": (("sites", "coredevice_ids"), ("links", "coredevice_id"), ("links", "neighbor_coredevice_id")),
+}
+
+# References that block deleting the referenced record, with the message reported
+BLOCKING = {
+    "networks": ((("core_sites", "network_ids"), ("core_devices", "network_ids")),
+                 "Network is associated with coresite or coredevice, cannot delete"),
+    "core_sites": ((("core_devices", "coresite_id"),),
+                   "Coresite is associated with coredevice, cannot delete"),
+    "core_devices": ((("sites", "coredevice_ids"),),
+                     "Coredevice is associated with end-site, cannot delete"),
+}
+
+
+def delete_blocker(store, table, record_id):
+    """Why the record can't be deleted (something still references it), or None."""
+    if table not in BLOCKING:
+        return None
+    pairs, message = BLOCKING[table]
+    if any(store.count_where(source, field, record_id) for source, field in pairs):
+        return message
+    return None
+
+
+def references(store, table, record_id, limit=100):
+    """
+    What references the record: per (table, field) the number of referrers,
+    up to `limit` of their ids, and whether they block a delete.
+    """
+    blocking = BLOCKING.get(table, ((), None))[0]
+    result = []
+    for source, field in REFERENCES.get(table, ()):
+        count = store.count_where(source, field, record_id)
+        result.append({
+            "table": source,
+            "field": field,
+            "count": count,
+            "ids": store.find_ids(source, field, record_id, limit) if count else [],
+            "blocks_delete": bool(count) and (source, field) in blocking,
+        })
+    return {
+        "table": table,
+        "id": record_id,
+        "delete_blocked_by": delete_blocker(store, table, record_id),
+        "references": result,
+    }
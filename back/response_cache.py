@@ -0,0 +1,175 @@
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from fastapi import Request, Response
+
+
+class EncodedResponseCache:
+    """
+    Keeps a route's JSON body encoded (and gzip-compressed) per data version.
+
+    `build()` produces the payload and `version()` returns a counter that
+    changes whenever the payload would; the body is re-encoded only when the
+    version moves. The ETag is a hash of the encoded body, so it stays valid
+    across restarts and workers, and a matching If-None-Match gets a 304
+    without touching the payload at all.
+    """
+
+    def __init__(self, build, version, compress_min_size=1024, compress_level=6):
+        self._build = build
+        self._version = version
+        self._compress_min_size = compress_min_size
+        self._compress_level = compress_level
+        self._lock = threading.Lock()
+        self._entry = None
+
+    def get(self):
+        version = self._version()
+        entry = self._entry
+        if entry is not None and entry["version"] == version:
+            return entry
+        with self._lock:
+            entry = self._entry
+            if entry is None or entry["version"] != version:
+                entry = self._encode(version)
+                self._entry = entry
+        return entry
+
+    def respond(self, request: Request) -> Response:
+        entry = self.get()
+        use_gzip = entry["gzip"] is not None and "gzip" in request.headers.get("accept-encoding", "")
+        etag = entry["gzip_etag"] if use_gzip else entry["etag"]
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if _etag_matches(request.headers.get("if-none-match"), (entry["etag"], entry["gzip_etag"])):
+            return Response(status_code=304, headers=headers)
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=entry["gzip"], media_type="application/json", headers=headers)
+        return Response(content=entry["body"], media_type="application/json", headers=headers)
+
+    def _encode(self, version):
+        body = json.dumps(self._build(), separators=(",", ":"), default=str).encode("utf-8")
+        compressed = None
+        if len(body) >= self._compress_min_size:
+            compressed = gzip.compress(body, compresslevel=self._compress_level, mtime=0)
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        return {
+            "version": version,
+            "body": body,
+            "gzip": compressed,
+            "etag": f'"{digest}"',
+            "gzip_etag": f'"{digest}-gz"',
+        }
+
+
+class _Flight:
+    __slots__ = ("version", "done", "result", "error")
+
+    def __init__(self, version):
+        self.version = version
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class CoalescingCache:
+    """
+    Shares read-route results between requests asking the same thing.
+
+    Requests are keyed by route and normalized query parameters. A result
+    is reused while the data version it was computed at is current and it
+    is younger than `ttl` seconds; only `max_entries` results are kept,
+    least recently used first out. Identical requests arriving while the
+    result is being computed wait for that computation instead of
+    starting their own, so a burst of N identical refreshes costs one
+    computation. Errors are handed to the waiting requests but not cached.
+    """
+
+    def __init__(self, max_entries=2048, ttl=30.0, clock=time.monotonic):
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._flights = {}
+        self._stats = defaultdict(lambda: {"hits": 0, "misses": 0, "coalesced": 0})
+        self.evictions = 0
+
+    def get(self, route, params, version, compute):
+        """`compute()`'s result for this route, query and data version; computed at most once at a time."""
+        key = (route, _normalized(params))
+        started = self._clock()
+        with self._lock:
+            stats = self._stats[route]
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version and started - entry[1] < self._ttl:
+                self._entries.move_to_end(key)
+                stats["hits"] += 1
+                return entry[2]
+            flight = self._flights.get(key)
+            leader = flight is None or flight.version != version
+            if leader:
+                flight = self._flights[key] = _Flight(version)
+                stats["misses"] += 1
+            else:
+                stats["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = compute()
+        except BaseException as e:
+            flight.error = e
+            raise
+        else:
+            with self._lock:
+                self._entries[key] = (version, started, flight.result)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            return flight.result
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+
+    def stats(self):
+        with self._lock:
+            routes = {route: dict(counts) for route, counts in self._stats.items()}
+            return {
+                "entries": len(self._entries),
+                "in_flight": len(self._flights),
+                "evictions": self.evictions,
+                "routes": routes,
+                **{name: sum(c[name] for c in routes.values()) for name in ("hits", "misses", "coalesced")},
+            }
+
+
+def _normalized(params):
+    # Order-independent and hashable; absent (None) parameters are left out
+    return tuple(sorted(
+        (name, tuple(value) if isinstance(value, list) else value)
+        for name, value in params.items() if value is not None
+    ))
+
+
+def _etag_matches(header, etags):
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate in etags:
+            return True
+    return False
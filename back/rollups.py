@@ -0,0 +1,117 @@
+import threading
+from collections import Counter, defaultdict
+
+from link_metrics import parse_count
+
+COUNTERS = (
+    "links", "up", "down", "protocol_down", "core", "end_site",
+    "input_errors", "output_errors", "crc",
+)
+
+GROUPINGS = ("coresite", "coredevice", "network")
+
+# Link fields a rollup depends on; updates touching none of them are ignored
+SOURCE_FIELDS = {
+    "coredevice_id", "network_ids", "network_type_id", "physical_status", "protocol_status",
+    "neighbor_is_core", "input_errors", "output_errors", "crc",
+}
+
+
+def link_counters(link):
+    up = str(link.get("physical_status", "")).lower() == "up"
+    return Counter({
+        "links": 1,
+        "up": int(up),
+        "down": int(not up),
+        "protocol_down": int(str(link.get("protocol_status", "")).lower() != "up"),
+        "core": int(bool(link.get("neighbor_is_core"))),
+        "end_site": int(not link.get("neighbor_is_core")),
+        "input_errors": parse_count(link.get("input_errors")),
+        "output_errors": parse_count(link.get("output_errors")),
+        "crc": parse_count(link.get("crc")),
+    })
+
+
+class HealthRollups:
+    """
+    Link health counters per coresite, coredevice and network, kept current
+    from store write listeners.
+
+    Each link's last contribution is remembered, so an insert, delete or
+    status change adjusts only the groups that link belongs to and a rollup
+    read is O(#groups). A link counts towards its own coredevice, that
+    device's coresite and each of its networks.
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        self._totals = {grouping: defaultdict(Counter) for grouping in GROUPINGS}
+        self._contributions = {}
+        devices = {d["id"]: d for d in self._store.all("core_devices", fields=("id", "coresite_id"))}
+        for link in self._store.all("links", fields=("id", *SOURCE_FIELDS)):
+            self._apply(link, devices.get)
+
+    def reload(self):
+        """Recounts every link, for stores that swap their whole dataset at once."""
+        with self._lock:
+            self._load()
+
+    def attach(self):
+        self._store.subscribe(self._on_store_change)
+
+    def _on_store_change(self, table, action, record, changes, previous):
+        if table == "links":
+            if action == "delete":
+                with self._lock:
+                    self._retract(record["id"])
+            elif action == "insert" or SOURCE_FIELDS.intersection(changes):
+                with self._lock:
+                    self._apply(record)
+        elif table == "core_devices" and action == "update" and "coresite_id" in changes:
+            # A device moved coresite: move its links' contributions with it
+            with self._lock:
+                for link in self._store.find("links", "coredevice_id", record["id"]):
+                    self._apply(link)
+
+    def _device(self, device_id):
+        return self._store.get("core_devices", device_id)
+
+    def _groups(self, link, device_of):
+        device = device_of(link.get("coredevice_id"))
+        networks = link.get("network_ids") or [link.get("network_type_id")]
+        groups = [("coredevice", link.get("coredevice_id"))]
+        if device is not None:
+            groups.append(("coresite", device.get("coresite_id")))
+        groups.extend(("network", network_id) for network_id in networks)
+        return groups
+
+    def _apply(self, link, device_of=None):
+        self._retract(link["id"])
+        groups, counters = self._groups(link, device_of or self._device), link_counters(link)
+        for grouping, key in groups:
+            self._totals[grouping][key].update(counters)
+        self._contributions[link["id"]] = (groups, counters)
+
+    def _retract(self, link_id):
+        contribution = self._contributions.pop(link_id, None)
+        if contribution is None:
+            return
+        groups, counters = contribution
+        for grouping, key in groups:
+            totals = self._totals[grouping][key]
+            totals.subtract(counters)
+            if totals["links"] <= 0:
+                del self._totals[grouping][key]
+
+    def rollup(self, grouping):
+        """Returns [{"<grouping>_id": key, **counters}] sorted by key."""
+        with self._lock:
+            totals = sorted(self._totals[grouping].items(), key=lambda item: (item[0] is None, item[0]))
+            return [
+                {f"{grouping}_id": key, **{name: counters[name] for name in COUNTERS}}
+                for key, counters in totals
+            ]
@@ -0,0 +1,255 @@
+import bisect
+import re
+import threading
+from collections import defaultdict
+
+# Searchable fields per table with their weight; a term found in several
+# fields of a record keeps the highest weight
+SEARCH_FIELDS = {
+    "core_devices": (("name", 8), ("hostname", 8), ("ip", 6), ("ip_address", 6)),
+    "sites": (("name", 8), ("description", 3)),
+    "links": (("cdp", 4), ("description", 3)),
+}
+
+# Result type names, in the order ties are listed
+RESULT_TYPES = ("coredevice", "site", "link")
+_TABLES = ("core_devices", "sites", "links")
+
+# Words too common to narrow anything down
+STOPWORDS = frozenset(("a", "an", "and", "at", "between", "by", "for", "in", "of", "on", "or", "the", "to", "with"))
+
+_WORD = re.compile(r"[^\s,;:()\[\]{}<>\"'|/\\]+")
+_PART = re.compile(r"[^\-_.]+")
+_ALPHA = re.compile(r"[^\W\d_]")
+
+# Bounds on the work of one query: terms a prefix may expand to, and
+# records scored; past either the result is marked truncated
+_MAX_EXPANSIONS = 2000
+_MAX_CANDIDATES = 5000
+
+# Rough cost of re-tokenizing one record, in posting lookups
+_REREAD_COST = 50
+
+# Past every term starting with a given prefix
+_PREFIX_END = "\uffff"
+
+
+def words(text):
+    """Lowercased whitespace/punctuation separated words of `text`, stopwords dropped."""
+    found = []
+    for word in _WORD.findall(str(text).lower()):
+        word = word.strip(".-_")
+        if word and word not in STOPWORDS:
+            found.append(word)
+    return found
+
+
+def terms(text):
+    """
+    Indexed terms of `text`: its words, plus the parts of compound words
+    (split on - _ .) that contain a letter, so "rtr-campaign1-4" is found by
+    "rtr-camp" and by "campaign" but not by "4".
+    """
+    found = []
+    for word in words(text):
+        found.append(word)
+        parts = _PART.findall(word)
+        if len(parts) > 1:
+            found.extend(p for p in parts if _ALPHA.search(p) and p not in STOPWORDS)
+    return found
+
+
+def _doc_terms(table, record):
+    weights = {}
+    for field, weight in SEARCH_FIELDS[table]:
+        value = record.get(field)
+        if value is None:
+            continue
+        for term in terms(value):
+            if weights.get(term, 0) < weight:
+                weights[term] = weight
+    return weights
+
+
+class SearchIndex:
+    """
+    Inverted index over core device names/hostnames/IPs, end-site names and
+    descriptions, and link descriptions and CDP neighbors, kept current from
+    store write listeners.
+
+    Each term maps to the records containing it (with the field weight) and
+    the distinct terms are kept sorted, so a query word is expanded to the
+    terms it prefixes with two bisects. The query word with the fewest
+    postings picks the candidates; the other words are checked against
+    each candidate. A record scores, per query word, its field weight,
+    doubled when the word is a whole term rather than a prefix; results
+    come best first.
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        self._postings = defaultdict(dict)
+        for type_code, table in enumerate(_TABLES):
+            fields = ("id", *(field for field, _ in SEARCH_FIELDS[table]))
+            for record in self._store.all(table, fields=fields):
+                key = record["id"] * 4 + type_code
+                for term, weight in _doc_terms(table, record).items():
+                    self._postings[term][key] = weight
+        self._terms = sorted(self._postings)
+
+    def attach(self):
+        self._store.subscribe(self._on_store_change)
+
+    def reload(self):
+        """Rebuilds everything, for stores that swap their whole dataset at once."""
+        with self._lock:
+            self._load()
+
+    def _on_store_change(self, table, action, record, changes, previous):
+        if table not in SEARCH_FIELDS:
+            return
+        key = record["id"] * 4 + _TABLES.index(table)
+        with self._lock:
+            if action == "insert":
+                self._add(key, _doc_terms(table, record))
+            elif action == "delete":
+                self._remove(key, _doc_terms(table, record))
+            elif any(field in changes for field, _ in SEARCH_FIELDS[table]):
+                self._remove(key, _doc_terms(table, {**record, **previous}))
+                self._add(key, _doc_terms(table, record))
+
+    # --- Maintenance ---
+
+    def _add(self, key, weights):
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._terms, term)
+            postings[key] = weight
+
+    def _remove(self, key, weights):
+        for term in weights:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(key, None)
+            if not postings:
+                del self._postings[term]
+                pos = bisect.bisect_left(self._terms, term)
+                if pos < len(self._terms) and self._terms[pos] == term:
+                    del self._terms[pos]
+
+    # --- Queries ---
+
+    def _expand(self, word):
+        """Terms starting with `word`, the word itself first; and whether the list was cut short."""
+        low = bisect.bisect_left(self._terms, word)
+        high = bisect.bisect_left(self._terms, word + _PREFIX_END, low)
+        expanded = self._terms[low:min(high, low + _MAX_EXPANSIONS)]
+        return expanded, high - low > _MAX_EXPANSIONS
+
+    @staticmethod
+    def _score(word, term, weight):
+        return weight * 2 if term == word else weight
+
+    def search(self, query, types=None, limit=20):
+        """Best-first typed matches of every word of `query` (as whole terms or prefixes)."""
+        query_words = list(dict.fromkeys(words(query)))
+        if not query_words:
+            return {"query": query, "results": [], "truncated": False}
+        type_codes = {RESULT_TYPES.index(t) for t in types} if types else None
+
+        with self._lock:
+            truncated = False
+            expansions = []
+            for word in query_words:
+                expanded, cut = self._expand(word)
+                truncated |= cut
+                size = sum(len(self._postings[t]) for t in expanded)
+                expansions.append((size, word, expanded))
+            expansions.sort(key=lambda e: e[0])
+
+            # Candidates from the rarest word, whole-term matches first
+            _, word, expanded = expansions[0]
+            scores = {}
+            for term in expanded:
+                if len(scores) >= _MAX_CANDIDATES:
+                    break
+                for key, weight in self._postings[term].items():
+                    if type_codes is not None and key % 4 not in type_codes:
+                        continue
+                    score = self._score(word, term, weight)
+                    if scores.get(key, 0) < score:
+                        scores[key] = score
+                        if len(scores) >= _MAX_CANDIDATES:
+                            truncated = True
+                            break
+
+            for size, word, expanded in expansions[1:]:
+                if not scores:
+                    break
+                # Cheapest of: walking the word's postings, probing them per
+                # candidate, or re-reading each candidate's own terms
+                walk, probe, reread = size, len(scores) * len(expanded), len(scores) * _REREAD_COST
+                best = {}
+                if walk <= min(probe, reread):
+                    for term in expanded:
+                        for key, weight in self._postings[term].items():
+                            if key in scores:
+                                score = self._score(word, term, weight)
+                                if best.get(key, 0) < score:
+                                    best[key] = score
+                elif probe <= reread:
+                    for term in expanded:
+                        postings = self._postings[term]
+                        for key in scores:
+                            weight = postings.get(key)
+                            if weight is not None:
+                                score = self._score(word, term, weight)
+                                if best.get(key, 0) < score:
+                                    best[key] = score
+                else:
+                    best = {key: self._rescore(key, word) for key in scores}
+                scores = {key: score + best[key] for key, score in scores.items() if best.get(key)}
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0] % 4, item[0] // 4))
+        results = []
+        for key, score in ranked[:limit]:
+            table = _TABLES[key % 4]
+            record = self._store.get(table, key // 4)
+            if record is not None:
+                results.append(_result(key % 4, record, score))
+        return {"query": query, "results": results, "truncated": truncated}
+
+    def _rescore(self, key, word):
+        """Score of `word` for one record, from the record itself (for words with long posting lists)."""
+        table = _TABLES[key % 4]
+        record = self._store.get(table, key // 4)
+        if record is None:
+            return 0
+        return max(
+            (self._score(word, term, weight) for term, weight in _doc_terms(table, record).items()
+             if term.startswith(word)),
+            default=0,
+        )
+
+
+def _result(type_code, record, score):
+    kind = RESULT_TYPES[type_code]
+    if kind == "coredevice":
+        fields = {"name": record.get("hostname") or record.get("name"), "ip": record.get("ip_address") or record.get("ip"),
+                  "coresite_id": record.get("coresite_id")}
+    elif kind == "site":
+        fields = {"name": record.get("name"), "description": record.get("description")}
+    else:
+        fields = {"name": record.get("description") or f"Link {record['id']}", "cdp": record.get("cdp"),
+                  "coredevice_id": record.get("coredevice_id"),
+                  "neighbor_coredevice_id": record.get("neighbor_coredevice_id"),
+                  "bandwidth": record.get("bandwidth") or record.get("bw"),
+                  "physical_status": record.get("physical_status")}
+    return {"type": kind, "id": record["id"], "score": score, **fields}
@@ -0,0 +1,521 @@
+"""
+Read-only inventory snapshots shared by every worker on a host.
+
+A snapshot file holds each table as typed columns (strings deduplicated into
+one string table), the rows in id order, and prebuilt index arrays: CSR
+buckets for the store's secondary indexes and (value, id) permutations for
+its sorted indexes. Workers mmap the file, so the OS page cache keeps one
+copy per host, startup is just reading the header, and reads decode only
+the rows they return.
+
+Publishing writes a temporary file and os.replace()s it over the snapshot
+path; workers notice the new inode, map it and rebuild their derived views
+from it on a background thread, then swap to it atomically, while readers
+already holding the old mapping finish on it.
+
+    python snapshot.py --dataset large -o inventory.snap
+    python snapshot.py --from-ndjson inventory.ndjson.gz -o inventory.snap
+"""
+import argparse
+import bisect
+import json
+import mmap
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+from store import INDEXED_FIELDS, SORTED_FIELDS, TABLES
+
+MAGIC = b"SPWSNAP1"
+_ALIGN = 8
+
+# Cell sentinels per column kind: (missing, None)
+_INT_MISSING, _INT_NONE = np.iinfo(np.int64).min, np.iinfo(np.int64).min + 1
+_REF_MISSING, _REF_NONE = -1, -2
+_BOOL_NONE, _BOOL_MISSING = 2, 3
+
+
+# Marks a field a record does not have (as opposed to a None value)
+_MISSING = object()
+
+
+class ReadOnlyStoreError(RuntimeError):
+    pass
+
+
+# ==============================================================================
+# WRITER
+# ==============================================================================
+
+class _StringTable:
+    def __init__(self):
+        self._ids = {}
+        self.strings = []
+
+    def ref(self, value):
+        ref = self._ids.get(value)
+        if ref is None:
+            ref = self._ids[value] = len(self.strings)
+            self.strings.append(value)
+        return ref
+
+
+def _column_kind(values):
+    kinds = {type(v) for v in values if v is not _MISSING and v is not None}
+    if not kinds:
+        return "int"
+    if kinds == {bool}:
+        return "bool"
+    if kinds == {int}:
+        return "int"
+    if kinds == {str}:
+        return "str"
+    return "json"
+
+
+def _encode_column(kind, values, strings):
+    if kind == "int":
+        return np.array([_INT_MISSING if v is _MISSING else _INT_NONE if v is None else v for v in values], np.int64)
+    if kind == "bool":
+        return np.array([_BOOL_MISSING if v is _MISSING else _BOOL_NONE if v is None else int(v) for v in values],
+                        np.int8)
+    if kind == "str":
+        return np.array([_REF_MISSING if v is _MISSING else _REF_NONE if v is None else strings.ref(v)
+                         for v in values], np.int64)
+    return np.array([_REF_MISSING if v is _MISSING else strings.ref(json.dumps(v, separators=(",", ":")))
+                     for v in values], np.int64)
+
+
+def _index_keys(value):
+    if isinstance(value, (list, tuple, set)):
+        return dict.fromkeys(value)
+    return (value,)
+
+
+def write_snapshot(data, path):
+    """
+    Writes the DUMMY_DB-shaped `data` as a snapshot at `path`, atomically
+    replacing any previous snapshot there. Returns the new generation.
+    """
+    generation = time.time_ns()
+    strings = _StringTable()
+    arrays = []
+    header = {"generation": generation, "crawler_cycle": data.get("crawler_cycle", {"id": 1, "count": 0}),
+              "tables": {}}
+
+    def add_array(array):
+        arrays.append(np.ascontiguousarray(array))
+        return len(arrays) - 1
+
+    for table in TABLES:
+        rows = sorted(data.get(table, []), key=lambda r: r["id"])
+        fields = list(dict.fromkeys(f for r in rows for f in r))
+        columns = {}
+        for field in fields:
+            values = [r.get(field, _MISSING) for r in rows]
+            kind = _column_kind(values)
+            columns[field] = {"kind": kind, "array": add_array(_encode_column(kind, values, strings))}
+
+        indexes = {}
+        for field in INDEXED_FIELDS.get(table, ()):
+            pairs = sorted((key, row) for row, r in enumerate(rows) for key in _index_keys(r.get(field))
+                           if key is not None)
+            keys = [k for k, _ in pairs]
+            unique = list(dict.fromkeys(keys))
+            string_keys = any(isinstance(k, str) for k in unique)
+            starts = [bisect.bisect_left(keys, k) for k in unique] + [len(keys)]
+            indexes[field] = {
+                "string_keys": string_keys,
+                "keys": add_array(np.array([strings.ref(k) for k in unique] if string_keys else unique, np.int64)),
+                "starts": add_array(np.array(starts, np.int64)),
+                "rows": add_array(np.array([row for _, row in pairs], np.int64)),
+            }
+
+        sorted_indexes = {}
+        for field in SORTED_FIELDS.get(table, ()):
+            if field == "id":
+                continue
+            order = sorted((r[field], r["id"], row) for row, r in enumerate(rows) if r.get(field) is not None)
+            sorted_indexes[field] = add_array(np.array([row for _, _, row in order], np.int64))
+
+        header["tables"][table] = {"rows": len(rows), "columns": columns, "indexes": indexes,
+                                   "sorted": sorted_indexes}
+
+    encoded = [s.encode("utf-8") for s in strings.strings]
+    offsets = np.zeros(len(encoded) + 1, np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    header["strings"] = {"offsets": add_array(offsets), "blob": add_array(np.frombuffer(b"".join(encoded), np.uint8))}
+
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "wb") as f:
+        # Array offsets depend on the header length: lay out until the header stops growing
+        header_size = 0
+        while True:
+            position = _aligned(len(MAGIC) + 8 + header_size)
+            layout = []
+            for array in arrays:
+                layout.append({"offset": position, "dtype": array.dtype.str, "count": int(array.size)})
+                position = _aligned(position + array.nbytes)
+            header["arrays"] = layout
+            header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+            if len(header_bytes) <= header_size:
+                header_bytes = header_bytes.ljust(header_size)
+                break
+            header_size = _aligned(len(header_bytes))
+        f.write(MAGIC)
+        f.write(len(header_bytes).to_bytes(8, "little"))
+        f.write(header_bytes)
+        for array, spec in zip(arrays, layout):
+            f.seek(spec["offset"])
+            f.write(array.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return generation
+
+
+def _aligned(position):
+    return (position + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+# ==============================================================================
+# READER
+# ==============================================================================
+
+class Snapshot:
+    """One mapped snapshot file. Immutable; SnapshotStore swaps whole instances."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.stat = os.fstat(f.fileno())
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a snapshot file")
+        header_len = int.from_bytes(self._mm[len(MAGIC):len(MAGIC) + 8], "little")
+        start = len(MAGIC) + 8
+        self.header = json.loads(self._mm[start:start + header_len])
+        self.generation = self.header["generation"]
+        # Zero-copy memoryviews over the mapping; indexing them yields plain ints
+        self._arrays = [
+            memoryview(np.frombuffer(self._mm, dtype=spec["dtype"], count=spec["count"], offset=spec["offset"]))
+            for spec in self.header["arrays"]
+        ]
+        self._offsets = self._array(self.header["strings"]["offsets"])
+        self._blob_start = self.header["arrays"][self.header["strings"]["blob"]]["offset"]
+        self._tables = self.header["tables"]
+        self._columns = {
+            table: [(field, column["kind"], self._array(column["array"]))
+                    for field, column in meta["columns"].items()]
+            for table, meta in self._tables.items()
+        }
+        self._ids = {
+            table: self._array(meta["columns"]["id"]["array"]) if "id" in meta["columns"] else []
+            for table, meta in self._tables.items()
+        }
+
+    def _array(self, index):
+        return self._arrays[index]
+
+    def string(self, ref):
+        start = self._blob_start
+        return self._mm[start + self._offsets[ref]:start + self._offsets[ref + 1]].decode("utf-8")
+
+    def rows(self, table):
+        return self._tables[table]["rows"]
+
+    def record(self, table, row):
+        record = {}
+        for field, kind, values in self._columns[table]:
+            value = values[row]
+            if kind == "int":
+                if value == _INT_MISSING:
+                    continue
+                record[field] = None if value == _INT_NONE else value
+            elif kind == "bool":
+                if value == _BOOL_MISSING:
+                    continue
+                record[field] = None if value == _BOOL_NONE else bool(value)
+            else:
+                if value == _REF_MISSING:
+                    continue
+                if value == _REF_NONE:
+                    record[field] = None
+                else:
+                    text = self.string(value)
+                    record[field] = text if kind == "str" else json.loads(text)
+        return record
+
+    def records(self, table, fields=None):
+        """
+        Every record of `table` in id order (only `fields` of them, if given),
+        decoded a column at a time: cheaper than record() per row, and each
+        distinct string is decoded once.
+        """
+        records = [{} for _ in range(self.rows(table))]
+        for field, kind, values in self._columns[table]:
+            if fields is not None and field not in fields:
+                continue
+            if kind == "int":
+                for record, value in zip(records, values.tolist()):
+                    if value != _INT_MISSING:
+                        record[field] = None if value == _INT_NONE else value
+            elif kind == "bool":
+                for record, value in zip(records, values.tolist()):
+                    if value != _BOOL_MISSING:
+                        record[field] = None if value == _BOOL_NONE else bool(value)
+            else:
+                texts = {}
+                for record, ref in zip(records, values.tolist()):
+                    if ref < 0:
+                        if ref == _REF_NONE:
+                            record[field] = None
+                        continue
+                    text = texts.get(ref)
+                    if text is None:
+                        text = texts[ref] = self.string(ref)
+                    # JSON values are lists and dicts: every record gets its own
+                    record[field] = text if kind == "str" else json.loads(text)
+        return records
+
+    def row_of(self, table, record_id):
+        ids = self._ids[table]
+        row = bisect.bisect_left(ids, record_id)
+        return row if row < len(ids) and ids[row] == record_id else None
+
+    def find_rows(self, table, field, value):
+        index = self._tables[table]["indexes"][field]
+        keys = self._array(index["keys"])
+        if index["string_keys"]:
+            if not isinstance(value, str):
+                return []
+            i = _bisect(len(keys), lambda i: self.string(keys[i]), value)
+            found = i < len(keys) and self.string(keys[i]) == value
+        else:
+            if isinstance(value, str) or value is None:
+                return []
+            i = bisect.bisect_left(keys, value)
+            found = i < len(keys) and keys[i] == value
+        if not found:
+            return []
+        starts = self._array(index["starts"])
+        return self._array(index["rows"])[starts[i]:starts[i + 1]]
+
+    def sorted_rows(self, table, field):
+        return self._array(self._tables[table]["sorted"][field])
+
+    def value(self, table, field, row):
+        column = self._tables[table]["columns"][field]
+        return self.string(self._array(column["array"])[row])
+
+
+def _bisect(size, key_at, target, right=False):
+    """bisect_left (or bisect_right) over positions 0..size-1 whose keys are `key_at(i)`."""
+    lo, hi = 0, size
+    while lo < hi:
+        mid = (lo + hi) // 2
+        key = key_at(mid)
+        if key < target or (right and key == target):
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+class SnapshotStore:
+    """
+    Read-only Store backed by a mapped snapshot file.
+
+    Every read re-checks the file (at most every `check_interval` seconds).
+    A newly published snapshot is mapped on a background thread, which runs
+    the `on_swap` callbacks while its own reads already see the new
+    snapshot, so in-memory views derived from the data can be built from
+    it; only then do all other reads move over, in one reference
+    assignment. Requests never wait for a swap and keep reading the old
+    snapshot meanwhile; each call works on the snapshot it started with.
+    Writes raise ReadOnlyStoreError.
+    """
+
+    def __init__(self, path, check_interval=1.0):
+        self.path = path
+        self._check_interval = check_interval
+        self._checked_at = time.monotonic()
+        self._swap_lock = threading.Lock()
+        self._swapping = False
+        self._swap_callbacks = []
+        # Set on the swap thread to the snapshot being swapped in
+        self._local = threading.local()
+        self._snap = Snapshot(path)
+
+    def _current(self):
+        snap = getattr(self._local, "snap", None)
+        if snap is not None:
+            return snap
+        now = time.monotonic()
+        if now - self._checked_at >= self._check_interval:
+            self._checked_at = now
+            self._maybe_swap()
+        return self._snap
+
+    def _maybe_swap(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return
+        old = self._snap.stat
+        if (stat.st_ino, stat.st_mtime_ns, stat.st_size) == (old.st_ino, old.st_mtime_ns, old.st_size):
+            return
+        with self._swap_lock:
+            if self._swapping:
+                return
+            self._swapping = True
+        threading.Thread(target=self._swap, name="snapshot-swap", daemon=True).start()
+
+    def _swap(self):
+        try:
+            snap = Snapshot(self.path)
+            self._local.snap = snap
+            try:
+                for callback in self._swap_callbacks:
+                    callback()
+            finally:
+                self._local.snap = None
+            self._snap = snap
+        finally:
+            # On failure the old snapshot stays current, and the next check tries again
+            with self._swap_lock:
+                self._swapping = False
+
+    def on_swap(self, callback):
+        """`callback()` runs on the swap thread, before any other reader sees the new snapshot."""
+        self._swap_callbacks.append(callback)
+
+    # --- Reads ---
+
+    @property
+    def crawler_cycle(self):
+        return dict(self._current().header["crawler_cycle"])
+
+    @property
+    def generation(self):
+        return self._current().generation
+
+    def get(self, table, record_id):
+        snap = self._current()
+        row = snap.row_of(table, record_id)
+        return snap.record(table, row) if row is not None else None
+
+    def all(self, table, fields=None):
+        return self._current().records(table, fields)
+
+    def count(self, table):
+        return self._current().rows(table)
+
+    def version(self, table):
+        return self._current().generation
+
+    def find(self, table, field, value):
+        snap = self._current()
+        return [snap.record(table, row) for row in snap.find_rows(table, field, value)]
+
+    def find_ids(self, table, field, value, limit=None):
+        snap = self._current()
+        ids = snap._ids[table]
+        return [ids[row] for row in snap.find_rows(table, field, value)[:limit]]
+
+    def count_where(self, table, field, value):
+        return len(self._current().find_rows(table, field, value))
+
+    def scan(self, table, field, start=None, after=None):
+        """Same contract as Store.scan, bisecting the snapshot's sorted permutation."""
+        snap = self._current()
+        if field == "id":
+            ids = snap._ids[table]
+            pos = 0
+            if start is not None:
+                pos = bisect.bisect_left(ids, start)
+            if after is not None:
+                pos = max(pos, bisect.bisect_right(ids, after[1]))
+            for row in range(pos, len(ids)):
+                yield ids[row], snap.record(table, row)
+            return
+        order = snap.sorted_rows(table, field)
+        ids = snap._ids[table]
+
+        def key_at(i):
+            row = order[i]
+            return snap.value(table, field, row), ids[row]
+
+        pos = 0
+        if start is not None:
+            pos = _bisect(len(order), lambda i: key_at(i)[0], start)
+        if after is not None:
+            pos = max(pos, _bisect(len(order), key_at, tuple(after), right=True))
+        for i in range(pos, len(order)):
+            row = order[i]
+            yield snap.value(table, field, row), snap.record(table, row)
+
+    # --- Writes ---
+
+    def subscribe(self, listener):
+        # Nothing is ever written through a snapshot; see on_swap
+        pass
+
+    def _read_only(self, *args, **kwargs):
+        raise ReadOnlyStoreError("This worker serves a read-only snapshot")
+
+    insert = update = delete = set_crawl_count = next_id = transaction = _read_only
+
+
+class LazyView:
+    """
+    Stands in for a view derived from a SnapshotStore's data, built by
+    `build()` on first use or when warm() is called (say from a background
+    thread at startup). Attribute access waits for the build, then goes to
+    the view. Snapshot stores never notify listeners, so attach() is a
+    no-op here rather than something that forces the build.
+    """
+
+    def __init__(self, build):
+        self._build = build
+        self._lock = threading.Lock()
+        self._view = None
+
+    def warm(self):
+        view = self._view
+        if view is None:
+            with self._lock:
+                if self._view is None:
+                    self._view = self._build()
+                view = self._view
+        return view
+
+    def attach(self, *args):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(self.warm(), name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--dataset", default="demo", help="demo or a preset size (see dummy_data.DATASET_SIZES)")
+    source.add_argument("--from-ndjson", help="NDJSON dump written by dummy_data.py")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", required=True)
+    args = parser.parse_args()
+
+    from dummy_data import load_dataset
+    start = time.perf_counter()
+    data = load_dataset(args.from_ndjson or args.dataset, seed=args.seed)
+    generation = write_snapshot(data, args.output)
+    size = os.path.getsize(args.output)
+    print(f"Published {args.output} (generation {generation}, {size / 1e6:.1f} MB) "
+          f"in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
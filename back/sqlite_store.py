@@ -0,0 +1,452 @@
+import json
+import sqlite3
+import threading
+import time
+import traceback
+
+from store import INDEXED_FIELDS, SORTED_FIELDS, TABLES
+
+# Indexed fields holding lists of ids
+_LIST_FIELDS = {"network_ids", "coredevice_ids"}
+
+# Rows fetched per query in `scan` and in change log replays
+_SCAN_CHUNK = 256
+
+# Changes kept in the shared log; a process further behind than that
+# rebuilds its derived views instead (see on_swap). Pruned every
+# _PRUNE_EVERY changes.
+CHANGE_LOG_RETAIN = 50_000
+_PRUNE_EVERY = 1000
+
+# Seconds between polls of the change log for other workers' writes
+REPLAY_INTERVAL = 0.25
+
+_encode = json.JSONEncoder(separators=(",", ":"), default=str).encode
+
+
+class SqliteStore:
+    """
+    Durable drop-in for Store on SQLite in WAL mode.
+
+    Each table keeps its records as JSON next to real columns for the scalar
+    indexed and sorted fields (each with its own index); list-valued fields
+    such as network_ids live in a `<table>__<field>(value, id)` side table.
+    WAL lets readers run while a writer commits, and every thread gets its
+    own connection, so several uvicorn workers can share one database file.
+    Queries are constant SQL strings with parameters, which sqlite3 keeps
+    prepared in its statement cache.
+
+    Records are returned as fresh dicts: change them through update().
+
+    Every write also appends to a shared `changes` log in its transaction,
+    and listeners are called from that log in commit order, only once the
+    change is committed: this process's writes right after their COMMIT,
+    other workers' writes when a background thread polls the log (every
+    REPLAY_INTERVAL seconds) or when version() is read. version() counts the
+    changes this process has replayed, so a version-keyed cache never pairs
+    a version with derived views that haven't applied it. Derived views
+    built from the tables should load between pause_replay() and
+    resume_replay(), so replay continues exactly where their data ends. A
+    process that falls behind the pruned log calls its on_swap callbacks to
+    rebuild them instead.
+    """
+
+    def __init__(self, path, seed=None):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._listeners = []
+        self._swap_callbacks = []
+        # Replay position: last change log seq passed to the listeners, and
+        # the number of replayed changes per table
+        self._replay_lock = threading.Lock()
+        self._applied = 0
+        self._versions = dict.fromkeys(TABLES, 0)
+        self._paused = False
+        self._poller = None
+        self._scalar = {}
+        self._lists = {}
+        for table in TABLES:
+            fields = INDEXED_FIELDS.get(table, ())
+            sorted_fields = [f for f in SORTED_FIELDS.get(table, ()) if f != "id"]
+            self._lists[table] = [f for f in fields if f in _LIST_FIELDS]
+            self._scalar[table] = [f for f in fields if f not in _LIST_FIELDS] + [
+                f for f in sorted_fields if f not in fields
+            ]
+        self._create_schema()
+        if seed is not None:
+            self._seed(seed)
+        self._read_position(self._conn())
+
+    # --- Connection / schema ---
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False,
+                                   cached_statements=256)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=OFF")
+            self._local.conn = conn
+        return conn
+
+    def _create_schema(self):
+        conn = self._conn()
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS changes (seq INTEGER PRIMARY KEY AUTOINCREMENT, tbl TEXT NOT NULL, "
+                     "action TEXT NOT NULL, record TEXT NOT NULL, changes TEXT, previous TEXT)")
+        for table in TABLES:
+            columns = "".join(f", {f}" for f in self._scalar[table])
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, data TEXT NOT NULL{columns})")
+            self._add_missing_indexes(conn, table)
+            for field in self._scalar[table]:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_{field} ON {table} ({field}, id)")
+            for field in self._lists[table]:
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {table}__{field} (value, id INTEGER NOT NULL)")
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {table}__{field}_value ON {table}__{field} (value, id)")
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {table}__{field}_id ON {table}__{field} (id)")
+            conn.execute("INSERT OR IGNORE INTO meta VALUES (?, '0')", (f"version:{table}",))
+
+    def _add_missing_indexes(self, conn, table):
+        """Backfills index columns and side tables added since the database file was created."""
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for field in self._scalar[table]:
+            if field not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {field}")
+                conn.execute(f"UPDATE {table} SET {field} = json_extract(data, '$.{field}')")
+        for field in self._lists[table]:
+            if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                (f"{table}__{field}",)).fetchone():
+                conn.execute(f"CREATE TABLE {table}__{field} (value, id INTEGER NOT NULL)")
+                conn.execute(f"INSERT INTO {table}__{field} (value, id) SELECT DISTINCT j.value, t.id "
+                             f"FROM {table} t, json_each(t.data, '$.{field}') j")
+
+    def _seed(self, seed):
+        """Loads `seed()` (a DUMMY_DB-shaped dict) if the database is still empty."""
+        conn = self._conn()
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if conn.execute("SELECT 1 FROM meta WHERE key = 'seeded'").fetchone():
+                    conn.execute("COMMIT")
+                    return
+                data = seed()
+                for table in TABLES:
+                    records = data.get(table, [])
+                    conn.executemany(self._insert_sql(table), (self._row(table, r) for r in records))
+                    for field in self._lists[table]:
+                        conn.executemany(
+                            f"INSERT INTO {table}__{field} (value, id) VALUES (?, ?)",
+                            ((value, r["id"]) for r in records for value in dict.fromkeys(r.get(field) or ())),
+                        )
+                cycle = data.get("crawler_cycle", {"id": 1, "count": 0})
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('crawler_cycle', ?)", (_encode(cycle),))
+                conn.execute("INSERT INTO meta VALUES ('seeded', '1')")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _insert_sql(self, table):
+        columns = ["id", "data"] + self._scalar[table]
+        placeholders = ", ".join("?" * len(columns))
+        return f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+    def _row(self, table, record):
+        return [record["id"], _encode(record)] + [record.get(f) for f in self._scalar[table]]
+
+    # --- Reads ---
+
+    @property
+    def crawler_cycle(self):
+        row = self._conn().execute("SELECT value FROM meta WHERE key = 'crawler_cycle'").fetchone()
+        return json.loads(row[0]) if row else {"id": 1, "count": 0}
+
+    def get(self, table, record_id):
+        row = self._conn().execute(f"SELECT data FROM {table} WHERE id = ?", (record_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def all(self, table, fields=None):
+        # Decoding the JSON costs the same whichever `fields` are wanted
+        return [json.loads(data) for (data,) in self._conn().execute(f"SELECT data FROM {table} ORDER BY id")]
+
+    def count(self, table):
+        return self._conn().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def version(self, table):
+        """Changes to `table` replayed by this process, after catching up on the change log."""
+        self._replay()
+        return self._versions[table]
+
+    def find(self, table, field, value):
+        if field in self._lists[table]:
+            sql = (f"SELECT t.data FROM {table}__{field} r JOIN {table} t ON t.id = r.id "
+                   f"WHERE r.value = ? ORDER BY r.id")
+        else:
+            sql = f"SELECT data FROM {table} WHERE {field} = ? ORDER BY id"
+        return [json.loads(data) for (data,) in self._conn().execute(sql, (value,))]
+
+    def find_ids(self, table, field, value, limit=None):
+        source = f"{table}__{field} WHERE value = ?" if field in self._lists[table] else f"{table} WHERE {field} = ?"
+        rows = self._conn().execute(f"SELECT id FROM {source} ORDER BY id LIMIT ?",
+                                    (value, -1 if limit is None else limit))
+        return [record_id for (record_id,) in rows]
+
+    def count_where(self, table, field, value):
+        source = f"{table}__{field} WHERE value = ?" if field in self._lists[table] else f"{table} WHERE {field} = ?"
+        return self._conn().execute(f"SELECT COUNT(*) FROM {source}", (value,)).fetchone()[0]
+
+    def scan(self, table, field, start=None, after=None):
+        """Same contract as Store.scan, read in chunks through the (field, id) index."""
+        conn = self._conn()
+        if field == "id":
+            key = after[1] if after is not None else (start - 1 if start is not None else None)
+            while True:
+                if key is None:
+                    rows = conn.execute(f"SELECT id, data FROM {table} ORDER BY id LIMIT ?", (_SCAN_CHUNK,))
+                else:
+                    rows = conn.execute(f"SELECT id, data FROM {table} WHERE id > ? ORDER BY id LIMIT ?",
+                                        (key, _SCAN_CHUNK))
+                rows = rows.fetchall()
+                for record_id, data in rows:
+                    yield record_id, json.loads(data)
+                if len(rows) < _SCAN_CHUNK:
+                    return
+                key = rows[-1][0]
+        key = tuple(after) if after is not None else None
+        if start is not None and (key is None or key < (start, float("-inf"))):
+            key = (start, float("-inf"))
+        while True:
+            if key is None:
+                rows = conn.execute(
+                    f"SELECT {field}, id, data FROM {table} WHERE {field} IS NOT NULL "
+                    f"ORDER BY {field}, id LIMIT ?", (_SCAN_CHUNK,))
+            else:
+                rows = conn.execute(
+                    f"SELECT {field}, id, data FROM {table} WHERE ({field}, id) > (?, ?) "
+                    f"ORDER BY {field}, id LIMIT ?", (key[0], key[1], _SCAN_CHUNK))
+            rows = rows.fetchall()
+            for value, _, data in rows:
+                yield value, json.loads(data)
+            if len(rows) < _SCAN_CHUNK:
+                return
+            key = (rows[-1][0], rows[-1][1])
+
+    # --- Writes ---
+
+    def transaction(self):
+        """One BEGIN IMMEDIATE ... COMMIT around a batch of reads and writes; rolled back if it raises."""
+        return self._transaction()
+
+    def next_id(self, table):
+        """Allocates an unused id for `table` from a counter shared by all workers."""
+        with self._transaction() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (f"next_id:{table}",)).fetchone()
+            (max_id,) = conn.execute(f"SELECT MAX(id) FROM {table}").fetchone()
+            record_id = max(int(row[0]) if row else 1, (max_id or 0) + 1)
+            conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (f"next_id:{table}", str(record_id + 1)))
+        return record_id
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+        with self._replay_lock:
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._poll, name="sqlite-change-log", daemon=True)
+                self._poller.start()
+
+    def on_swap(self, callback):
+        """`callback()` rebuilds derived views from the tables, for when this process missed pruned changes."""
+        self._swap_callbacks.append(callback)
+
+    def set_crawl_count(self, count):
+        with self._transaction() as conn:
+            cycle = self.crawler_cycle
+            previous = {"count": cycle["count"]}
+            cycle["count"] = count
+            data = _encode(cycle)
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('crawler_cycle', ?)", (data,))
+            self._log(conn, "crawler_cycle", "update", cycle, data, {"count": count}, previous)
+
+    def insert(self, table, record):
+        with self._transaction() as conn:
+            row = self._row(table, record)
+            conn.execute(self._insert_sql(table), row)
+            self._write_lists(conn, table, record, self._lists[table])
+            self._bump(conn, table)
+            self._log(conn, table, "insert", record, row[1], record, None)
+        return record
+
+    def update(self, table, record_id, changes):
+        with self._transaction() as conn:
+            row = conn.execute(f"SELECT data FROM {table} WHERE id = ?", (record_id,)).fetchone()
+            if row is None:
+                return None
+            record = json.loads(row[0])
+            previous = {f: record.get(f) for f in changes}
+            record.update(changes)
+            row = self._row(table, record)
+            conn.execute(self._insert_sql(table), row)
+            self._write_lists(conn, table, record, [f for f in self._lists[table] if f in changes])
+            self._bump(conn, table)
+            self._log(conn, table, "update", record, row[1], changes, previous)
+        return record
+
+    def delete(self, table, record_id):
+        with self._transaction() as conn:
+            row = conn.execute(f"SELECT data FROM {table} WHERE id = ?", (record_id,)).fetchone()
+            if row is None:
+                return None
+            conn.execute(f"DELETE FROM {table} WHERE id = ?", (record_id,))
+            for field in self._lists[table]:
+                conn.execute(f"DELETE FROM {table}__{field} WHERE id = ?", (record_id,))
+            self._bump(conn, table)
+            record = json.loads(row[0])
+            self._log(conn, table, "delete", record, row[0], None, None)
+        return record
+
+    # --- Change log replay ---
+
+    def pause_replay(self):
+        """
+        Stops replaying changes and holds this thread's reads on one snapshot
+        of the database until resume_replay(), which replays everything
+        committed after that snapshot.
+        """
+        with self._replay_lock:
+            self._paused = True
+            conn = self._conn()
+            conn.execute("BEGIN")
+            self._read_position(conn)
+
+    def resume_replay(self):
+        self._conn().execute("COMMIT")
+        with self._replay_lock:
+            self._paused = False
+        self._replay()
+
+    def _read_position(self, conn):
+        (self._applied,) = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()
+        for key, value in conn.execute("SELECT key, value FROM meta WHERE key LIKE 'version:%'"):
+            self._versions[key[len("version:"):]] = int(value)
+
+    def _replay(self, own=None, rebuild=False):
+        """
+        Calls the listeners with the changes committed since the last replay.
+        `own` maps the seqs of this thread's just committed changes to their
+        events, which are passed on as is instead of decoded again.
+        """
+        # Inside a transaction or a held snapshot this connection would read
+        # uncommitted or stale changes
+        if getattr(self._local, "depth", 0) or getattr(self._local, "holding", False):
+            return
+        conn = self._conn()
+        with self._replay_lock:
+            while not self._paused:
+                rows = conn.execute("SELECT seq, tbl, action, record, changes, previous FROM changes "
+                                    "WHERE seq > ? ORDER BY seq LIMIT ?", (self._applied, _SCAN_CHUNK)).fetchall()
+                if not rows:
+                    return
+                if rows[0][0] > self._applied + 1:
+                    # Changes this process never read were pruned: only the
+                    # poller rebuilds, so no request waits for it
+                    if rebuild or not self._swap_callbacks:
+                        self._rebuild(conn)
+                    return
+                for seq, table, action, record, changes, previous in rows:
+                    event = own.get(seq) if own else None
+                    if event is None:
+                        record = json.loads(record)
+                        changes = record if action == "insert" else json.loads(changes)
+                        event = (table, action, record, changes, json.loads(previous))
+                    self._applied = seq
+                    if table in self._versions:
+                        self._versions[table] += 1
+                    for listener in self._listeners:
+                        listener(*event)
+                if len(rows) < _SCAN_CHUNK:
+                    return
+
+    def _rebuild(self, conn):
+        # The callbacks run on this thread, so they read the same snapshot as the new position
+        self._local.holding = True
+        conn.execute("BEGIN")
+        try:
+            self._read_position(conn)
+            for callback in self._swap_callbacks:
+                callback()
+        finally:
+            conn.execute("COMMIT")
+            self._local.holding = False
+
+    def _poll(self):
+        while True:
+            time.sleep(REPLAY_INTERVAL)
+            try:
+                self._replay(rebuild=True)
+            except Exception:
+                # Keep polling: a failing listener must not stop the other views from converging
+                traceback.print_exc()
+
+    # --- Internals ---
+
+    def _transaction(self):
+        return _Transaction(self)
+
+    def _write_lists(self, conn, table, record, fields):
+        for field in fields:
+            conn.execute(f"DELETE FROM {table}__{field} WHERE id = ?", (record["id"],))
+            conn.executemany(f"INSERT INTO {table}__{field} (value, id) VALUES (?, ?)",
+                             ((value, record["id"]) for value in dict.fromkeys(record.get(field) or ())))
+
+    def _bump(self, conn, table):
+        conn.execute("UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = ?", (f"version:{table}",))
+
+    def _log(self, conn, table, action, record, data, changes, previous):
+        """Appends a change to the shared log; its listeners are called once the transaction commits."""
+        seq = conn.execute(
+            "INSERT INTO changes (tbl, action, record, changes, previous) VALUES (?, ?, ?, ?, ?)",
+            (table, action, data, None if action == "insert" else _encode(changes), _encode(previous)),
+        ).lastrowid
+        self._local.pending.append((seq, (table, action, record, changes, previous)))
+        if seq % _PRUNE_EVERY == 0:
+            conn.execute("DELETE FROM changes WHERE seq <= ?", (seq - CHANGE_LOG_RETAIN,))
+
+
+class _Transaction:
+    """
+    BEGIN IMMEDIATE ... COMMIT under the process write lock (re-entrant per
+    thread). The changes are replayed to the listeners after the outermost
+    COMMIT; a rollback drops them unseen.
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self._conn = store._conn()
+
+    def __enter__(self):
+        local = self._store._local
+        depth = getattr(local, "depth", 0)
+        if depth == 0:
+            self._store._write_lock.acquire()
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+            except BaseException:
+                self._store._write_lock.release()
+                raise
+            local.pending = []
+        local.depth = depth + 1
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        local = self._store._local
+        local.depth -= 1
+        if local.depth == 0:
+            pending, local.pending = local.pending, None
+            try:
+                self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+            finally:
+                self._store._write_lock.release()
+            if exc_type is None:
+                self._store._replay(own=dict(pending))
+        return False
@@ -0,0 +1,234 @@
+import bisect
+import threading
+from collections import defaultdict
+from itertools import islice
+
+# Tables owned by the store. Every record in them has an integer "id".
+TABLES = ("networks", "core_sites", "core_devices", "sites", "links", "users", "alerts")
+
+# Secondary indexes per table. List-valued fields (e.g. "network_ids") are
+# indexed under each of their elements.
+INDEXED_FIELDS = {
+    "networks": ("name",),
+    "core_sites": ("name", "network_ids"),
+    "core_devices": ("name", "coresite_id", "network_ids"),
+    "sites": ("coredevice_ids",),
+    "links": ("coredevice_id", "neighbor_coredevice_id"),
+    "users": ("username",),
+}
+
+# Sorted (value, id) indexes per table, for range scans and keyset paging.
+# Records whose value is None are left out.
+SORTED_FIELDS = {
+    "links": ("id", "created_at", "updated_at"),
+}
+
+# Records copied out of a sorted index per lock acquisition in `scan`.
+_SCAN_CHUNK = 256
+
+
+def _index_keys(value):
+    if isinstance(value, (list, tuple, set)):
+        return value
+    return (value,)
+
+
+class Store:
+    """
+    Indexed in-memory store built around the DUMMY_DB dict.
+
+    Records are kept in per-table primary-key maps (insertion ordered) and in
+    secondary indexes whose buckets are themselves id -> record dicts, so
+    lookups are O(1) by id and O(k) by foreign key, and deletes never rebuild
+    a list. Sorted indexes support range scans that start with a bisect, so a
+    page costs O(log n + limit) wherever it starts. The store owns the
+    records; routes must mutate them through insert/update/delete so the
+    indexes stay in sync.
+
+    Listeners registered with `subscribe` are called as
+    `listener(table, action, record, changes, previous)` after every write,
+    where `previous` holds the old values of the changed fields on update.
+    set_crawl_count is reported as an update of the "crawler_cycle" table.
+    They run while the write lock is held, so they see writes in order and
+    must stay cheap.
+    """
+
+    def __init__(self, data):
+        self.crawler_cycle = data.get("crawler_cycle", {"id": 1, "count": 0})
+        self._lock = threading.RLock()
+        self._rows = {}
+        self._indexes = {}
+        self._sorted = {}
+        self._listeners = []
+        self._versions = dict.fromkeys(TABLES, 0)
+        self._next_ids = dict.fromkeys(TABLES, 1)
+        for table in TABLES:
+            self._rows[table] = {}
+            self._indexes[table] = {field: defaultdict(dict) for field in INDEXED_FIELDS.get(table, ())}
+            self._sorted[table] = {}
+            for record in data.get(table, []):
+                self._add(table, record)
+            # Built in one sort rather than by repeated insort
+            for field in SORTED_FIELDS.get(table, ()):
+                self._sorted[table][field] = sorted(
+                    (r[field], r["id"]) for r in self._rows[table].values() if r.get(field) is not None
+                )
+
+    # --- Reads ---
+
+    def get(self, table, record_id):
+        return self._rows[table].get(record_id)
+
+    def all(self, table, fields=None):
+        """
+        Every record of `table`. With `fields`, a store may return records
+        holding only those fields, so loaders that need a few columns don't
+        pay for decoding the rest (this one returns them whole).
+        """
+        return list(self._rows[table].values())
+
+    def count(self, table):
+        return len(self._rows[table])
+
+    def version(self, table):
+        """Data version of `table`; bumped on every write to it."""
+        return self._versions[table]
+
+    def find(self, table, field, value):
+        """Returns the records of `table` whose indexed `field` equals (or contains) `value`."""
+        bucket = self._indexes[table][field].get(value)
+        return list(bucket.values()) if bucket else []
+
+    def find_ids(self, table, field, value, limit=None):
+        """Ids of (at most `limit` of) the records `find` would return."""
+        bucket = self._indexes[table][field].get(value)
+        return list(islice(bucket, limit)) if bucket else []
+
+    def count_where(self, table, field, value):
+        """How many records of `table` `find` would return, in O(1)."""
+        bucket = self._indexes[table][field].get(value)
+        return len(bucket) if bucket else 0
+
+    def scan(self, table, field, start=None, after=None):
+        """
+        Yields `(value, record)` in ascending `(value, id)` order from the
+        sorted index on `field`, beginning at `start` or strictly after the
+        `(value, id)` key `after`, whichever is later. Writes made while
+        iterating may or may not be seen, but no record is yielded twice.
+        """
+        index = self._sorted[table][field]
+        rows = self._rows[table]
+        with self._lock:
+            pos = 0
+            if start is not None:
+                pos = bisect.bisect_left(index, (start,))
+            if after is not None:
+                pos = max(pos, bisect.bisect_right(index, tuple(after)))
+            chunk = index[pos:pos + _SCAN_CHUNK]
+        while chunk:
+            for value, record_id in chunk:
+                record = rows.get(record_id)
+                if record is not None:
+                    yield value, record
+            with self._lock:
+                pos = bisect.bisect_right(index, chunk[-1])
+                chunk = index[pos:pos + _SCAN_CHUNK]
+
+    # --- Writes ---
+
+    def transaction(self):
+        """
+        Holds the write lock, so a batch of reads and writes runs without
+        other writes interleaving. There is no rollback: validate the whole
+        batch before writing any of it.
+        """
+        return self._lock
+
+    def next_id(self, table):
+        """Allocates an unused id for `table` (ids are never handed out twice)."""
+        with self._lock:
+            record_id = self._next_ids[table]
+            self._next_ids[table] += 1
+            return record_id
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def set_crawl_count(self, count):
+        with self._lock:
+            previous = {"count": self.crawler_cycle["count"]}
+            self.crawler_cycle["count"] = count
+            for listener in self._listeners:
+                listener("crawler_cycle", "update", self.crawler_cycle, {"count": count}, previous)
+
+    def insert(self, table, record):
+        with self._lock:
+            self._add(table, record)
+            self._notify(table, "insert", record, record, None)
+        return record
+
+    def update(self, table, record_id, changes):
+        with self._lock:
+            record = self._rows[table].get(record_id)
+            if record is None:
+                return None
+            previous = {f: record.get(f) for f in changes}
+            reindexed = [f for f in changes if f in self._indexes[table] or f in self._sorted[table]]
+            self._unindex(table, record, reindexed)
+            record.update(changes)
+            self._index(table, record, reindexed)
+            self._notify(table, "update", record, changes, previous)
+        return record
+
+    def delete(self, table, record_id):
+        with self._lock:
+            record = self._rows[table].pop(record_id, None)
+            if record is not None:
+                self._unindex(table, record, self._indexed_fields(table))
+                self._notify(table, "delete", record, None, None)
+        return record
+
+    # --- Internals ---
+
+    def _notify(self, table, action, record, changes, previous):
+        self._versions[table] += 1
+        for listener in self._listeners:
+            listener(table, action, record, changes, previous)
+
+    def _indexed_fields(self, table):
+        return list(self._indexes[table]) + list(self._sorted[table])
+
+    def _add(self, table, record):
+        self._rows[table][record["id"]] = record
+        if record["id"] >= self._next_ids[table]:
+            self._next_ids[table] = record["id"] + 1
+        self._index(table, record, self._indexed_fields(table))
+
+    def _index(self, table, record, fields):
+        for field in fields:
+            if field in self._sorted[table]:
+                if record.get(field) is not None:
+                    bisect.insort(self._sorted[table][field], (record[field], record["id"]))
+                continue
+            index = self._indexes[table][field]
+            for key in _index_keys(record.get(field)):
+                index[key][record["id"]] = record
+
+    def _unindex(self, table, record, fields):
+        for field in fields:
+            if field in self._sorted[table]:
+                if record.get(field) is not None:
+                    entries = self._sorted[table][field]
+                    key = (record[field], record["id"])
+                    pos = bisect.bisect_left(entries, key)
+                    if pos < len(entries) and entries[pos] == key:
+                        del entries[pos]
+                continue
+            index = self._indexes[table][field]
+            for key in _index_keys(record.get(field)):
+                bucket = index.get(key)
+                if bucket is None:
+                    continue
+                bucket.pop(record["id"], None)
+                if not bucket:
+                    del index[key]
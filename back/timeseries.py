@@ -0,0 +1,165 @@
+import threading
+import time
+
+import numpy as np
+
+# Link counters recorded every crawl cycle
+SERIES_METRICS = ("input_rate", "output_rate", "rx", "tx", "input_errors", "output_errors", "crc")
+
+# (cycles per bucket, buckets kept) per resolution, finest first. Each
+# coarser level is the mean of the level before it.
+DEFAULT_LEVELS = ((1, 64), (16, 64), (256, 64))
+
+
+class _Level:
+    def __init__(self, span, slots, rows):
+        self.span = span
+        self.slots = slots
+        self.values = {m: np.full((rows, slots), np.nan, np.float32) for m in SERIES_METRICS}
+        # Bucket start cycle and wall-clock time per slot; -1 marks an empty slot
+        self.cycles = np.full(slots, -1, np.int64)
+        self.times = np.zeros(slots, np.float64)
+
+    def grow(self, rows):
+        for metric, values in self.values.items():
+            grown = np.full((rows, self.slots), np.nan, np.float32)
+            grown[:len(values)] = values
+            self.values[metric] = grown
+
+
+class LinkTimeSeries:
+    """
+    Fixed-size history of the link counters, one sample per crawl cycle.
+
+    Every resolution level is a ring of float32 slots per (link, metric), so
+    the memory per link is fixed (about 5 KB with the default levels) however
+    long the backend runs. When a bucket of a coarser level completes it is
+    filled with the mean of the finer buckets it covers. Rows of deleted links
+    are cleared and reused.
+    """
+
+    def __init__(self, levels=DEFAULT_LEVELS, capacity=1024):
+        self._lock = threading.Lock()
+        self._row_of = {}
+        self._free = []
+        self._rows = capacity
+        self._levels = [_Level(span, slots, capacity) for span, slots in levels]
+        self.last_cycle = None
+
+    def attach(self, store):
+        store.subscribe(self._on_store_change)
+
+    def _on_store_change(self, table, action, record, changes, previous):
+        if table == "links" and action == "delete":
+            with self._lock:
+                row = self._row_of.pop(record["id"], None)
+                if row is not None:
+                    self._clear(row)
+                    self._free.append(row)
+
+    # --- Writes ---
+
+    def _row(self, link_id):
+        row = self._row_of.get(link_id)
+        if row is None:
+            if self._free:
+                row = self._free.pop()
+            else:
+                row = len(self._row_of)
+                if row >= self._rows:
+                    self._rows *= 2
+                    for level in self._levels:
+                        level.grow(self._rows)
+            self._row_of[link_id] = row
+        return row
+
+    def _clear(self, row):
+        for level in self._levels:
+            for values in level.values.values():
+                values[row] = np.nan
+
+    def record(self, cycle, ids, columns, at=None):
+        """
+        Stores one crawl cycle's sample: `columns` maps each metric to an
+        array aligned with the link `ids` (as from LinkMetricsStore.columns).
+        """
+        at = time.time() if at is None else at
+        with self._lock:
+            rows = np.fromiter((self._row(int(i)) for i in ids), np.int64, len(ids))
+            finest = self._levels[0]
+            slot = cycle % finest.slots
+            for metric in SERIES_METRICS:
+                values = finest.values[metric]
+                values[:, slot] = np.nan
+                values[rows, slot] = columns[metric]
+            finest.cycles[slot] = cycle
+            finest.times[slot] = at
+            for finer, coarser in zip(self._levels, self._levels[1:]):
+                if (cycle + 1) % coarser.span:
+                    break
+                self._downsample(finer, coarser, cycle + 1 - coarser.span)
+            self.last_cycle = cycle
+
+    def _downsample(self, finer, coarser, start):
+        covered = (finer.cycles >= start) & (finer.cycles < start + coarser.span)
+        slot = (start // coarser.span) % coarser.slots
+        for metric in SERIES_METRICS:
+            values = finer.values[metric][:, covered]
+            counts = (~np.isnan(values)).sum(axis=1)
+            sums = np.nansum(values, axis=1)
+            coarser.values[metric][:, slot] = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+        coarser.cycles[slot] = start
+        coarser.times[slot] = finer.times[covered].min() if covered.any() else 0.0
+
+    # --- Queries ---
+
+    def levels(self):
+        return [{"cycles_per_bucket": level.span, "buckets": level.slots} for level in self._levels]
+
+    def _pick_level(self, start, resolution):
+        if resolution is not None:
+            for level in self._levels:
+                if level.span == resolution:
+                    return level
+            raise ValueError(f"resolution must be one of {[level.span for level in self._levels]}")
+        for level in self._levels:
+            kept = level.cycles[level.cycles >= 0]
+            if start is None or (len(kept) and kept.min() <= start) or len(kept) < level.slots:
+                return level
+        return self._levels[-1]
+
+    def series(self, link_ids, metrics=SERIES_METRICS, start=None, end=None, resolution=None):
+        """
+        Per link, the buckets whose start cycle is in [start, end] at the
+        finest resolution that still covers `start` (or the requested one).
+        Missing samples are None.
+        """
+        with self._lock:
+            level = self._pick_level(start, resolution)
+            mask = level.cycles >= 0
+            if start is not None:
+                mask &= level.cycles >= start
+            if end is not None:
+                mask &= level.cycles <= end
+            slots = np.flatnonzero(mask)
+            slots = slots[np.argsort(level.cycles[slots], kind="stable")]
+            cycles = level.cycles[slots].tolist()
+            times = level.times[slots].tolist()
+            result = []
+            for link_id in link_ids:
+                row = self._row_of.get(link_id)
+                entry = {"link_id": link_id}
+                for metric in metrics:
+                    if row is None:
+                        entry[metric] = [None] * len(slots)
+                    else:
+                        # Through str: the shortest repr of the float32, e.g. -4.9 rather than -4.900000095
+                        values = level.values[metric][row, slots].astype(str)
+                        entry[metric] = [None if v == "nan" else float(v) for v in values]
+                result.append(entry)
+        return {
+            "cycles_per_bucket": level.span,
+            "cycles": cycles,
+            "timestamps": times,
+            "series": result,
+        }
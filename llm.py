@@ -1,5 +1,11 @@
+import argparse
+import hashlib
+import json
 import os
 import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 # --- Configuration ---
 # Add or remove file extensions as needed
@@ -31,6 +37,31 @@ EXCLUDED_FILES = {
 # The name of the output file
 OUTPUT_FILENAME = "combined_for_llm.txt"
 
+# Files are read on a thread pool; at most READ_AHEAD of them are read ahead
+# of the one being written, which bounds the memory held at any time.
+READ_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+READ_AHEAD = READ_WORKERS * 4
+
+# Every run records here, per input file, its mtime, size, content hash and
+# where its section was written. With --incremental only the files whose
+# mtime or size changed are read again; the other sections are copied from
+# the previous output, and output files whose sections are all unchanged
+# are not rewritten at all.
+MANIFEST_FILENAME = "combined_for_llm.manifest"
+MANIFEST_VERSION = 1
+
+# Files modified this close to the previous run may have changed again
+# within the same mtime tick, so they are read and hashed rather than trusted
+RACY_WINDOW_NS = 2_000_000_000
+
+# --max-tokens is turned into a byte budget with this rough ratio for code
+BYTES_PER_TOKEN = 4
+
+# Smallest output budget: below this the part headers would not fit
+MIN_BUDGET_BYTES = 1024
+
+COPY_BLOCK_SIZE = 1 << 20
+
 def should_include(path, script_name):
     """
     Determines if a file or directory should be included based on the
@@ -57,49 +88,366 @@ def should_include(path, script_name):
 
     return True
 
-def combine_project_files(project_root="."):
+def iter_project_files(project_root, script_name):
+    """
+    Yields the paths of the files to include, walking directories and files
+    in sorted order so the output is the same on every run and machine.
+    """
+    for root, dirs, files in os.walk(project_root, topdown=True):
+        # Filter out excluded directories
+        dirs[:] = sorted(d for d in dirs if should_include(os.path.join(root, d), script_name))
+
+        for file_name in sorted(files):
+            file_path = os.path.join(root, file_name)
+            if should_include(file_path, script_name):
+                yield file_path
+
+def read_file(file_path):
+    """The file's text as UTF-8 bytes (newlines normalized, as text mode reads them)."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return f.read().encode('utf-8')
+
+def chunk_name(index):
+    """Name of the index-th output file when the output is split: combined_for_llm.001.txt, ..."""
+    stem, extension = os.path.splitext(OUTPUT_FILENAME)
+    return f"{stem}.{index + 1:03d}{extension}"
+
+def section_header(rel_path, part=1, parts=1):
+    if parts > 1:
+        return f"\n--- File: {rel_path} (part {part}/{parts}) ---\n".encode('utf-8')
+    return f"\n--- File: {rel_path} ---\n".encode('utf-8')
+
+def file_sections(rel_path, content, budget):
+    """
+    The output section(s) of one file: a header and its content, or, when
+    that is over `budget` bytes, parts of the content split at line ends
+    (mid-line only for lines longer than a whole part), each with a header.
+    """
+    header = section_header(rel_path)
+    if budget is None or len(header) + len(content) <= budget:
+        return [header + content]
+
+    room = max(budget - len(section_header(rel_path, 99999, 99999)), MIN_BUDGET_BYTES // 4)
+    pieces = []
+    start = 0
+    while start < len(content):
+        end = start + room
+        if end < len(content):
+            newline = content.rfind(b"\n", start, end)
+            if newline >= start:
+                end = newline + 1
+            else:
+                # Don't cut a UTF-8 sequence in two
+                while end > start + 1 and content[end] & 0xC0 == 0x80:
+                    end -= 1
+        pieces.append(content[start:end])
+        start = end
+    return [section_header(rel_path, i + 1, len(pieces)) + piece for i, piece in enumerate(pieces)]
+
+def load_manifest():
+    try:
+        with open(MANIFEST_FILENAME, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+def save_manifest(manifest):
+    temp_name = MANIFEST_FILENAME + ".tmp"
+    with open(temp_name, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, separators=(",", ":"))
+    os.replace(temp_name, MANIFEST_FILENAME)
+
+def intact_outputs(outputs):
+    """Names of the previous output files still exactly as that run left them."""
+    intact = set()
+    for output in outputs:
+        try:
+            stat = os.stat(output["name"])
+        except OSError:
+            continue
+        if stat.st_size == output["size"] and stat.st_mtime_ns == output["mtime_ns"]:
+            intact.add(output["name"])
+    return intact
+
+
+class ChunkWriter:
+    """
+    Packs file sections, in order, into output files of at most `budget`
+    bytes, or into OUTPUT_FILENAME alone when there is no budget. A file
+    is only split when its section doesn't fit in an empty output.
+
+    A section is either new bytes or a byte range of a previous output. An
+    output holding the same sections as the same-numbered previous one is
+    left as it is; any other is streamed to a temporary file, copying the
+    reused ranges, and replaces the old one in commit().
+    """
+
+    def __init__(self, budget, previous_outputs=(), intact=()):
+        self.budget = budget
+        self.outputs = []
+        self.rewritten = 0
+        self.bytes_written = 0
+        self._previous = list(previous_outputs)
+        self._intact = set(intact)
+        self._sources = {}
+        self._temp_names = []
+        self._chunk = None
+
+    def _name(self, index):
+        return OUTPUT_FILENAME if self.budget is None else chunk_name(index)
+
+    def add(self, rel_path, sha256, sections):
+        """Places one file's sections, given as (length, bytes or (output name, offset)); returns their locations."""
+        chunk = self._chunk
+        if len(sections) == 1 and self.budget is not None and chunk is not None \
+                and chunk["size"] + sections[0][0] > self.budget and chunk["size"] > 0:
+            self._close()
+        elif len(sections) > 1 and chunk is not None and chunk["size"] > 0:
+            self._close()
+
+        locations = []
+        for part, (length, source) in enumerate(sections):
+            if part > 0:
+                self._close()
+            if self._chunk is None:
+                self._start()
+            chunk = self._chunk
+            locations.append([len(self.outputs), chunk["size"], length])
+            chunk["sections"].append([rel_path, sha256, part])
+            chunk["size"] += length
+            if isinstance(source, bytes):
+                self._dirty(chunk)
+                chunk["file"].write(source)
+                self.bytes_written += length
+            elif chunk["file"] is not None:
+                self._copy(chunk["file"], source, length)
+            else:
+                chunk["pending"].append((source, length))
+        return locations
+
+    def _start(self):
+        self._chunk = {"name": self._name(len(self.outputs)), "size": 0, "sections": [],
+                       "pending": [], "file": None}
+
+    def _dirty(self, chunk):
+        if chunk["file"] is not None:
+            return
+        temp_name = chunk["name"] + ".tmp"
+        self._temp_names.append(temp_name)
+        chunk["file"] = open(temp_name, 'wb')
+        for source, length in chunk["pending"]:
+            self._copy(chunk["file"], source, length)
+        chunk["pending"] = []
+
+    def _copy(self, output_file, source, length):
+        name, offset = source
+        old_file = self._sources.get(name)
+        if old_file is None:
+            old_file = self._sources[name] = open(name, 'rb')
+        old_file.seek(offset)
+        while length > 0:
+            block = old_file.read(min(length, COPY_BLOCK_SIZE))
+            if not block:
+                raise OSError(f"{name} is shorter than its manifest says")
+            output_file.write(block)
+            length -= len(block)
+            self.bytes_written += len(block)
+
+    def _close(self):
+        chunk = self._chunk
+        if chunk is None:
+            return
+        index = len(self.outputs)
+        previous = self._previous[index] if index < len(self._previous) else None
+        unchanged = (chunk["file"] is None and previous is not None and previous["name"] == chunk["name"]
+                     and chunk["name"] in self._intact and previous["sections"] == chunk["sections"])
+        if not unchanged:
+            self._dirty(chunk)
+            chunk["file"].close()
+            self.rewritten += 1
+        self.outputs.append({"name": chunk["name"], "size": chunk["size"], "sections": chunk["sections"],
+                             "temp": chunk["file"] is not None})
+        self._chunk = None
+
+    def commit(self):
+        """Closes the last output, moves the rewritten ones into place and returns their manifest records."""
+        if self._chunk is None and not self.outputs:
+            # No files at all: still leave an (empty) output behind
+            self._start()
+        self._close()
+        for old_file in self._sources.values():
+            old_file.close()
+        self._sources = {}
+        records = []
+        for output in self.outputs:
+            if output["temp"]:
+                os.replace(output["name"] + ".tmp", output["name"])
+            stat = os.stat(output["name"])
+            records.append({"name": output["name"], "size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                            "sections": output["sections"]})
+        self._temp_names = []
+        return records
+
+    def abort(self):
+        chunk = self._chunk
+        if chunk is not None and chunk["file"] is not None:
+            chunk["file"].close()
+        for old_file in self._sources.values():
+            old_file.close()
+        for temp_name in self._temp_names:
+            try:
+                os.remove(temp_name)
+            except OSError:
+                pass
+
+
+def combine_project_files(project_root=".", incremental=False, max_bytes=None):
     """
     Recursively scans a project directory and combines the content of
-    relevant files into a single text file.
+    relevant files into a single text file, or into numbered files of at
+    most `max_bytes` each.
+
+    Files are read in parallel and each one's section is written as soon as
+    it and every file before it are read, so the output streams out in walk
+    order while only a bounded number of files is held in memory. With
+    `incremental`, files unchanged since the previous run (per the manifest)
+    are not read again.
     """
-    combined_content = ""
+    started = time.perf_counter()
+    run_started_ns = time.time_ns()
     file_count = 0
-    
+    failed_count = 0
+    read_count = 0
+    read_bytes = 0
+
     # --- THIS IS NEW: Get the name of the script being run ---
     script_name = os.path.basename(sys.argv[0])
 
     print(f"Starting to scan project at: {os.path.abspath(project_root)}")
     print(f"Excluding script file: {script_name}")
 
-    for root, dirs, files in os.walk(project_root, topdown=True):
-        # Filter out excluded directories
-        dirs[:] = [d for d in dirs if should_include(os.path.join(root, d), script_name)]
+    previous = load_manifest()
+    reuse = incremental and previous is not None and previous.get("budget") == max_bytes
+    if incremental and not reuse:
+        print("No usable manifest from a previous run with the same budget: reading every file.")
+    previous_files = previous["files"] if reuse else {}
+    previous_outputs = previous["outputs"] if reuse else []
+    intact = intact_outputs(previous_outputs)
+    racy_after = previous.get("started_ns", 0) - RACY_WINDOW_NS if reuse else 0
 
-        for file_name in files:
-            file_path = os.path.join(root, file_name)
+    def reusable(known):
+        return all(index < len(previous_outputs) and previous_outputs[index]["name"] in intact
+                   for index, _, _ in known["sections"])
 
-            if should_include(file_path, script_name):
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        file_content = f.read()
+    def old_sections(known):
+        return [(length, (previous_outputs[index]["name"], offset)) for index, offset, length in known["sections"]]
+
+    writer = ChunkWriter(max_bytes, previous_outputs, intact)
+    files = {}
+    try:
+        with ThreadPoolExecutor(max_workers=READ_WORKERS) as pool:
+            pending = deque()
+
+            def write_next():
+                nonlocal file_count, failed_count, read_count, read_bytes
+                rel_path, stat, known, future = pending.popleft()
+                if future is None:
+                    sha256 = known["sha256"]
+                    sections = old_sections(known)
+                else:
+                    try:
+                        content = future.result()
+                    except Exception as e:
+                        failed_count += 1
+                        print(f"  - Could not read file {os.path.join(project_root, rel_path)}: {e}")
+                        return
+                    read_count += 1
+                    read_bytes += len(content)
+                    sha256 = hashlib.sha256(content).hexdigest()
+                    if known is not None and known["sha256"] == sha256 and reusable(known):
+                        # Touched but not changed
+                        sections = old_sections(known)
+                    else:
+                        sections = [(len(s), s) for s in file_sections(rel_path, content, max_bytes)]
+                        print(f"  - Added: {rel_path}")
 
-                    # Add a header with the file path
-                    combined_content += f"\n--- File: {os.path.relpath(file_path, project_root)} ---\n"
-                    combined_content += file_content
-                    file_count += 1
-                    print(f"  - Added: {os.path.relpath(file_path, project_root)}")
+                locations = writer.add(rel_path, sha256, sections)
+                files[rel_path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": sha256,
+                                   "sections": locations}
+                file_count += 1
 
-                except Exception as e:
+            for file_path in iter_project_files(project_root, script_name):
+                rel_path = os.path.relpath(file_path, project_root)
+                try:
+                    stat = os.stat(file_path)
+                except OSError as e:
+                    failed_count += 1
                     print(f"  - Could not read file {file_path}: {e}")
+                    continue
+                known = previous_files.get(rel_path)
+                if (known is not None and known["mtime_ns"] == stat.st_mtime_ns and known["size"] == stat.st_size
+                        and stat.st_mtime_ns < racy_after and reusable(known)):
+                    future = None
+                else:
+                    future = pool.submit(read_file, file_path)
+                pending.append((rel_path, stat, known, future))
+                if len(pending) >= READ_AHEAD:
+                    write_next()
+            while pending:
+                write_next()
 
-    try:
-        with open(OUTPUT_FILENAME, 'w', encoding='utf-8') as output_file:
-            output_file.write(combined_content)
-        print(f"\nSuccessfully combined {file_count} files into '{OUTPUT_FILENAME}'.")
+        outputs = writer.commit()
+        # Drop outputs of the previous run that this one no longer produces
+        names = {output["name"] for output in outputs}
+        for output in (previous or {}).get("outputs", []):
+            if output["name"] not in names and os.path.exists(output["name"]):
+                os.remove(output["name"])
+        save_manifest({"version": MANIFEST_VERSION, "budget": max_bytes, "started_ns": run_started_ns,
+                       "outputs": outputs, "files": files})
     except Exception as e:
+        writer.abort()
         print(f"\nError writing to output file: {e}")
+        return
+
+    elapsed = time.perf_counter() - started
+    output_bytes = sum(output["size"] for output in outputs)
+    if max_bytes is None:
+        print(f"\nSuccessfully combined {file_count} files into '{OUTPUT_FILENAME}'.")
+    else:
+        print(f"\nSuccessfully combined {file_count} files into {len(outputs)} files of at most "
+              f"{max_bytes:,} bytes ('{outputs[0]['name']}' to '{outputs[-1]['name']}').")
+    if failed_count:
+        print(f"Skipped {failed_count} unreadable files.")
+    if incremental:
+        print(f"Reused {file_count - read_count} unchanged files and read {read_count}; "
+              f"rewrote {writer.rewritten} of {len(outputs)} output files.")
+    print(f"Read {read_bytes:,} bytes, wrote {writer.bytes_written:,} of {output_bytes:,} output bytes "
+          f"in {elapsed:.3f}s ({output_bytes / elapsed / 1e6 if elapsed else 0:.1f} MB/s, "
+          f"{file_count / elapsed if elapsed else 0:.0f} files/s, {READ_WORKERS} reader threads).")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Combine the project's source files into text files for an LLM.")
+    parser.add_argument("project_root", nargs="?", default=".", help="directory to scan (default: current)")
+    parser.add_argument("--incremental", action="store_true",
+                        help=f"only re-read files changed since the last run (tracked in {MANIFEST_FILENAME})")
+    budget = parser.add_mutually_exclusive_group()
+    budget.add_argument("--max-bytes", type=int, help="split the output into files of at most this many bytes")
+    budget.add_argument("--max-tokens", type=int,
+                        help=f"split the output into files of about this many tokens ({BYTES_PER_TOKEN} bytes each)")
+    args = parser.parse_args(argv)
+    if args.max_tokens is not None:
+        args.max_bytes = args.max_tokens * BYTES_PER_TOKEN
+    if args.max_bytes is not None and args.max_bytes < MIN_BUDGET_BYTES:
+        parser.error(f"the output budget must be at least {MIN_BUDGET_BYTES} bytes "
+                     f"({MIN_BUDGET_BYTES // BYTES_PER_TOKEN} tokens)")
+    return args
 
 
 if __name__ == "__main__":
     # Run the script from the root of your project
-    combine_project_files()
\ No newline at end of file
+    args = parse_args()
+    combine_project_files(args.project_root, incremental=args.incremental, max_bytes=args.max_bytes)
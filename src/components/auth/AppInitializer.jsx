@@ -3,7 +3,7 @@ import { useDispatch, useSelector } from "react-redux";
 import { createSelector } from "@reduxjs/toolkit";
 import { fetchInitialData } from "../../redux/slices/authSlice";
 import { startConnecting } from "../../redux/slices/realtimeSlice";
-import { fetchAllAlerts } from "../../redux/slices/alertsSlice"; // <-- NEW: Import alert thunk
+import { refreshAlerts } from "../../redux/slices/alertsSlice"; // <-- NEW: Import alert thunk
 import { Loader2, AlertTriangle } from "lucide-react";
 
 // Memoized selector to prevent unnecessary re-renders
@@ -57,11 +57,11 @@ export function AppInitializer({ children }) {
     // Start polling only when the core application data has successfully loaded.
     if (isSuccessful) {
       // Fetch alerts immediately on initial load
-      dispatch(fetchAllAlerts());
+      dispatch(refreshAlerts());
 
       // Set up the interval to dispatch the fetch action every 30 seconds.
       intervalId = setInterval(() => {
-        dispatch(fetchAllAlerts());
+        dispatch(refreshAlerts());
       }, 30000); // 30,000 milliseconds = 30 seconds
     }
 
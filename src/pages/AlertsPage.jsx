@@ -15,11 +15,18 @@ import {
 } from "react-icons/md";
 import { useDispatch, useSelector } from "react-redux";
 import {
-  fetchAllAlerts,
+  fetchAlertsPage,
+  fetchAlertsHistogram,
+  refreshAlerts,
+  setAlertFilters,
   deleteAlert,
   favoriteAlert,
   selectAllAlerts,
   selectAlertsStatus,
+  selectAlertFilters,
+  selectAlertCountsByType,
+  selectAlertsNextCursor,
+  selectAlertsLoadingMore,
 } from "../redux/slices/alertsSlice";
 
 // --- HELPER COMPONENTS ---
@@ -233,6 +240,8 @@ const alertTypes = [
   { value: "info", label: "Info", color: "blue" },
 ];
 const initialTypeState = { error: true, warning: true, info: true };
+// Typing pauses this long before the search goes to the server
+const SEARCH_DEBOUNCE_MS = 300;
 
 const TypeFilterButton = ({ typeInfo, count, isActive, onClick }) => {
   const colors = {
@@ -282,22 +291,36 @@ const TypeFilterButton = ({ typeInfo, count, isActive, onClick }) => {
 
 export function AlertsPage() {
   const dispatch = useDispatch();
-  const allAlerts = useSelector(selectAllAlerts);
+  // The server filters, sorts (newest first) and pages; only the loaded pages are kept
+  const loadedAlerts = useSelector(selectAllAlerts);
   const status = useSelector(selectAlertsStatus);
+  const filters = useSelector(selectAlertFilters);
+  const alertCountsByType = useSelector(selectAlertCountsByType);
+  const nextCursor = useSelector(selectAlertsNextCursor);
+  const loadingMore = useSelector(selectAlertsLoadingMore);
 
   const [selectedAlert, setSelectedAlert] = useState(null);
   const [isModalOpen, setIsModalOpen] = useState(false);
-  const [selectedPeriod, setSelectedPeriod] = useState("1w");
-  const [searchTerm, setSearchTerm] = useState("");
-  const [selectedTypes, setSelectedTypes] = useState(initialTypeState);
+  const [searchTerm, setSearchTerm] = useState(filters.search);
+  const selectedPeriod = filters.period;
+  const selectedTypes = filters.types;
   const parentRef = useRef(null);
   const [columnCount, setColumnCount] = useState(3);
 
+  // Any filter change reloads the first page and the type counts
   useEffect(() => {
-    if (status === "idle") {
-      dispatch(fetchAllAlerts());
-    }
-  }, [status, dispatch]);
+    dispatch(fetchAlertsPage());
+    dispatch(fetchAlertsHistogram());
+  }, [filters, dispatch]);
+
+  useEffect(() => {
+    if (searchTerm === filters.search) return;
+    const timer = setTimeout(
+      () => dispatch(setAlertFilters({ search: searchTerm })),
+      SEARCH_DEBOUNCE_MS
+    );
+    return () => clearTimeout(timer);
+  }, [searchTerm, filters.search, dispatch]);
 
   useEffect(() => {
     const updateColumnCount = () => {
@@ -315,7 +338,7 @@ export function AlertsPage() {
     // Only run the logic if there is a selected alert
     if (selectedAlert) {
       // Find the latest version of this alert in the main Redux store list
-      const updatedAlert = allAlerts.find((a) => a.id === selectedAlert.id);
+      const updatedAlert = loadedAlerts.find((a) => a.id === selectedAlert.id);
 
       if (updatedAlert) {
         // Only update local state if the object reference has changed
@@ -328,78 +351,18 @@ export function AlertsPage() {
         setSelectedAlert(null);
       }
     }
-  }, [allAlerts, selectedAlert]);
+  }, [loadedAlerts, selectedAlert]);
  // <-- The corrected dependency array
 
-  // NEW: Step 1 - Sort the alerts first
-  const sortedAlerts = useMemo(() => {
-    if (!Array.isArray(allAlerts)) return [];
-    // Create a shallow copy to avoid mutating the original state
-    return [...allAlerts].sort((a, b) => {
-      // Prioritize favorited items
-      if (a.isFavorite && !b.isFavorite) return -1;
-      if (!a.isFavorite && b.isFavorite) return 1;
-
-      // For items with the same favorite status, sort by newest first
-      return new Date(b.timestamp) - new Date(a.timestamp);
-    });
-  }, [allAlerts]);
-
-  // MODIFIED: Step 2 - Filter the *sorted* list by time
-  const timeFilteredAlerts = useMemo(() => {
-    const now = new Date();
-    // Use the newly created sortedAlerts list
-    const alertsWithDate = sortedAlerts.map((a) => ({
-      ...a,
-      timestamp: new Date(a.timestamp),
-    }));
-
-    switch (selectedPeriod) {
-      case "1h":
-        return alertsWithDate.filter(
-          (a) => a.timestamp >= new Date(now.getTime() - 1 * 60 * 60 * 1000)
-        );
-      case "10h":
-        return alertsWithDate.filter(
-          (a) => a.timestamp >= new Date(now.getTime() - 10 * 60 * 60 * 1000)
-        );
-      case "24h":
-        return alertsWithDate.filter(
-          (a) => a.timestamp >= new Date(now.getTime() - 24 * 60 * 60 * 1000)
-        );
-      case "1w":
-        return alertsWithDate.filter(
-          (a) =>
-            a.timestamp >= new Date(now.getTime() - 7 * 24 * 60 * 60 * 1000)
-        );
-      default:
-        return alertsWithDate;
-    }
-  }, [sortedAlerts, selectedPeriod]); // Depends on the sorted list now
-
-  const alertCountsByType = useMemo(() => {
-    return timeFilteredAlerts.reduce(
-      (acc, alert) => {
-        acc[alert.type] = (acc[alert.type] || 0) + 1;
-        return acc;
-      },
-      { error: 0, warning: 0, info: 0 }
-    );
-  }, [timeFilteredAlerts]);
-
-  const filteredAlerts = useMemo(() => {
-    const lowercasedTerm = searchTerm.toLowerCase();
-    return timeFilteredAlerts.filter((alert) => {
-      if (!selectedTypes[alert.type]) return false;
-      if (
-        lowercasedTerm &&
-        !alert.message.toLowerCase().includes(lowercasedTerm) &&
-        !alert.networkLine.toLowerCase().includes(lowercasedTerm)
-      )
-        return false;
-      return true;
-    });
-  }, [timeFilteredAlerts, searchTerm, selectedTypes]);
+  // Favorites first, each group still newest first (sort is stable). Favorites
+  // are client-side state, so this orders the pages loaded so far.
+  const filteredAlerts = useMemo(
+    () =>
+      [...loadedAlerts].sort(
+        (a, b) => Number(Boolean(b.isFavorite)) - Number(Boolean(a.isFavorite))
+      ),
+    [loadedAlerts]
+  );
 
   const rowVirtualizer = useVirtualizer({
     count: Math.ceil(filteredAlerts.length / columnCount),
@@ -408,11 +371,27 @@ export function AlertsPage() {
     overscan: 5,
   });
 
+  // Fetch the next page once the last loaded row scrolls into view
+  const virtualRows = rowVirtualizer.getVirtualItems();
+  const lastVisibleRow = virtualRows.length
+    ? virtualRows[virtualRows.length - 1].index
+    : -1;
+  useEffect(() => {
+    const rowCount = Math.ceil(filteredAlerts.length / columnCount);
+    if (nextCursor && !loadingMore && lastVisibleRow >= rowCount - 1) {
+      dispatch(fetchAlertsPage({ cursor: nextCursor }));
+    }
+  }, [lastVisibleRow, filteredAlerts.length, columnCount, nextCursor, loadingMore, dispatch]);
+
   const handleTypeChange = (type) =>
-    setSelectedTypes((prev) => ({ ...prev, [type]: !prev[type] }));
+    dispatch(
+      setAlertFilters({ types: { ...selectedTypes, [type]: !selectedTypes[type] } })
+    );
+  const handlePeriodChange = (period) =>
+    dispatch(setAlertFilters({ period }));
   const handleResetFilters = () => {
     setSearchTerm("");
-    setSelectedTypes(initialTypeState);
+    dispatch(setAlertFilters({ search: "", types: initialTypeState }));
   };
   const handleAlertClick = (alert) => {
     setSelectedAlert(alert);
@@ -423,11 +402,11 @@ export function AlertsPage() {
     setSelectedAlert(null);
   };
   const handleRefresh = () => {
-    dispatch(fetchAllAlerts());
+    dispatch(refreshAlerts());
   };
 
   const renderContent = () => {
-    if (status === "loading" && allAlerts.length === 0) {
+    if (status === "loading" && filteredAlerts.length === 0) {
       return (
         <div className="flex-grow flex items-center justify-center text-center px-4">
           <div>
@@ -522,7 +501,7 @@ export function AlertsPage() {
               {timePeriods.map((period) => (
                 <button
                   key={period.value}
-                  onClick={() => setSelectedPeriod(period.value)}
+                  onClick={() => handlePeriodChange(period.value)}
                   className={`px-3 py-1.5 text-sm font-medium rounded-md transition-all duration-200 focus:outline-none focus:ring-2 focus:ring-offset-2 dark:focus:ring-offset-gray-800 focus:ring-blue-500 ${
                     selectedPeriod === period.value
                       ? "bg-blue-600 text-white shadow"
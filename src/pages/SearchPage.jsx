@@ -1,5 +1,5 @@
 // src/SearchPage.js
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import {
   MdSearch,
   MdOutlineManageSearch,
@@ -8,10 +8,7 @@ import {
 
 
 
-import { useSelector } from "react-redux";
-import { selectAllDevices } from "../redux/slices/devicesSlice";
-import { selectAllSites } from "../redux/slices/sitesSlice";
-import { selectAllTenGigLinks } from "../redux/slices/tenGigLinksSlice";
+import { api } from "../services/apiServices";
 
 const itemTypes = [
   "All Types",
@@ -20,6 +17,46 @@ const itemTypes = [
   "Link",
 ];
 
+// Result type names of the /search endpoint per filter option
+const searchTypes = {
+  "Core Device": "coredevice",
+  Site: "site",
+  Link: "link",
+};
+
+const SEARCH_RESULT_LIMIT = 60;
+
+// Shapes a ranked /search result for SearchResultCard
+const toItem = (result) => {
+  if (result.type === "coredevice") {
+    return {
+      id: `dev-${result.id}`,
+      type: "Core Device",
+      name: result.name,
+      ipAddress: result.ip,
+      description: `Core Device ID: ${result.id}`,
+    };
+  }
+  if (result.type === "site") {
+    return {
+      id: `site-${result.id}`,
+      type: "Site",
+      name: result.name,
+      description: result.description,
+    };
+  }
+  return {
+    id: `link-${result.id}`,
+    type: "Link",
+    name: `Link ${result.id}`,
+    description: result.name,
+    source: result.coredevice_id,
+    target: result.neighbor_coredevice_id,
+    bandwidth: result.bandwidth,
+    status: result.physical_status,
+  };
+};
+
 // --- NEW STYLED COMPONENT ---
 const SearchResultCard = ({ item }) => {
   const renderDetail = (label, value) => {
@@ -56,71 +93,38 @@ const SearchResultCard = ({ item }) => {
 };
 
 function SearchPage() {
-  const devices = useSelector(selectAllDevices);
-  const sites = useSelector(selectAllSites);
-  const links = useSelector(selectAllTenGigLinks);
-
   const [searchQuery, setSearchQuery] = useState("");
   const [selectedType, setSelectedType] = useState(itemTypes[0]);
   const [searchResults, setSearchResults] = useState([]);
   const [isLoading, setIsLoading] = useState(false);
   const [hasSearched, setHasSearched] = useState(false);
+  const latestSearch = useRef(0);
 
-  const allItems = React.useMemo(() => {
-    const devItems = devices.map((d) => ({
-      id: `dev-${d.id}`,
-      type: "Core Device",
-      name: d.hostname || d.name,
-      ipAddress: d.ip_address || d.ip,
-      description: `Core Device ID: ${d.id}`,
-    }));
-
-    const siteItems = sites.map((s) => ({
-      id: `site-${s.id}`,
-      type: "Site",
-      name: s.site_name_english || s.name,
-      description: s.Description || `Interface: ${s.interface_id}`,
-      status: s.physicalStatus || "Up",
-    }));
-
-    const linkItems = links.map((l) => ({
-      id: `link-${l.id}`,
-      type: "Link",
-      name: `Link ${l.source} <-> ${l.target}`,
-      source: l.source,
-      target: l.target,
-      bandwidth: l.bandwidth || l.bw || "10G",
-      status: l.status,
-      description: l.Description || "Core Inter-Site Link",
-    }));
-
-    return [...devItems, ...siteItems, ...linkItems];
-  }, [devices, sites, links]);
-
-  const handleSearch = (e) => {
+  // The backend ranks the matches from its search index; only the best ones are downloaded
+  const handleSearch = async (e) => {
     if (e) e.preventDefault();
-    if (!searchQuery.trim() && selectedType === "All Types") {
+    const searchId = ++latestSearch.current;
+    setHasSearched(true);
+    if (!searchQuery.trim()) {
       setSearchResults([]);
-      setHasSearched(true);
       return;
     }
     setIsLoading(true);
-    setHasSearched(true);
-    setTimeout(() => {
-      const queryLower = searchQuery.toLowerCase();
-      const filteredResults = allItems.filter((item) => {
-        if (selectedType !== "All Types" && item.type !== selectedType)
-          return false;
-        if (searchQuery.trim()) {
-          return Object.values(item).some((val) =>
-            String(val).toLowerCase().includes(queryLower)
-          );
-        }
-        return true;
-      });
-      setSearchResults(filteredResults);
-      setIsLoading(false);
-    }, 200);
+    const params = new URLSearchParams({
+      q: searchQuery,
+      limit: SEARCH_RESULT_LIMIT,
+    });
+    if (searchTypes[selectedType]) params.append("type", searchTypes[selectedType]);
+    try {
+      const response = await api.search(params);
+      if (searchId === latestSearch.current) {
+        setSearchResults(response.results.map(toItem));
+      }
+    } catch {
+      if (searchId === latestSearch.current) setSearchResults([]);
+    } finally {
+      if (searchId === latestSearch.current) setIsLoading(false);
+    }
   };
 
   useEffect(() => {
@@ -1,36 +1,112 @@
 // src/redux/slices/alertsSlice.js  <-- Note the .js extension
 
 import { createSlice, createAsyncThunk } from "@reduxjs/toolkit";
-import { generateMockAlerts } from "../dummyData";
 
-//import { api } from "../../services/apiServices"; // <-- 1. Import the real api
+import { api } from "../../services/apiServices";
+
+// Alerts fetched per page; further pages load as the list is scrolled
+const ALERTS_PAGE_SIZE = 60;
+// Largest page the server serves; bigger requests are split into pages
+const ALERTS_MAX_PAGE_SIZE = 500;
+
+const PERIOD_MS = {
+  "1h": 60 * 60 * 1000,
+  "10h": 10 * 60 * 60 * 1000,
+  "24h": 24 * 60 * 60 * 1000,
+  "1w": 7 * 24 * 60 * 60 * 1000,
+};
+
+// The server keeps naive UTC timestamps, so send `since` without the "Z"
+const periodStart = (period) =>
+  PERIOD_MS[period]
+    ? new Date(Date.now() - PERIOD_MS[period]).toISOString().slice(0, -1)
+    : null;
+
+const selectedTypes = (filters) =>
+  Object.keys(filters.types).filter((t) => filters.types[t]);
+
+const queryParams = (filters, cursor, limit) => {
+  const params = new URLSearchParams({
+    limit,
+    sort: "timestamp",
+    order: "desc",
+  });
+  const since = periodStart(filters.period);
+  if (since) params.append("since", since);
+  const types = selectedTypes(filters);
+  // All types selected needs no filter
+  if (types.length < Object.keys(filters.types).length) {
+    types.forEach((t) => params.append("type", t));
+  }
+  if (filters.search) params.append("q", filters.search);
+  if (cursor) params.append("cursor", cursor);
+  return params;
+};
+
+// Server alerts use snake_case and a details object; the page reads the older shape
+const normalizeAlert = (alert) => ({
+  ...alert,
+  networkLine: alert.network_line,
+  severityScore: alert.severity_score,
+  details: alert.details?.info ?? alert.details,
+});
 
 // --- ASYNC THUNKS for Alerts ---
-export const fetchAllAlerts = createAsyncThunk(
-  "alerts/fetchAll",
-  async (_, { rejectWithValue }) => {
+
+// One page of the alerts matching the current filters; with `cursor` the next page is appended.
+// `limit` may exceed the server's page size: further pages are followed until it is reached
+export const fetchAlertsPage = createAsyncThunk(
+  "alerts/fetchPage",
+  async ({ cursor, limit = ALERTS_PAGE_SIZE } = {}, { getState, rejectWithValue }) => {
     try {
-      // MOCK IMPLEMENTATION
-      console.log("Fetching new mock alerts...");
-      await new Promise((resolve) => setTimeout(resolve, 750));
-      const mockAlerts = generateMockAlerts();
-      return mockAlerts;
-
-      //const alerts = await api.getAllAlerts(); // <-- 2. Use the real api call
-      //return alerts;
+      const { filters } = getState().alerts;
+      if (selectedTypes(filters).length === 0) {
+        return { alerts: [], nextCursor: null, append: false };
+      }
+      let alerts = [];
+      let nextCursor = cursor ?? null;
+      do {
+        const page = await api.queryAlerts(
+          queryParams(filters, nextCursor, Math.min(limit - alerts.length, ALERTS_MAX_PAGE_SIZE))
+        );
+        alerts = alerts.concat(page.alerts.map(normalizeAlert));
+        nextCursor = page.next_cursor;
+      } while (nextCursor && alerts.length < limit);
+      return { alerts, nextCursor, append: Boolean(cursor) };
     } catch (error) {
       return rejectWithValue(error.message);
     }
   }
 );
 
+// Counts per type over the selected time period, computed by the server
+export const fetchAlertsHistogram = createAsyncThunk(
+  "alerts/fetchHistogram",
+  async (_, { getState, rejectWithValue }) => {
+    try {
+      const since = periodStart(getState().alerts.filters.period);
+      return await api.getAlertsHistogram(
+        new URLSearchParams(since ? { since } : {})
+      );
+    } catch (error) {
+      return rejectWithValue(error.message);
+    }
+  }
+);
+
+// Reloads the counts and the alerts from the top, as many as are loaded
+// (so polling doesn't cut a scrolled list short), e.g. when polling
+export const refreshAlerts = () => (dispatch, getState) => {
+  const loaded = getState().alerts.items.length;
+  dispatch(fetchAlertsPage({ limit: Math.max(loaded, ALERTS_PAGE_SIZE) }));
+  dispatch(fetchAlertsHistogram());
+};
+
 export const deleteAlert = createAsyncThunk(
   "alerts/delete",
   async (alertId, { rejectWithValue }) => {
     try {
-      // await api.deleteAlert(alertId); // This would be the real API call
-
-      //await api.deleteAlert(alertId); // <-- 3. Use the real api call
+      await api.deleteAlert(alertId);
       return alertId;
     } catch (error) {
       return rejectWithValue(error.message);
@@ -55,30 +131,65 @@ const alertsSlice = createSlice({
   name: "alerts",
   initialState: {
     items: [],
+    nextCursor: null,
+    countsByType: { error: 0, warning: 0, info: 0 },
+    filters: {
+      period: "1w",
+      types: { error: true, warning: true, info: true },
+      search: "",
+    },
     status: "idle", // 'idle' | 'loading' | 'succeeded' | 'failed'
+    loadingMore: false,
+    pageRequestId: null, // Latest first-page request
     error: null,
   },
-  reducers: {},
+  reducers: {
+    setAlertFilters: (state, action) => {
+      state.filters = { ...state.filters, ...action.payload };
+    },
+  },
   extraReducers: (builder) => {
     builder
-      // Fetching alerts
-      .addCase(fetchAllAlerts.pending, (state) => {
-        state.status = "loading";
+      // Fetching a page of alerts
+      .addCase(fetchAlertsPage.pending, (state, action) => {
+        if (action.meta.arg?.cursor) {
+          state.loadingMore = true;
+        } else {
+          state.status = "loading";
+          state.pageRequestId = action.meta.requestId;
+        }
       })
-      .addCase(fetchAllAlerts.fulfilled, (state, action) => {
+      .addCase(fetchAlertsPage.fulfilled, (state, action) => {
+        const { alerts, nextCursor, append } = action.payload;
+        // Drop answers to superseded filters and pages of a list since reloaded
+        if (append && action.meta.arg.cursor !== state.nextCursor) {
+          state.loadingMore = false;
+          return;
+        }
+        if (!append && action.meta.requestId !== state.pageRequestId) return;
         state.status = "succeeded";
-        state.items = action.payload;
+        state.loadingMore = false;
+        state.items = append ? [...state.items, ...alerts] : alerts;
+        state.nextCursor = nextCursor;
       })
-      .addCase(fetchAllAlerts.rejected, (state, action) => {
+      .addCase(fetchAlertsPage.rejected, (state, action) => {
         state.status = "failed";
+        state.loadingMore = false;
         state.error = action.payload;
       })
+      .addCase(fetchAlertsHistogram.fulfilled, (state, action) => {
+        state.countsByType = action.payload.by_type;
+      })
       // Deleting an alert
       .addCase(deleteAlert.fulfilled, (state, action) => {
         const alertIdToRemove = action.payload;
+        const removed = state.items.find((alert) => alert.id === alertIdToRemove);
         state.items = state.items.filter(
           (alert) => alert.id !== alertIdToRemove
         );
+        if (removed && state.countsByType[removed.type] > 0) {
+          state.countsByType[removed.type] -= 1;
+        }
       })
       // Favoriting an alert
       .addCase(favoriteAlert.fulfilled, (state, action) => {
@@ -91,9 +202,15 @@ const alertsSlice = createSlice({
   },
 });
 
+export const { setAlertFilters } = alertsSlice.actions;
+
 // --- FIX: ADD THE MISSING EXPORTS HERE ---
 export const selectAllAlerts = (state) => state.alerts.items;
 export const selectAlertsStatus = (state) => state.alerts.status; // This was missing
 export const selectAlertsError = (state) => state.alerts.error; // Also good to have
+export const selectAlertFilters = (state) => state.alerts.filters;
+export const selectAlertCountsByType = (state) => state.alerts.countsByType;
+export const selectAlertsNextCursor = (state) => state.alerts.nextCursor;
+export const selectAlertsLoadingMore = (state) => state.alerts.loadingMore;
 
 export default alertsSlice.reducer;
@@ -72,6 +72,9 @@ export const api = {
   getInterfacesUp: (siteName) =>
     handleApiCall(apiClient.get(`/get_interfaces_up/${siteName}`)).catch(() => []),
 
+  // `params` is a URLSearchParams: q, optional repeated type, limit
+  search: (params) => handleApiCall(apiClient.get("/search", { params })),
+
   // --- POST (Create/Add) Endpoints ---
   addCorePikudim: (pikudData) =>
     handleApiCall(apiClient.post("/admin/coresite/create/", { name: pikudData.name || pikudData.core_site_name })),
@@ -110,6 +113,13 @@ export const api = {
   getAllAlerts: () =>
     handleApiCall(apiClient.get("/alerts")).then((res) => (Array.isArray(res) ? res : res.alerts || [])),
 
+  // `params` is a URLSearchParams so repeated keys (type=error&type=info) reach the server as a list
+  queryAlerts: (params) =>
+    handleApiCall(apiClient.get("/alerts/query", { params })),
+
+  getAlertsHistogram: (params) =>
+    handleApiCall(apiClient.get("/alerts/histogram", { params })),
+
   getAllAlertsStatus: () =>
     handleApiCall(apiClient.get("/get_all_alerts_status")).catch(() => ({ status: "ok" })),
 